@@ -0,0 +1,81 @@
+import threading
+import time
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+
+class EventBatcher:
+    """
+    Collects file events from the watcher and hands them over in batches.
+    A batch is flushed as soon as it holds batch_size paths, or once the
+    oldest queued path has waited max_wait seconds.
+    """
+
+    def __init__(self, flush_callback, batch_size=8, max_wait=2.0):
+        self.flush_callback = flush_callback
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait = max(0.0, float(max_wait))
+
+        self._pending = {}  # path -> time queued (dict keeps arrival order)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="EventBatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the flush thread after handing over whatever is still queued."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, file_path):
+        with self._cond:
+            if file_path in self._pending:
+                return
+            self._pending[file_path] = time.monotonic()
+            # The first path starts the max_wait clock of an idle flush thread; a full batch goes at once
+            if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def _take_batch(self):
+        paths = list(self._pending)[:self.batch_size]
+        for path in paths:
+            del self._pending[path]
+        return paths
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if len(self._pending) >= self.batch_size:
+                        break
+                    if self._pending:
+                        oldest = next(iter(self._pending.values()))
+                        remaining = self.max_wait - (time.monotonic() - oldest)
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+
+                if not self._running and not self._pending:
+                    return
+                batch = self._take_batch()
+
+            try:
+                self.flush_callback(batch)
+            except Exception as e:
+                logger.error(f"Failed to process batch of {len(batch)} files: {e}")
@@ -1,50 +1,76 @@
-import requests
+import asyncio
 import json
 import re
+import hashlib
+import time
+import aiohttp
+from src.context_encoder import ContextEncoder, estimate_tokens
+from src.http_pool import EventLoopThread
+from src.provider_health import AUTH_ERRORS, ProviderHealth
+from src.resilience import BrainUnavailableError, backoff_delay, breaker_for, limiter_for, parse_duration
+from src.stream_parser import IncrementalJSONParser
 from src.utils import setup_logging
 
 logger = setup_logging()
 
-# Shared system prompt — same for all providers
-SYSTEM_PROMPT = """You are a smart file organizer for a personal desktop.
-Your task: classify the given file or shortcut and return JSON.
-
-CATEGORIES (pick the MOST specific — never default to Other if a better one exists):
-- Gaming: Roblox, Steam, Rockstar Games Launcher, Epic Games, Battle.net, Xbox, Minecraft, Valorant, Fortnite, any game launcher
-- Productivity: Word, Excel, Obsidian, Notion, Figma, Acrylic Suite, LibreOffice, OneNote, Teams, Slack
-- Apps: Chrome, Edge, Discord, Spotify, Telegram, Docker, Claude, VLC, 7-Zip, WinRAR, Notepad++, Antigravity
-- Code: VS Code, PyCharm, Nmap, Zenmap, Wireshark, Git, Postman, Arduino IDE, terminal apps
-- Documents: text files, PDFs, spreadsheets, presentations (.docx, .pdf, .pptx, .txt)
-- Images: image files, 3D models, design files (.png, .jpg, .stl, .obj, .dxf, .svg)
-- Other: ONLY if nothing above fits
-
-NAMING RULE (CRITICAL — READ THIS):
-The 'suggested_name' field MUST be based on the ACTUAL input filename.
-DO NOT invent or fabricate a different name.
-Only clean it: replace spaces with underscores, remove special characters (keep dashes and dots).
-Keep the original file extension.
-CORRECT: input='Rockstar Games Launcher.lnk' → suggested_name='Rockstar_Games_Launcher.lnk'
-WRONG: suggested_name='cleaned_filename.lnk' ← NEVER output placeholder text
-
-Respond ONLY with valid JSON. No explanation, no markdown, no code blocks."""
-
-USER_PROMPT_TEMPLATE = """Input file data:
-{context}
-
-Output JSON:
-{{
-  "category": "Apps",
-  "confidence": 0.95,
-  "suggested_name": "Discord.lnk",
-  "folder": "Apps/Chat",
-  "tags": ["communication"]
-}}"""
+# A streamed decision is final once these have arrived; tags are optional
+DECISION_FIELDS = {"category", "folder", "suggested_name", "confidence"}
 
+CATEGORIES = ["Gaming", "Productivity", "Apps", "Code", "Documents", "Images", "Other"]
+
+# JSON-schema type of every decision field, for provider-side structured output
+FIELD_SCHEMAS = {
+    "category": {"type": "string", "enum": CATEGORIES},
+    "confidence": {"type": "number"},
+    "suggested_name": {"type": "string"},
+    "folder": {"type": "string"},
+    "tags": {"type": "array", "items": {"type": "string"}},
+}
+
+# Batch answers are wrapped in an object, since strict schemas need an object root
+BATCH_KEY = "decisions"
+
+# Servers that rejected response_format, as "provider/model@base_url"; shared by every client
+_UNSTRUCTURED = set()
+
+# Shared system prompt — same for all providers, and the stable prefix of every request.
+# File data only ever goes in the user message, so providers can cache this part.
+SYSTEM_PROMPT = """Classify a desktop file or shortcut and return JSON.
+
+CATEGORIES (pick the MOST specific; Other ONLY if nothing fits):
+Gaming: game launchers and games (Steam, Epic Games, Rockstar Games Launcher, Battle.net, Xbox, Roblox, Minecraft, Valorant, Fortnite)
+Productivity: Word, Excel, OneNote, Teams, Slack, Obsidian, Notion, Figma, Acrylic Suite, LibreOffice
+Apps: Chrome, Edge, Discord, Spotify, Telegram, Docker, Claude, VLC, 7-Zip, WinRAR, Notepad++, Antigravity
+Code: VS Code, PyCharm, Git, Postman, Arduino IDE, Wireshark, Nmap, Zenmap, terminals
+Documents: text, PDF, spreadsheet and presentation files (.docx .pdf .pptx .txt)
+Images: images, 3D models, design files (.png .jpg .svg .stl .obj .dxf)
+Other
+
+suggested_name MUST be the input filename, cleaned — never invented or a placeholder:
+spaces to underscores, no special characters except dashes and dots, same extension.
+'Rockstar Games Launcher.lnk' -> 'Rockstar_Games_Launcher.lnk'
+
+Input: one file object, or an array of file objects with an "index".
+Reply with JSON only, no markdown. For one file:
+{"category":"Apps","confidence":0.95,"suggested_name":"Discord.lnk","folder":"Apps/Chat","tags":["communication"]}
+For an array, one object per file in order, echoing its index:
+{"decisions":[{"index":0,"category":"Apps","confidence":0.95,"suggested_name":"Discord.lnk","folder":"Apps/Chat","tags":["communication"]}]}"""
+
+
+class AsyncBrainClient:
+    """
+    asyncio Brain client. Requests go through the shared keep-alive pool for
+    the provider's base URL, so concurrent callers reuse sockets and share
+    its in-flight cap instead of paying a TCP/TLS handshake per file.
+    """
 
-class BrainClient:
     def __init__(self, config):
         self.config = config
         self.output_schema_keys = {"category", "confidence", "suggested_name", "folder", "tags"}
+        self.stream_stats = {"streams": 0, "early_closes": 0, "ttft_ms": 0, "ttd_ms": 0}
+        self.parse_stats = {}  # "provider/model" -> {"responses": n, "parse_failures": n}
+        self.token_stats = {"files": 0, "prompt_tokens": 0, "cached_tokens": 0}
+        self.encoder = ContextEncoder(config)
 
     def _get_provider(self):
         return self.config.get("ai_provider", "openai")
@@ -80,66 +106,449 @@ class BrainClient:
             return self.config.get("ollama_base_url", "http://localhost:11434/v1")
         return "https://api.openai.com/v1"
 
-    def ask_brain(self, file_context):
-        provider = self._get_provider()
-        model = self._get_model()
+    def cache_namespace(self):
+        """Identifies provider, model and prompt version, so cached decisions never outlive a prompt change."""
+        prompt_hash = hashlib.sha256((SYSTEM_PROMPT + json.dumps(self._response_format(True))).encode("utf-8")).hexdigest()[:16]
+        return f"{self._get_provider()}/{self._get_model()}/{prompt_hash}"
+
+    async def _resolve_headers(self, log_missing=True):
+        """Returns request headers, or None when the provider is not configured."""
+        if self._get_provider() != "openai":
+            return {"Content-Type": "application/json", "Authorization": "Bearer ollama"}
 
-        if provider == "openai" and not self._get_api_key():
-            logger.error("No OpenAI API key configured. Set 'openai_api_key' in config.yaml.")
+        # Keyring lookups are blocking OS calls; keep them off the event loop
+        api_key = await asyncio.to_thread(self._get_api_key)
+        if not api_key:
+            if log_missing:
+                logger.error("No OpenAI API key configured. Set 'openai_api_key' in config.yaml.")
             return None
+        return {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+
+    def _health(self):
+        return ProviderHealth.get(self.config)
+
+    async def check_health(self, force=False):
+        """Probes the configured provider (or returns its cached status) without blocking on a full request."""
+        headers = await self._resolve_headers(log_missing=False)
+        return await self._health().check(self._get_provider(), self._get_base_url(), headers, force=force)
 
-        logger.info(f"Sending context to Brain: {file_context.get('filename')} [{provider}/{model}]")
+    async def _ensure_provider_ready(self, headers):
+        """
+        False when the provider rejects our configuration (e.g. a bad API key),
+        which no retry will fix. A provider known to be down raises
+        BrainUnavailableError at once instead of waiting out the request timeout.
+        """
+        status = await self._health().check(self._get_provider(), self._get_base_url(), headers)
+        if status.config_error:
+            logger.error(f"{self._get_provider()} is misconfigured: {status.error}")
+            return False
+        if not status.available:
+            raise BrainUnavailableError(f"{self._get_provider()} unavailable: {status.error}")
+        return True
 
-        user_message = USER_PROMPT_TEMPLATE.format(
-            context=json.dumps(file_context, indent=2)
+    def _session(self):
+        return EventLoopThread.get().pool.get(
+            self._get_base_url(),
+            max_in_flight=self.config.get("brain_max_in_flight", 8)
         )
 
+    def _model_key(self):
+        return f"{self._get_provider()}/{self._get_model()}@{self._get_base_url()}"
+
+    def _structured(self):
+        return self._model_key() not in _UNSTRUCTURED and self.config.get("brain_structured_output", True)
+
+    def _max_tokens(self, count=1):
+        # A schema-constrained answer has no prose or fences around it
+        per_file = 120 if self._structured() else 200
+        return self.config.get("brain_max_tokens_per_file", per_file) * count
+
+    def _response_format(self, batch):
+        """JSON-schema response_format built from output_schema_keys."""
+        keys = sorted(self.output_schema_keys)
+        item = {
+            "type": "object",
+            "properties": {key: FIELD_SCHEMAS[key] for key in keys},
+            "required": keys,
+            "additionalProperties": False
+        }
+        if batch:
+            item["properties"] = dict(item["properties"], index={"type": "integer"})
+            item["required"] = ["index"] + keys
+            schema = {
+                "type": "object",
+                "properties": {BATCH_KEY: {"type": "array", "items": item}},
+                "required": [BATCH_KEY],
+                "additionalProperties": False
+            }
+        else:
+            schema = item
+        # Ollama's OpenAI-compatible endpoint maps this onto its native `format` schema
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "file_decisions" if batch else "file_decision", "strict": True, "schema": schema}
+        }
+
+    def _record_parse(self, failures, responses=1):
+        key = f"{self._get_provider()}/{self._get_model()}"
+        entry = self.parse_stats.setdefault(key, {"responses": 0, "parse_failures": 0})
+        entry["responses"] += responses
+        entry["parse_failures"] += failures
+
+    def _record_tokens(self, files, estimate, usage):
+        """Counts prompt tokens, as reported by the provider when it did, estimated otherwise."""
+        self.token_stats["files"] += files
+        self.token_stats["prompt_tokens"] += usage.get("prompt_tokens") or estimate
+        details = usage.get("prompt_tokens_details") or {}
+        self.token_stats["cached_tokens"] += details.get("cached_tokens") or 0
+
+    async def _chat(self, user_message, max_tokens, headers, complete=None, batch=False, files=1):
+        """
+        Sends one chat completion and returns the decoded JSON content.
+        When streaming, the answer is parsed as it arrives and the stream is
+        closed as soon as complete(partial_value) is true.
+
+        Everything before the file data (system prompt, schema) is identical
+        across requests, so providers can serve that prefix from their
+        prompt cache.
+        """
         payload = {
-            "model": model,
+            "model": self._get_model(),
             "messages": [
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_message}
             ],
             "temperature": 0.1,  # Low temperature = less hallucination
-            "max_tokens": 200,
+            "max_tokens": max_tokens,
         }
+        structured = self._structured()
+        if structured:
+            payload["response_format"] = self._response_format(batch)
+        if self._get_provider() == "ollama":
+            # Keep the model (and its cached prompt prefix) loaded between scans
+            payload["keep_alive"] = self.config.get("ollama_keep_alive", "30m")
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self._get_api_key() if provider == 'openai' else 'ollama'}"
-        }
+        usage = {}
+        estimate = estimate_tokens(SYSTEM_PROMPT + user_message)
+        try:
+            result = await self._send_chat(payload, headers, complete, batch, usage, files)
+        except aiohttp.ClientResponseError as e:
+            # Only a complaint about the schema itself; a 400 for e.g. an oversized request says nothing about it
+            message = (e.message or "").lower()
+            if e.status != 400 or not structured or ("response_format" not in message and "json_schema" not in message):
+                raise
+            # Older servers reject response_format; fall back to prompt-only JSON for this model
+            logger.warning(f"{self._get_provider()}/{self._get_model()} rejected structured output ({e.message}); using plain JSON prompts.")
+            _UNSTRUCTURED.add(self._model_key())
+            payload.pop("response_format")
+            result = await self._send_chat(payload, headers, complete, batch, usage, files)
+        self._record_tokens(files, estimate, usage)
+        return result
 
-        base_url = self._get_base_url()
-        url = f"{base_url}/chat/completions"
+    async def _send_chat(self, payload, headers, complete, batch, usage, files=1):
+        if self.config.get("brain_stream", True):
+            payload["stream"] = True
+            # Usage arrives in a final chunk, so streams closed early fall back to the estimate
+            payload["stream_options"] = {"include_usage": True}
+            start_after = f'"{BATCH_KEY}"' if batch else None
+            return await self._post(
+                payload, headers,
+                read=lambda response, started: self._read_stream(response, started, complete, start_after, usage),
+                files=files
+            )
+
+        data = await self._post(payload, headers, files=files)
+        usage.update(data.get("usage") or {})
+        content = data["choices"][0]["message"]["content"].strip()
+
+        # Strip markdown code blocks if present
+        content = re.sub(r"```json\s*", "", content)
+        content = re.sub(r"```\s*", "", content)
+        content = content.strip()
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
+            parsed = json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse brain JSON response: {e}. Raw: {content[:200]}")
+            return None
+        if batch and isinstance(parsed, dict):
+            return parsed.get(BATCH_KEY)
+        return parsed
 
-            data = response.json()
-            content = data["choices"][0]["message"]["content"].strip()
+    async def _read_stream(self, response, started, complete, start_after=None, usage=None):
+        """Feeds server-sent content deltas to an incremental parser; returns the (possibly partial) value."""
+        parser = IncrementalJSONParser(start_after)
+        first_token = None
+        async for raw in response.content:
+            line = raw.decode("utf-8", "replace").strip()
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data)
+                if usage is not None and chunk.get("usage"):
+                    usage.update(chunk["usage"])
+                delta = chunk["choices"][0].get("delta", {}).get("content")
+            except (json.JSONDecodeError, KeyError, IndexError, TypeError, AttributeError):
+                continue
+            if not delta:
+                continue
 
-            # Strip markdown code blocks if present
-            content = re.sub(r"```json\s*", "", content)
-            content = re.sub(r"```\s*", "", content)
-            content = content.strip()
+            if first_token is None:
+                first_token = time.monotonic()
+            parser.feed(delta)
+            if parser.closed:
+                break
+            if complete and parser.value is not None and complete(parser.value):
+                # Everything we need is here; leaving the block closes the stream
+                self.stream_stats["early_closes"] += 1
+                break
 
-            parsed = json.loads(content)
+        now = time.monotonic()
+        self.stream_stats["streams"] += 1
+        self.stream_stats["ttft_ms"] += int(((first_token or now) - started) * 1000)
+        self.stream_stats["ttd_ms"] += int((now - started) * 1000)
 
-            if self._validate_response(parsed):
-                logger.info(f"Brain decision: {parsed}")
-                return parsed
-            else:
-                logger.warning(f"Invalid brain response structure: {parsed}")
-                return None
+        if parser.value is None:
+            logger.error("Brain stream ended without any JSON.")
+        return parser.value
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse brain JSON response: {e}. Raw: {content[:200]}")
+    def _has_decision(self, value):
+        return isinstance(value, dict) and DECISION_FIELDS.issubset(value)
+
+    def _batch_complete(self, count):
+        def complete(items):
+            # Per element: every index has an item carrying the decision fields
+            answered = {
+                item.get("index") for item in items
+                if isinstance(item, dict) and DECISION_FIELDS.issubset(item)
+            }
+            return len(answered.intersection(range(count))) == count
+        return complete
+
+    def summary(self):
+        streams = self.stream_stats["streams"]
+        parts = [f"streams={streams}"]
+        if streams:
+            parts.append(
+                f"early_closes={self.stream_stats['early_closes']} "
+                f"avg_ttft={self.stream_stats['ttft_ms'] // streams}ms "
+                f"avg_time_to_decision={self.stream_stats['ttd_ms'] // streams}ms"
+            )
+        files = self.token_stats["files"]
+        if files:
+            parts.append(
+                f"prompt_tokens_per_file={self.token_stats['prompt_tokens'] // files} "
+                f"cached_tokens={self.token_stats['cached_tokens']}"
+            )
+        for key, entry in self.parse_stats.items():
+            rate = entry["parse_failures"] / entry["responses"] * 100 if entry["responses"] else 0.0
+            parts.append(f"{key} parse_failures={entry['parse_failures']}/{entry['responses']} ({rate:.1f}%)")
+        return " ".join(parts)
+
+    def _timeout(self, streaming, files=1):
+        """
+        A streamed answer for a big batch can take minutes while tokens keep
+        coming, so it is only cut off when connecting or a gap between chunks
+        takes too long; a buffered answer gets a total that grows with the batch.
+        """
+        connect = self.config.get("brain_connect_timeout_seconds", 10)
+        read = self.config.get("brain_read_timeout_seconds", 30)
+        if streaming:
+            return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+        per_file = self.config.get("brain_timeout_per_file_seconds", 10)
+        return aiohttp.ClientTimeout(total=read + per_file * (files - 1), sock_connect=connect)
+
+    async def _post(self, payload, headers, read=None, files=1):
+        """
+        Sends one request through the provider's rate limiter and circuit breaker.
+        A 429 pauses the limiter and is retried once the server's window has
+        passed; 5xx responses and timeouts count toward the breaker and are
+        retried with jittered exponential backoff; other 4xx errors are raised
+        as-is (a 401/403 also marks the provider misconfigured) and, since the
+        provider did answer, count as a success for the breaker. Every attempt
+        records an outcome, so a half-open trial always ends. Raises
+        BrainUnavailableError when the provider is unreachable, the circuit is
+        open or retries run out.
+        """
+        provider = self._get_provider()
+        base_url = self._get_base_url()
+        url = f"{base_url}/chat/completions"
+        limiter = limiter_for(base_url)
+        breaker = breaker_for(base_url, self.config)
+        max_retries = self.config.get("brain_max_retries", 4)
+        timeout = self._timeout(read is not None, files)
+        # Rough token estimate for the token bucket: ~4 characters per token plus the answer budget
+        token_cost = len(json.dumps(payload)) // 4 + payload["max_tokens"]
+
+        error = None
+        for attempt in range(max_retries + 1):
+            if not breaker.allow():
+                raise BrainUnavailableError(f"circuit open for {provider}")
+            await limiter.acquire(token_cost)
+
+            retry_after = None
+            started = time.monotonic()
+            # Every attempt tells the breaker how it went, or a half-open trial would never end;
+            # anything not classified below counts against the provider
+            outcome = breaker.record_failure
+            try:
+                async with self._session().post(url, json=payload, headers=headers, timeout=timeout) as response:
+                    limiter.update_from_headers(response.headers)
+                    if response.status == 429:
+                        # Rate limited: slow down, but the provider is up, so the breaker isn't told
+                        outcome = breaker.record_throttled
+                        error = "HTTP 429"
+                        reset = max(
+                            parse_duration(response.headers.get("x-ratelimit-reset-requests")) or 0,
+                            parse_duration(response.headers.get("x-ratelimit-reset-tokens")) or 0
+                        )
+                        delay = parse_duration(response.headers.get("Retry-After")) or reset or backoff_delay(attempt)
+                        limiter.pause(delay)
+                        if attempt < max_retries:
+                            logger.warning(f"Brain rate limited; retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+                        continue
+                    if response.status >= 500:
+                        error = f"HTTP {response.status}"
+                        retry_after = parse_duration(response.headers.get("Retry-After"))
+                    else:
+                        if response.status >= 400:
+                            # The provider answered; retrying won't fix the request, but the circuit can close
+                            outcome = breaker.record_success
+                            if response.status in AUTH_ERRORS:
+                                self._health().report_config_error(provider, base_url, f"HTTP {response.status}")
+                            # The body says what was wrong with the request (raise_for_status drops it)
+                            detail = (await response.text())[:500]
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, response.history, status=response.status,
+                                message=f"{response.reason}: {detail}" if detail else response.reason,
+                                headers=response.headers
+                            )
+                        if read:
+                            data = await read(response, started)
+                        else:
+                            data = await response.json(content_type=None)
+                        outcome = breaker.record_success
+                        self._health().report_success(provider, base_url, int((time.monotonic() - started) * 1000))
+                        return data
+            except aiohttp.ClientConnectionError as e:
+                # Nothing is listening: mark the provider down and let the caller queue the work
+                self._health().report_failure(provider, base_url, e)
+                raise BrainUnavailableError(f"{provider} unreachable: {e}") from e
+            except asyncio.TimeoutError:
+                error = "timeout"
+            except asyncio.CancelledError:
+                outcome = breaker.release
+                raise
+            finally:
+                outcome()
+
+            if attempt == max_retries or not breaker.allow_retry():
+                break
+            delay = retry_after if retry_after is not None else backoff_delay(
+                attempt,
+                base=self.config.get("brain_backoff_base_seconds", 1.0),
+                cap=self.config.get("brain_backoff_max_seconds", 30.0)
+            )
+            logger.warning(f"Brain request failed ({error}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        raise BrainUnavailableError(f"{provider} request failed after {attempt + 1} attempts: {error}")
+
+    async def ask_brain(self, file_context):
+        headers = await self._resolve_headers()
+        if not headers or not await self._ensure_provider_ready(headers):
             return None
+
+        logger.info(f"Sending context to Brain: {file_context.get('filename')} [{self._get_provider()}/{self._get_model()}]")
+
+        user_message = self.encoder.encode_one(file_context)
+
+        try:
+            parsed = await self._chat(user_message, self._max_tokens(), headers, complete=self._has_decision)
+        except BrainUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Brain request failed: {e}")
             return None
 
+        if isinstance(parsed, dict):
+            # A stream closed early may not have reached the tags
+            parsed.setdefault("tags", [])
+
+        if parsed is not None and self._validate_response(parsed):
+            self._record_parse(0)
+            logger.info(f"Brain decision: {parsed}")
+            return parsed
+
+        self._record_parse(1)
+        if parsed is not None:
+            logger.warning(f"Invalid brain response structure: {parsed}")
+        return None
+
+    async def ask_brain_batch(self, file_contexts):
+        """
+        Classifies several files with a single request.
+        Returns a list of decisions aligned with file_contexts; entries the batch
+        answer got wrong are retried individually (concurrently), and stay None
+        if that fails too. Raises BrainUnavailableError when the provider can't
+        be asked at all, so the caller can retry the whole batch later.
+        """
+        if not file_contexts:
+            return []
+        if len(file_contexts) == 1:
+            return [await self.ask_brain(file_contexts[0])]
+
+        headers = await self._resolve_headers()
+        if not headers or not await self._ensure_provider_ready(headers):
+            return [None] * len(file_contexts)
+
+        logger.info(f"Sending batch of {len(file_contexts)} files to Brain [{self._get_provider()}/{self._get_model()}]")
+
+        user_message = self.encoder.encode_batch(file_contexts)
+
+        decisions = [None] * len(file_contexts)
+        try:
+            parsed = await self._chat(
+                user_message, self._max_tokens(len(file_contexts)), headers,
+                complete=self._batch_complete(len(file_contexts)), batch=True, files=len(file_contexts)
+            )
+        except BrainUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Brain batch request failed: {e}")
+            parsed = None
+            answered = False
+        else:
+            answered = True
+
+        if isinstance(parsed, list):
+            for position, item in enumerate(parsed):
+                if not isinstance(item, dict):
+                    continue
+                # Trust the echoed index when present, fall back to position otherwise
+                index = item.pop("index", position)
+                if not isinstance(index, int) or not 0 <= index < len(decisions) or decisions[index]:
+                    continue
+                item.setdefault("tags", [])
+                if self._validate_response(item):
+                    decisions[index] = item
+        elif parsed is not None:
+            logger.warning(f"Brain batch response is not a JSON array: {str(parsed)[:200]}")
+
+        failed = [i for i, d in enumerate(decisions) if d is None]
+        if answered:
+            self._record_parse(len(failed), len(decisions))
+        if failed:
+            logger.warning(f"Batch answered {len(decisions) - len(failed)}/{len(decisions)} files; retrying {len(failed)} individually.")
+            retried = await asyncio.gather(*(self.ask_brain(file_contexts[i]) for i in failed))
+            for i, decision in zip(failed, retried):
+                decisions[i] = decision
+
+        return decisions
+
     def _validate_response(self, data):
         if not isinstance(data, dict):
             return False
@@ -151,3 +560,29 @@ class BrainClient:
         if not isinstance(data.get("tags"), list):
             return False
         return True
+
+
+class BrainClient:
+    """
+    Synchronous facade over AsyncBrainClient for the watcher, scan and GUI threads.
+    Calls run on the shared Brain event loop, so all of them use one connection pool.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.aio = AsyncBrainClient(config)
+
+    def cache_namespace(self):
+        return self.aio.cache_namespace()
+
+    def summary(self):
+        return self.aio.summary()
+
+    def ask_brain(self, file_context):
+        return EventLoopThread.get().run(self.aio.ask_brain(file_context))
+
+    def ask_brain_batch(self, file_contexts):
+        return EventLoopThread.get().run(self.aio.ask_brain_batch(file_contexts))
+
+    def check_health(self, force=False):
+        return EventLoopThread.get().run(self.aio.check_health(force))
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+
+class DecisionCache:
+    """
+    Disk-backed cache of Brain decisions.
+
+    Entries are keyed on the file's content hash, its normalized filename and
+    extension, and the Brain namespace (provider/model/prompt hash), so a
+    changed prompt or model never serves stale decisions. Expired entries are
+    dropped on read (TTL) and the least recently used ones are evicted once
+    the table grows past max_entries.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.enabled = config.get("decision_cache_enabled", True)
+        self.db_path = Path(config.get("decision_cache_path", "decision_cache.db"))
+        self.ttl_seconds = config.get("decision_cache_ttl_days", 30) * 86400
+        self.max_entries = config.get("decision_cache_max_entries", 50000)
+
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._count = 0
+
+        if self.enabled:
+            self._open()
+
+    def _open(self):
+        try:
+            # The watcher thread and the GUI worker share this connection
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS decisions ("
+                " key TEXT PRIMARY KEY,"
+                " decision TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_decisions_last_used ON decisions(last_used)")
+            self._conn.commit()
+            self._count = self._conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+            logger.info(f"Decision cache opened: {self.db_path} ({self._count} entries)")
+        except Exception as e:
+            logger.error(f"Failed to open decision cache, continuing without it: {e}")
+            self._conn = None
+            self.enabled = False
+
+    @staticmethod
+    def normalize_filename(filename):
+        return re.sub(r"\s+", " ", filename.strip()).lower()
+
+    def make_key(self, content_hash, filename, extension, namespace):
+        """Builds the cache key, or None when the file has no content hash (e.g. folders)."""
+        if not content_hash:
+            return None
+        raw = "\x1f".join([content_hash, self.normalize_filename(filename), extension.lower(), namespace])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        if not self.enabled or not key:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT decision, created_at FROM decisions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM decisions WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= 1
+                self.stats["evictions"] += 1
+                row = None
+
+            if not row:
+                self.stats["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE decisions SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats["hits"] += 1
+
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    def put(self, key, decision):
+        if not self.enabled or not key or not decision:
+            return
+
+        now = time.time()
+        with self._lock:
+            try:
+                existed = self._conn.execute("SELECT 1 FROM decisions WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO decisions (key, decision, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(decision), now, now)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to store decision in cache: {e}")
+                return
+
+            if not existed:
+                self._count += 1
+            self.stats["stores"] += 1
+
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Drops expired entries, then the least recently used down to 90% of capacity."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = self._conn.execute("DELETE FROM decisions WHERE created_at < ?", (cutoff,)).rowcount
+        self._count -= expired
+
+        overflow = self._count - int(self.max_entries * 0.9)
+        lru = 0
+        if overflow > 0:
+            lru = self._conn.execute(
+                "DELETE FROM decisions WHERE key IN "
+                "(SELECT key FROM decisions ORDER BY last_used ASC LIMIT ?)", (overflow,)
+            ).rowcount
+            self._count -= lru
+
+        self._conn.commit()
+        self.stats["evictions"] += expired + lru
+        logger.info(f"Decision cache evicted {expired} expired and {lru} least-recently-used entries.")
+
+    def summary(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] / lookups * 100) if lookups else 0.0
+        return (f"hits={self.stats['hits']} misses={self.stats['misses']} "
+                f"hit_rate={hit_rate:.1f}% entries={self._count} evictions={self.stats['evictions']}")
+
+    def close(self):
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+                self.enabled = False
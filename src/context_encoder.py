@@ -0,0 +1,67 @@
+import json
+import re
+from pathlib import PureWindowsPath
+
+# Rough size of a token for English text and JSON; good enough for budgeting and reporting
+CHARS_PER_TOKEN = 4
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def dumps(value):
+    """Minified JSON: no indentation, no spaces after separators, UTF-8 kept as-is."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class ContextEncoder:
+    """
+    Turns the processor's file context into the smallest JSON the Brain can
+    still classify from. Creation dates, absolute paths and flags that are
+    false carry no signal for the category, the extension is already in the
+    filename, and the text excerpt is cut to a token budget.
+    """
+
+    def __init__(self, config):
+        self.excerpt_tokens = config.get("brain_excerpt_tokens", 100)
+        self.target_parts = config.get("brain_shortcut_target_parts", 3)
+
+    def encode(self, context, index=None):
+        compact = {}
+        if index is not None:
+            compact["index"] = index
+        compact["filename"] = context.get("filename", "")
+
+        if context.get("is_directory"):
+            compact["is_directory"] = True
+        elif context.get("size_bytes") is not None:
+            compact["size_bytes"] = context["size_bytes"]
+
+        target = context.get("shortcut_target")
+        if target:
+            # The last folders and the executable identify the app; the drive and Program Files do not
+            parts = PureWindowsPath(target).parts
+            compact["shortcut_target"] = "\\".join(parts[-self.target_parts:])
+
+        excerpt = self._truncate(context.get("text_excerpt") or "")
+        if excerpt:
+            compact["text_excerpt"] = excerpt
+        return compact
+
+    def _truncate(self, text):
+        text = _WHITESPACE_RE.sub(" ", text).strip()
+        limit = self.excerpt_tokens * CHARS_PER_TOKEN
+        if len(text) <= limit:
+            return text
+        # Cut on a word boundary so the model doesn't see a half word
+        cut = text.rfind(" ", 0, limit)
+        return text[:cut if cut > limit // 2 else limit] + "…"
+
+    def encode_one(self, context):
+        return dumps(self.encode(context))
+
+    def encode_batch(self, contexts):
+        return dumps([self.encode(context, index=i) for i, context in enumerate(contexts)])
@@ -0,0 +1,191 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.brain_client import CATEGORIES
+from src.file_record import FileRecord
+from src.path_filter import PathFilter
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+
+class WatchRoot:
+    __slots__ = ("path", "recursive", "max_depth")
+
+    def __init__(self, path, recursive=False, max_depth=0):
+        self.path = os.path.normpath(path)
+        self.recursive = recursive
+        self.max_depth = max_depth if recursive else 0
+
+
+def watch_roots(config):
+    """
+    Parses watch_paths. Entries are plain paths (recursive per watch_recursive /
+    watch_max_depth) or {"path": ..., "recursive": bool, "max_depth": int}.
+    """
+    recursive = config.get("watch_recursive", False)
+    max_depth = config.get("watch_max_depth", 4)
+    roots = []
+    for entry in config.get("watch_paths", []) or []:
+        if isinstance(entry, dict):
+            roots.append(WatchRoot(
+                entry["path"],
+                entry.get("recursive", recursive),
+                entry.get("max_depth", max_depth)
+            ))
+        else:
+            roots.append(WatchRoot(entry, recursive, max_depth))
+    return roots
+
+
+def list_directory(dir_path):
+    """One scandir pass: (FileRecords of the files, names of the subdirectories). Symlinked folders are not followed."""
+    records, subdirs = [], []
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.is_file():
+                    records.append(FileRecord.from_entry(entry))
+            except OSError:
+                continue
+    return records, subdirs
+
+
+class DirectoryTree:
+    """
+    The directories Vortex watches and scans, with their depth below a watch root.
+
+    Kept in memory and updated from watchdog events, so deciding whether an
+    event's folder is in scope is a dict lookup rather than a walk. Folders
+    Vortex files things into (the category folders under safe_root, every
+    folder the executor has moved into, and watch_exclude) are never
+    entered, or organising would feed itself new events. Ignore globs apply
+    to folders too, which keeps .git and friends out.
+    """
+
+    def __init__(self, config, path_filter=None, destinations=()):
+        self.config = config
+        self.roots = watch_roots(config)
+        self.path_filter = path_filter or PathFilter(config)
+        self.walk_workers = max(1, config.get("scan_walk_workers", 8))
+
+        safe_root = config.get("safe_root")
+        self.safe_root = os.path.normpath(safe_root) if safe_root else None
+        self.excluded = set()
+        if safe_root:
+            self.excluded.update(os.path.normpath(os.path.join(safe_root, c)) for c in CATEGORIES)
+        for path in config.get("watch_exclude", []):
+            if safe_root and not os.path.isabs(path):
+                path = os.path.join(safe_root, path)
+            self.excluded.add(os.path.normpath(path))
+
+        self._lock = threading.Lock()
+        self._dirs = {}  # dir path -> (WatchRoot, depth)
+        for root in self.roots:
+            self._dirs[root.path] = (root, 0)
+        for folder in destinations:
+            self.exclude(folder)
+
+    @property
+    def recursive(self):
+        return any(root.recursive for root in self.roots)
+
+    def __len__(self):
+        return len(self._dirs)
+
+    def is_excluded(self, dir_path):
+        """True for Vortex's own destination folders (and anything below them) and ignored folder names."""
+        if self.path_filter.is_ignored(dir_path):
+            return True
+        path = dir_path
+        while True:
+            if path in self.excluded:
+                return True
+            parent = os.path.dirname(path)
+            if parent == path:
+                return False
+            path = parent
+
+    def locate(self, dir_path):
+        """(root, depth) for a directory in scope, or None. Unknown directories are placed from their path."""
+        dir_path = os.path.normpath(dir_path)
+        known = self._dirs.get(dir_path)
+        if known:
+            return known
+
+        parent = os.path.dirname(dir_path)
+        if parent == dir_path:
+            return None
+        placed = self.locate(parent)
+        if not placed:
+            return None
+        root, depth = placed
+        if not root.recursive or depth + 1 > root.max_depth or self.is_excluded(dir_path):
+            return None
+        with self._lock:
+            self._dirs[dir_path] = (root, depth + 1)
+        return root, depth + 1
+
+    def accepts_file(self, file_path):
+        """Whether a file event belongs to a directory in scope."""
+        return self.locate(os.path.dirname(os.path.normpath(file_path))) is not None
+
+    def add_directory(self, dir_path):
+        """A folder appeared (created or moved in); returns True when it is in scope."""
+        return self.locate(dir_path) is not None
+
+    def exclude(self, dir_path):
+        """Keeps a folder Vortex moved files into (and its subtree) out of scope from now on."""
+        dir_path = os.path.normpath(str(dir_path))
+        # Shortcuts are filed into safe_root itself, which may well be a watch root
+        if dir_path == self.safe_root or any(root.path == dir_path for root in self.roots):
+            return
+        if dir_path not in self.excluded:
+            self.excluded.add(dir_path)
+            self.remove_directory(dir_path)
+
+    def remove_directory(self, dir_path):
+        """Forgets a folder and everything below it."""
+        dir_path = os.path.normpath(dir_path)
+        prefix = os.path.join(dir_path, "")
+        with self._lock:
+            for path in [p for p in self._dirs if p == dir_path or p.startswith(prefix)]:
+                if self._dirs[path][1] > 0:  # watch roots stay
+                    del self._dirs[path]
+
+    def _list(self, dir_path, list_dir):
+        try:
+            return list_dir(dir_path)
+        except OSError as e:
+            logger.warning(f"Cannot list {dir_path}: {e}")
+            return [], []
+
+    def walk(self, list_dir, cancelled=None, roots=None):
+        """
+        Breadth-first walk of the watch roots (or the given directories), one
+        level at a time, listing up to walk_workers directories in parallel.
+        list_dir(dir) returns (file records, subdirectory names). Yields
+        (dir, file records) for every directory in scope.
+        """
+        if roots is None:
+            level = [root.path for root in self.roots if os.path.isdir(root.path)]
+        else:
+            level = [d for d in roots if self.locate(d)]
+
+        with ThreadPoolExecutor(max_workers=self.walk_workers, thread_name_prefix="ScanWalk") as pool:
+            while level:
+                if cancelled and cancelled():
+                    return
+                next_level = []
+                for dir_path, (records, subdirs) in zip(level, pool.map(lambda d: self._list(d, list_dir), level)):
+                    yield dir_path, records
+                    placed = self.locate(dir_path)
+                    if not placed or not placed[0].recursive or placed[1] >= placed[0].max_depth:
+                        continue
+                    for name in subdirs:
+                        child = os.path.join(dir_path, name)
+                        if self.locate(child):
+                            next_level.append(child)
+                level = next_level
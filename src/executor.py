@@ -1,11 +1,13 @@
 import shutil
-import json
 import os
+import errno
 import time
 import struct
 from pathlib import Path
 from datetime import datetime
-from src.utils import setup_logging
+from src.utils import setup_logging, BoundedTable, path_key
+from src.journal import UndoJournal
+from src.name_index import NameIndex
 
 # Windows Shell API imports
 try:
@@ -26,8 +28,21 @@ logger = setup_logging()
 class ActionExecutor:
     def __init__(self, config):
         self.config = config
-        self.undo_log_path = Path("undo_log.json")
+        self.undo_journal = UndoJournal(
+            config.get("undo_journal_path", "undo_log.jsonl"),
+            max_entries=config.get("undo_journal_max_entries", 1000),
+            fsync_every=config.get("undo_journal_fsync_every", 8),
+            legacy_path="undo_log.json"
+        )
         self.safe_root = Path(config.get("safe_root", "C:/Users/Velix/Documents"))
+        self.name_index = NameIndex()
+        # Called with each destination folder after a successful move (keeps watchers out of it)
+        self.on_destination = None
+        # Paths this executor just wrote; the watcher drops their events so a move is never re-filed
+        self.recent_writes = BoundedTable(
+            max_size=config.get("watch_debounce_max_entries", 10000),
+            ttl=config.get("self_write_ttl_seconds", 10)
+        )
         
         # Grid settings
         self.col_width = 150
@@ -159,59 +174,128 @@ class ActionExecutor:
             logger.error(f"Reposition error: {e}")
             return False
 
-    def _load_undo_log(self):
-        if self.undo_log_path.exists():
-            try:
-                with open(self.undo_log_path, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                return []
-        return []
-
-    def _save_undo_log(self, log):
-        with open(self.undo_log_path, 'w') as f:
-            json.dump(log, f, indent=2)
-
     def move_file(self, source, destination_folder, new_filename):
         source_path = Path(source)
         dest_folder_path = self.safe_root / destination_folder
-        
-        base_name = Path(new_filename).stem
-        extension = Path(new_filename).suffix
-        dest_path = dest_folder_path / new_filename
-        
-        counter = 1
-        while dest_path.exists():
-             unique_name = f"{base_name}_{counter}{extension}"
-             dest_path = dest_folder_path / unique_name
-             counter += 1
+        dest_path = None
 
         try:
             dest_folder_path.mkdir(parents=True, exist_ok=True)
+            dest_path = self._reserve_destination(dest_folder_path, new_filename)
             logger.info(f"Moving {source_path} -> {dest_path}")
+            self.mark_written(dest_path)
             shutil.move(str(source_path), str(dest_path))
             
-            log_entry = {
+            self.undo_journal.append({
                 "timestamp": datetime.now().isoformat(),
                 "original_path": str(source_path),
                 "new_path": str(dest_path),
                 "action": "move"
-            }
-            log = self._load_undo_log()
-            log.append(log_entry)
-            self._save_undo_log(log)
+            })
+            self._notify_destinations([dest_folder_path])
             
             return str(dest_path)
         except Exception as e:
             logger.error(f"Failed to move file: {e}")
+            if dest_path and not os.path.lexists(dest_path):
+                self.name_index.release(dest_path)
             return None
 
+    def mark_written(self, path):
+        """Registers a path the executor is about to create, before the watcher can see it."""
+        self.recent_writes.set(path_key(path), True)
+
+    def _reserve_destination(self, dest_folder_path, new_filename):
+        """Picks a collision-free path from the name index; one lexists() guards against a stale index."""
+        name = self.name_index.reserve(dest_folder_path, new_filename)
+        while os.path.lexists(dest_folder_path / name):
+            name = self.name_index.reserve(dest_folder_path, new_filename)
+        return dest_folder_path / name
+
+    def _fast_move(self, source_path, dest_path):
+        """os.rename when source and destination share a volume, shutil.move otherwise."""
+        try:
+            os.rename(source_path, dest_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(str(source_path), str(dest_path))
+
+    def move_files_batch(self, moves):
+        """
+        Moves many files as one undoable transaction.
+        moves is a list of (source, destination_folder, new_filename); returns the
+        new path of each move, or None where it failed. Destination folders are
+        created and listed once; name collisions are resolved in memory and
+        each chosen name is confirmed free with one lexists().
+        """
+        results = [None] * len(moves)
+        ready = set()
+
+        for folder in {folder for _, folder, _ in moves}:
+            folder_path = self.safe_root / folder
+            try:
+                folder_path.mkdir(parents=True, exist_ok=True)
+                ready.add(folder)
+            except OSError as e:
+                logger.error(f"Failed to prepare destination folder {folder_path}: {e}")
+
+        done = []
+        for i, (source, folder, new_filename) in enumerate(moves):
+            if folder not in ready:
+                continue
+
+            source_path = Path(source)
+            # Names come from the in-memory index, checked against the disk before the rename:
+            # destination folders are not watched, and os.rename replaces an existing file on POSIX
+            dest_path = self._reserve_destination(self.safe_root / folder, new_filename)
+            self.mark_written(dest_path)
+            try:
+                self._fast_move(source_path, dest_path)
+            except Exception as e:
+                logger.error(f"Failed to move {source_path}: {e}")
+                if not os.path.lexists(dest_path):
+                    self.name_index.release(dest_path)
+                continue
+
+            done.append({"original_path": str(source_path), "new_path": str(dest_path)})
+            results[i] = str(dest_path)
+
+        if done:
+            self.undo_journal.append({
+                "timestamp": datetime.now().isoformat(),
+                "action": "batch",
+                "moves": done
+            })
+            logger.info(f"Batch moved {len(done)}/{len(moves)} files.")
+            self._notify_destinations({os.path.dirname(move["new_path"]) for move in done})
+
+        return results
+
+    def _notify_destinations(self, folders):
+        if self.on_destination:
+            for folder in folders:
+                self.on_destination(str(folder))
+
+    def destination_folders(self):
+        """Every folder the undo journal says files were moved into."""
+        folders = set()
+        for entry in self.undo_journal.entries():
+            moves = entry.get("moves") if entry.get("action") == "batch" else [entry]
+            for move in moves:
+                if move.get("new_path"):
+                    folders.add(os.path.dirname(move["new_path"]))
+        return folders
+
     def undo_last_action(self):
-        log = self._load_undo_log()
-        if not log:
+        """Reverts the last move. For a batch, returns the list of restored paths."""
+        last_action = self.undo_journal.peek_last()
+        if not last_action:
             return None
 
-        last_action = log.pop()
+        if last_action.get("action") == "batch":
+            return self._undo_batch(last_action)
+
         original_path = Path(last_action["original_path"])
         current_path = Path(last_action["new_path"])
         
@@ -219,8 +303,32 @@ class ActionExecutor:
             return None
             
         try:
+            self.mark_written(original_path)
             shutil.move(str(current_path), str(original_path))
-            self._save_undo_log(log)
+            self.undo_journal.pop_last()
+            self.name_index.release(current_path)
             return str(original_path)
         except Exception:
             return None
+
+    def _undo_batch(self, entry):
+        restored = []
+        remaining = []
+        for move in reversed(entry["moves"]):
+            try:
+                self.mark_written(move["original_path"])
+                self._fast_move(Path(move["new_path"]), Path(move["original_path"]))
+                self.name_index.release(move["new_path"])
+                restored.append(move["original_path"])
+            except Exception as e:
+                logger.warning(f"Could not restore {move['new_path']}: {e}")
+                remaining.append(move)
+
+        if not restored:
+            return None
+
+        # Keep whatever could not be restored undoable as a smaller transaction
+        self.undo_journal.pop_last()
+        if remaining:
+            self.undo_journal.append(dict(entry, moves=list(reversed(remaining))))
+        return restored
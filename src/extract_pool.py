@@ -0,0 +1,294 @@
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from src.preclassifier import PreClassifier
+from src.processor import FileProcessor
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+# How often a waiting caller checks whether its task has overrun
+_POLL_SECONDS = 0.25
+
+# Per-process FileProcessor and PreClassifier (and the pool's start queue), set up by _init_worker
+_processor = None
+_preclassifier = None
+_started = None
+
+
+def _init_worker(config, started=None):
+    global _processor, _preclassifier, _started
+    _processor = FileProcessor(config)
+    _preclassifier = PreClassifier(config)
+    _started = started
+
+
+def extract_file(record):
+    """
+    Metadata, excerpt and content hash of one FileRecord, as a picklable
+    (metadata, excerpt, content_hash) tuple, or None when the file is gone.
+    Files the local rules will decide anyway are neither read nor hashed.
+    """
+    metadata = _processor.get_metadata(record)
+    if not metadata:
+        return None
+    excerpt = ""
+    if _preclassifier.needs_excerpt(metadata):
+        excerpt = _processor.extract_excerpt(record)
+
+    content_hash = None
+    if not metadata["is_directory"] and not _preclassifier.classify(dict(metadata, text_excerpt=excerpt)):
+        content_hash = _processor.content_hash(record)
+    return metadata, excerpt, content_hash
+
+
+def extract_files(task_id, records):
+    """extract_file over a chunk of records, so one round trip to a worker covers several small files."""
+    if _started is not None:
+        # The timeout runs from here, not from when the chunk was queued
+        _started.put((task_id, os.getpid()))
+    return [extract_file(record) for record in records]
+
+
+class _Task:
+    __slots__ = ("pool", "future", "pid", "started_at", "abandoned")
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.future = None
+        self.pid = None
+        self.started_at = None
+        self.abandoned = False
+
+
+class ExtractionPool:
+    """
+    Runs extract_file for the watcher and the scan in a process pool, so
+    hashing, document parsing and shortcut resolution use every core instead
+    of queueing on the GIL. Processes are spawned on first use.
+
+    Records are sent over in chunks of at most extract_chunk_size files and
+    extract_max_task_mb of reads (a file bigger than that goes alone; its
+    own reads are capped by the excerpt budget and extract_max_read_mb).
+    Workers report when they pick a chunk up, and a chunk running longer than
+    extract_timeout_seconds is given up on: its pool stops taking work, the
+    chunks already running there finish, and then the stuck worker is
+    killed. The chunk's files are retried one by one on a fresh pool.
+    extract_processes 0 (the default on a single core) keeps the work on the
+    calling thread, without timeouts.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        default_processes = min(4, (os.cpu_count() or 1) - 1)
+        self.processes = max(0, config.get("extract_processes", default_processes))
+        self.chunk_size = max(1, config.get("extract_chunk_size", 16))
+        self.task_bytes = int(config.get("extract_max_task_mb", 256) * 1024 * 1024)
+        self.timeout = config.get("extract_timeout_seconds", 30)
+
+        self.stats = {"tasks": 0, "timeouts": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._tasks = {}        # task id -> _Task, while its future is pending
+        self._hung = {}         # retired pool -> pids of its stuck workers
+        self._ids = itertools.count()
+        self._started = None    # worker -> parent queue of (task id, pid)
+        self._sizer = FileProcessor(config)
+
+        if not self.processes:
+            _init_worker(config)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn everywhere: forking a process that runs the GUI, watchdog and aiohttp threads is unsafe
+                context = multiprocessing.get_context("spawn")
+                if self._started is None:
+                    self._started = context.Queue()
+                    threading.Thread(target=self._listen, args=(self._started,),
+                                     name="ExtractStarts", daemon=True).start()
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.config, self._started)
+                )
+                logger.info(f"Extraction pool started with {self.processes} processes.")
+            return self._pool
+
+    def _listen(self, started):
+        """Stamps each task with its worker and the time it was picked up."""
+        while True:
+            try:
+                task_id, pid = started.get()
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                task = self._tasks.get(task_id)
+                if task is not None:
+                    task.pid = pid
+                    task.started_at = time.monotonic()
+
+    def _submit(self, records):
+        pool = self._get_pool()
+        task_id = next(self._ids)
+        task = _Task(pool)
+        with self._lock:
+            self._tasks[task_id] = task
+        try:
+            task.future = pool.submit(extract_files, task_id, records)
+        except Exception:
+            self._finish(task_id)
+            raise
+        task.future.add_done_callback(lambda _: self._finish(task_id))
+        self._count("tasks")
+        return task
+
+    def _finish(self, task_id):
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            pool = task.pool if task else None
+            hung = self._hung.get(pool)
+        if hung is not None:
+            self._reap(pool)
+
+    def _wait(self, task):
+        """The task's result; TimeoutError once it has run longer than the timeout."""
+        while True:
+            done, _ = wait([task.future], timeout=_POLL_SECONDS)
+            if done:
+                return task.future.result()
+            started_at = task.started_at
+            if started_at is not None and time.monotonic() - started_at > self.timeout:
+                raise TimeoutError()
+
+    def _retire(self, task):
+        """
+        Stops giving work to the pool of a stuck task. Other chunks running
+        there are left to finish; the stuck worker is killed once they have.
+        """
+        now = time.monotonic()
+        with self._lock:
+            task.abandoned = True
+            if self._pool is task.pool:
+                self._pool = None
+            hung = self._hung.setdefault(task.pool, set())
+            if task.pid is not None:
+                hung.add(task.pid)
+            for other in self._tasks.values():
+                # Chunks still queued there may never be picked up; their clock starts now
+                if other.pool is task.pool and other.started_at is None:
+                    other.started_at = now
+        self._reap(task.pool)
+
+    def _reap(self, pool):
+        with self._lock:
+            hung = self._hung.get(pool)
+            if hung is None or any(task.pool is pool and not task.abandoned for task in self._tasks.values()):
+                return
+            del self._hung[pool]
+        for pid in hung:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _broken(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _chunks(self, records):
+        """Up to chunk_size records per task, and no more than task_bytes of reads unless a file needs more alone."""
+        chunk, budget = [], 0
+        for record in records:
+            cost = self._sizer.read_limit(record)
+            if chunk and (len(chunk) >= self.chunk_size or budget + cost > self.task_bytes):
+                yield chunk
+                chunk, budget = [], 0
+            chunk.append(record)
+            budget += cost
+        if chunk:
+            yield chunk
+
+    def extract(self, record):
+        return self.extract_many([record])[0]
+
+    def extract_many(self, records):
+        """extract_file for each record, in parallel; None for files that vanished, failed or timed out."""
+        if not self.processes:
+            return [self._extract_inline(record) for record in records]
+
+        chunks = list(self._chunks(records))
+        try:
+            tasks = [self._submit(chunk) for chunk in chunks]
+        except (BrokenProcessPool, RuntimeError):
+            self._broken(self._pool)
+            return [self._retry(record) for record in records]
+
+        results = []
+        for chunk, task in zip(chunks, tasks):
+            try:
+                results.extend(self._wait(task))
+                continue
+            except TimeoutError:
+                self._count("timeouts")
+                logger.warning(f"Extracting {len(chunk)} files from {os.path.dirname(chunk[0].path)} "
+                               f"timed out after {self.timeout}s; moving on to a fresh pool.")
+                self._retire(task)
+            except (BrokenProcessPool, CancelledError):
+                # A worker died, which takes its whole pool down
+                self._broken(task.pool)
+            except Exception as e:
+                self._count("failures")
+                logger.error(f"Failed to extract {len(chunk)} files: {e}")
+            # One more try per file on a fresh pool, so one bad file doesn't sink its chunk
+            results.extend(self._retry(record) for record in chunk)
+        return results
+
+    def _retry(self, record):
+        task = None
+        try:
+            task = self._submit([record])
+            return self._wait(task)[0]
+        except TimeoutError:
+            self._count("timeouts")
+            logger.warning(f"Extraction of {record.path} timed out after {self.timeout}s; moving on to a fresh pool.")
+            self._retire(task)
+        except Exception as e:
+            self._count("failures")
+            logger.error(f"Failed to extract {record.path}: {e}")
+            if task is not None and isinstance(e, (BrokenProcessPool, CancelledError)):
+                self._broken(task.pool)
+        return None
+
+    def _extract_inline(self, record):
+        self._count("tasks")
+        try:
+            return extract_file(record)
+        except Exception as e:
+            self._count("failures")
+            logger.error(f"Failed to extract {record.path}: {e}")
+            return None
+
+    def summary(self):
+        mode = f"{self.processes} processes" if self.processes else "inline"
+        return (f"{mode} tasks={self.stats['tasks']} timeouts={self.stats['timeouts']} "
+                f"failures={self.stats['failures']}")
+
+    def close(self):
+        """Stops the worker processes; they are spawned again if more work comes."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
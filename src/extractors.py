@@ -0,0 +1,372 @@
+import mmap
+import re
+import struct
+import zipfile
+import zlib
+from xml.etree import ElementTree
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+# Bumped whenever extractors change what they return, so cached decisions made from older excerpts are not reused
+EXCERPT_VERSION = 2
+
+TEXT_EXTENSIONS = {
+    ".txt", ".md", ".csv", ".json", ".xml", ".logger", ".log", ".ini", ".cfg", ".yaml", ".yml",
+    ".html", ".htm", ".py", ".js", ".c", ".h", ".cpp", ".hpp", ".ino", ".svg", ".scad", ".obj",
+}
+
+_EXTENSIONS = {}  # extension -> extractor
+_MAGIC = []       # (leading bytes, extractor), checked when the extension has no extractor or it found nothing
+
+
+def register(*extensions, magic=()):
+    """
+    Registers extractor(sample) -> str for file extensions and/or magic byte
+    prefixes. Extractors get an ExcerptSample and return "" when the file
+    isn't what they expected, so the next candidate gets a go.
+    """
+    def decorator(func):
+        for extension in extensions:
+            _EXTENSIONS[extension] = func
+        for prefix in magic:
+            _MAGIC.append((prefix, func))
+        return func
+    return decorator
+
+
+class ExcerptSample:
+    """
+    The bounded view of a file extractors work from: its first head_bytes
+    and, for larger files, its last tail_bytes. Large files are memory-mapped
+    so only those pages are ever read.
+    """
+
+    __slots__ = ("record", "head", "tail")
+
+    def __init__(self, record, head, tail=b""):
+        self.record = record
+        self.head = head
+        self.tail = tail
+
+    @classmethod
+    def read(cls, record, head_bytes, tail_bytes, mmap_threshold):
+        with open(record.path, "rb") as f:
+            if record.size <= head_bytes:
+                return cls(record, f.read(head_bytes))
+            if record.size < mmap_threshold:
+                head = f.read(head_bytes)
+                f.seek(max(head_bytes, record.size - tail_bytes))
+                return cls(record, head, f.read(tail_bytes))
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                return cls(record, view[:head_bytes], view[max(head_bytes, len(view) - tail_bytes):])
+
+    @property
+    def path(self):
+        return self.record.path
+
+    def lines(self, data=None):
+        return decode(self.head if data is None else data).splitlines()
+
+
+def decode(data):
+    """UTF-8 with undecodable bytes dropped (a cut multi-byte character at the end included)."""
+    return data.decode("utf-8", errors="ignore")
+
+
+def looks_like_text(data):
+    """No NUL bytes and mostly printable: worth showing as text whatever the extension says."""
+    if not data or b"\x00" in data[:4096]:
+        return False
+    sample = data[:4096]
+    printable = sum(1 for b in sample if b >= 32 or b in (9, 10, 13))
+    return printable / len(sample) > 0.95
+
+
+def _join(parts):
+    return "\n".join(part for part in parts if part)
+
+
+@register(*TEXT_EXTENSIONS)
+def extract_text(sample):
+    if not looks_like_text(sample.head):
+        return ""
+    return decode(sample.head)
+
+
+# --- 3D models -----------------------------------------------------------
+
+@register(".stl", magic=(b"solid ",))
+def extract_stl(sample):
+    head = sample.head
+    size = sample.record.size
+    if head.startswith(b"solid") and b"facet" in head[:1024]:
+        name = sample.lines()[0][5:].strip()
+        facets = head.count(b"facet normal")
+        more = "+" if size > len(head) else ""
+        return _join(["ASCII STL", f"solid: {name}" if name else "", f"facets: {facets}{more}"])
+
+    if len(head) >= 84:
+        triangles = struct.unpack_from("<I", head, 80)[0]
+        if 84 + 50 * triangles == size:
+            header = decode(head[:80].rstrip(b"\x00 ")).strip()
+            # Some exporters put "solid" in the binary header too; the size check above is what counts
+            return _join(["Binary STL", f"header: {header}" if header else "", f"triangles: {triangles}"])
+    return ""
+
+
+# --- Machine code ----------------------------------------------------------
+
+_GCODE_SETTING_RE = re.compile(r"^;\s*([\w ]+?)\s*[=:]\s*(.+)$")
+_GCODE_SETTINGS = {
+    "flavor", "time", "filament_type", "filament_used", "layer_height", "nozzle_diameter", "material",
+    "printer_model", "printer_settings_id", "print_settings_id", "filament_settings_id",
+    "estimated_printing_time", "target_machine.name", "print.time",
+}
+
+
+@register(".gcode", ".gco", ".g", ".nc", ".ngc")
+def extract_gcode(sample):
+    """Slicer header comments (and PrusaSlicer's settings block at the end), not the moves."""
+    generator, found = "", []
+    for line in sample.lines() + sample.lines(sample.tail):
+        line = line.strip()
+        if not line.startswith(";"):
+            continue
+        if not generator and "generated" in line.lower():
+            generator = line.lstrip("; ")
+            continue
+        match = _GCODE_SETTING_RE.match(line)
+        if match and match.group(1).strip().lower().replace(" ", "_") in _GCODE_SETTINGS:
+            found.append(f"{match.group(1).strip()}: {match.group(2).strip()}")
+    if not generator and not found and not looks_like_text(sample.head):
+        return ""
+    return _join(["G-code", generator] + list(dict.fromkeys(found)))
+
+
+# --- CAD -------------------------------------------------------------------
+
+_DXF_VARIABLES = {"$ACADVER", "$INSUNITS", "$EXTMIN", "$EXTMAX", "$LASTSAVEDBY", "$PROJECTNAME"}
+_DXF_VERSIONS = {
+    "AC1009": "R12", "AC1012": "R13", "AC1014": "R14", "AC1015": "2000", "AC1018": "2004",
+    "AC1021": "2007", "AC1024": "2010", "AC1027": "2013", "AC1032": "2018",
+}
+_DXF_UNITS = {"0": "unitless", "1": "inches", "2": "feet", "4": "millimeters", "5": "centimeters", "6": "meters"}
+
+
+@register(".dxf")
+def extract_dxf(sample):
+    """HEADER variables, layer names and the entity types seen, from the group code / value pairs."""
+    lines = [line.strip() for line in sample.lines()]
+    if len(lines) < 2 or lines[0] != "0":
+        return ""
+    variables, layers, entities = {}, [], {}
+    section = variable = None
+    for code, value in zip(lines[::2], lines[1::2]):
+        if code == "2" and section is None:
+            section = value
+        elif code == "0" and value == "ENDSEC":
+            section = variable = None
+        elif section == "HEADER":
+            if code == "9":
+                variable = value if value in _DXF_VARIABLES else None
+            elif variable:
+                variables.setdefault(variable, []).append(value)
+        elif section == "TABLES" and code == "2" and variable == "LAYER" and value not in layers:
+            layers.append(value)
+        elif section == "TABLES" and code == "0":
+            variable = value
+        elif section == "ENTITIES" and code == "0":
+            entities[value] = entities.get(value, 0) + 1
+
+    parts = ["DXF drawing"]
+    version = variables.get("$ACADVER", [""])[0]
+    if version:
+        parts.append(f"AutoCAD {_DXF_VERSIONS.get(version, version)}")
+    units = variables.get("$INSUNITS", [""])[0]
+    if units in _DXF_UNITS:
+        parts.append(f"units: {_DXF_UNITS[units]}")
+    if "$EXTMIN" in variables and "$EXTMAX" in variables:
+        parts.append(f"extents: {','.join(variables['$EXTMIN'][:2])} to {','.join(variables['$EXTMAX'][:2])}")
+    for name in ("$PROJECTNAME", "$LASTSAVEDBY"):
+        if variables.get(name, [""])[0]:
+            parts.append(f"{name[1:].lower()}: {variables[name][0]}")
+    if layers:
+        parts.append("layers: " + ", ".join(layers[:20]))
+    if entities:
+        common = sorted(entities.items(), key=lambda e: -e[1])[:8]
+        parts.append("entities: " + ", ".join(f"{name} {count}" for name, count in common))
+    return _join(parts)
+
+
+# --- Documents -------------------------------------------------------------
+
+_CORE_FIELDS = ("title", "subject", "creator", "keywords", "description", "lastModifiedBy")
+_OOXML_BODIES = ("word/document.xml", "xl/sharedStrings.xml", "ppt/slides/slide1.xml", "content.xml")
+_XML_TEXT_RE = re.compile(r"<(?:\w+:)?(?:t|p|h|span)(?:\s[^>]*)?>([^<]+)<")
+ZIP_MEMBER_BYTES = 256 * 1024
+
+
+def _read_member(archive, name):
+    """Reads at most ZIP_MEMBER_BYTES of a member, whatever it claims to decompress to."""
+    with archive.open(name) as member:
+        return member.read(ZIP_MEMBER_BYTES)
+
+
+@register(".docx", ".xlsx", ".pptx", ".odt", ".ods", ".odp", magic=(b"PK\x03\x04",))
+def extract_office(sample):
+    """OOXML / OpenDocument: core properties and the first words of the body."""
+    try:
+        with zipfile.ZipFile(sample.path) as archive:
+            names = set(archive.namelist())
+            parts = []
+            for props in ("docProps/core.xml", "meta.xml"):
+                if props in names:
+                    parts.extend(_properties(_read_member(archive, props)))
+            for body in _OOXML_BODIES:
+                if body in names:
+                    text = " ".join(_XML_TEXT_RE.findall(decode(_read_member(archive, body))))
+                    if text.strip():
+                        parts.append(re.sub(r"\s+", " ", text).strip())
+                    break
+    except (zipfile.BadZipFile, OSError, RuntimeError) as e:
+        logger.debug(f"Cannot read archive {sample.path}: {e}")
+        return ""
+    return _join(parts)
+
+
+def _properties(xml):
+    try:
+        root = ElementTree.fromstring(xml)
+    except ElementTree.ParseError:
+        return []
+    found = []
+    for element in root.iter():
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag in _CORE_FIELDS and element.text and element.text.strip():
+            found.append(f"{tag}: {element.text.strip()}")
+    return found
+
+
+_PDF_INFO_RE = re.compile(rb"/(Title|Subject|Author|Keywords|Creator|Producer)\s*\((.*?)(?<!\\)\)", re.S)
+_PDF_STREAM_RE = re.compile(rb"/FlateDecode[^>]*>>\s*stream\r?\n")
+_PDF_TEXT_RE = re.compile(rb"\((.*?)(?<!\\)\)\s*Tj|\[(.*?)\]\s*TJ", re.S)
+_PDF_TJ_PART_RE = re.compile(rb"\((.*?)(?<!\\)\)", re.S)
+_PDF_KERN_SPACE_RE = re.compile(rb"(?<=\))\s*-\d{3,}(?:\.\d+)?\s*(?=\()")
+PDF_STREAM_BYTES = 64 * 1024
+
+
+@register(".pdf", magic=(b"%PDF-",))
+def extract_pdf(sample):
+    """Document info strings (at either end of the file) and text shown by the first content streams."""
+    if not sample.head.startswith(b"%PDF-"):
+        return ""
+    parts = [f"PDF {decode(sample.head[5:8])}"]
+    info = {}
+    for data in (sample.head, sample.tail):
+        for key, value in _PDF_INFO_RE.findall(data):
+            text = _pdf_string(value).strip()
+            if text and key not in info:
+                info[key] = text
+    parts.extend(f"{key.decode().lower()}: {value}" for key, value in info.items())
+
+    words = []
+    for match in _PDF_STREAM_RE.finditer(sample.head):
+        try:
+            # Inflate at most PDF_STREAM_BYTES; a stream cut off by the head budget still yields its start
+            data = zlib.decompressobj().decompress(sample.head[match.end():], PDF_STREAM_BYTES)
+        except zlib.error:
+            continue
+        for shown, array in _PDF_TEXT_RE.findall(data):
+            # In TJ arrays a large negative kerning between strings is how a word space is drawn
+            chunks = [shown] if shown else _PDF_TJ_PART_RE.findall(_PDF_KERN_SPACE_RE.sub(b"( )", array))
+            words.append("".join(_pdf_string(chunk) for chunk in chunks))
+        if sum(len(w) for w in words) > 500:
+            break
+    text = re.sub(r"\s+", " ", " ".join(words)).strip()
+    if text:
+        parts.append(text)
+    return _join(parts)
+
+
+def _pdf_string(raw):
+    raw = re.sub(rb"\\([()\\])", rb"\1", raw)
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", errors="ignore")
+    return raw.decode("latin-1") if looks_like_text(raw) else ""
+
+
+# Lines every file of a format carries: the format label and, per extension, the
+# "key: value" lines that describe the file rather than what it is about
+_FORMAT_LABEL_RE = re.compile(r"^(?:PDF \S*|ASCII STL|Binary STL|G-code|DXF drawing|AutoCAD \S+)$")
+_STRUCTURAL_KEYS = {
+    ".pdf": {"creator", "producer"},
+    ".stl": {"facets", "triangles", "header"},
+    ".dxf": {"units", "extents", "entities", "lastsavedby"},
+}
+_DXF_DEFAULT_LAYERS = {"0", "defpoints"}
+
+
+def excerpt_has_signal(extension, excerpt):
+    """
+    True when an excerpt says something beyond the format itself: a PDF title or
+    author, an STL solid name, a slicer header, DXF project or layer names,
+    office properties or body text.
+    """
+    noise = _STRUCTURAL_KEYS.get(extension, set())
+    for line in (excerpt or "").splitlines():
+        line = line.strip()
+        if not line or _FORMAT_LABEL_RE.match(line):
+            continue
+        key, _, value = line.partition(": ")
+        if key in noise:
+            continue
+        if extension == ".dxf" and key == "layers" and {v.lower() for v in value.split(", ")} <= _DXF_DEFAULT_LAYERS:
+            continue
+        return True
+    return False
+
+
+class ExcerptExtractor:
+    """
+    Picks an extractor by extension, then by magic bytes, then falls back to
+    plain text when the bytes look like text. Reads are bounded by
+    excerpt_read_bytes (plus excerpt_tail_bytes from the end) and the result
+    is capped at excerpt_max_chars.
+    """
+
+    def __init__(self, config):
+        self.head_bytes = config.get("excerpt_read_bytes", 64 * 1024)
+        self.tail_bytes = config.get("excerpt_tail_bytes", 16 * 1024)
+        self.mmap_threshold = config.get("excerpt_mmap_threshold_mb", 4) * 1024 * 1024
+        self.max_chars = config.get("excerpt_max_chars", 1000)
+
+    def extract(self, record):
+        if record.size == 0:
+            return ""
+        try:
+            sample = ExcerptSample.read(record, self.head_bytes, self.tail_bytes, self.mmap_threshold)
+        except (OSError, ValueError):
+            return ""
+
+        candidates = []
+        if record.extension in _EXTENSIONS:
+            candidates.append(_EXTENSIONS[record.extension])
+        candidates.extend(func for prefix, func in _MAGIC if sample.head.startswith(prefix) and func not in candidates)
+
+        for func in candidates:
+            try:
+                text = func(sample)
+            except Exception as e:
+                logger.debug(f"{func.__name__} failed for {record.path}: {e}")
+                continue
+            if text:
+                return self._cap(text)
+
+        if not candidates and looks_like_text(sample.head):
+            return self._cap(decode(sample.head))
+        return ""
+
+    def _cap(self, text):
+        text = text.strip()
+        return text if len(text) <= self.max_chars else text[:self.max_chars]
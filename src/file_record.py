@@ -0,0 +1,47 @@
+import os
+import stat
+
+
+class FileRecord:
+    """
+    One stat() of a file, taken when it is enumerated and handed down the
+    pipeline, so safety checks, metadata, excerpt reads and decision
+    handling don't each go back to the disk to ask the same questions.
+    """
+
+    __slots__ = ("path", "name", "extension", "size", "mtime_ns", "ctime", "inode", "is_dir")
+
+    def __init__(self, path, st, name=None):
+        self.path = path
+        self.name = name or os.path.basename(path)
+        self.extension = os.path.splitext(self.name)[1].lower()
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        self.ctime = st.st_ctime
+        self.inode = st.st_ino
+        self.is_dir = stat.S_ISDIR(st.st_mode)
+
+    @classmethod
+    def from_entry(cls, entry):
+        """From an os.scandir() entry; on Windows its stat comes with the listing at no extra cost."""
+        return cls(entry.path, entry.stat(), entry.name)
+
+    @classmethod
+    def load(cls, path):
+        """Stats path once; None when it doesn't exist (any more)."""
+        path = os.fspath(path)
+        try:
+            return cls(path, os.stat(path))
+        except OSError:
+            return None
+
+    @property
+    def signature(self):
+        """What has to stay the same for the file to count as unchanged."""
+        return self.size, self.mtime_ns, self.inode
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"FileRecord({self.path!r}, size={self.size})"
@@ -0,0 +1,78 @@
+import asyncio
+import atexit
+import threading
+import aiohttp
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+
+class SessionPool:
+    """
+    One keep-alive aiohttp session per base URL.
+    Each session's connector caps the number of in-flight requests, so every
+    caller talking to the same provider shares its sockets and its limit.
+    Only use it from the loop it was created on.
+    """
+
+    def __init__(self, keepalive_timeout=60):
+        self.keepalive_timeout = keepalive_timeout
+        self._sessions = {}
+
+    def get(self, base_url, max_in_flight=8):
+        session = self._sessions.get(base_url)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=max_in_flight,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[base_url] = session
+            logger.info(f"Opened HTTP pool for {base_url} (max {max_in_flight} in flight)")
+        return session
+
+    async def close(self):
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+
+
+class EventLoopThread:
+    """Runs one asyncio loop on a daemon thread, shared by the watcher, the scan and the GUI worker."""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.pool = SessionPool()
+        self._thread = threading.Thread(target=self._run, name="BrainLoop", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                atexit.register(cls._instance.shutdown)
+            return cls._instance
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro, timeout=None):
+        """Runs a coroutine on the shared loop and blocks the calling thread for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout)
+
+    def shutdown(self):
+        if not self.loop.is_running():
+            return
+        try:
+            self.run(self.pool.close(), timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+
+class UndoJournal:
+    """
+    Append-only JSON Lines undo log.
+
+    Appends write a single line and fsync in batches (every fsync_every
+    entries or fsync_interval seconds). The byte offset of every line is kept
+    in memory, so reading or popping the last entry touches one line and
+    undo is a truncate, never a rewrite. A torn last line left by a crash is
+    cut off on open. Once the log holds twice max_entries, the oldest entries
+    are rotated out to '<name>.1'.
+    """
+
+    def __init__(self, path, max_entries=1000, fsync_every=8, fsync_interval=1.0, legacy_path=None):
+        self.path = Path(path)
+        self.max_entries = max(1, int(max_entries))
+        self.fsync_every = max(1, int(fsync_every))
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._offsets = []  # start offset of each entry's line
+        self._end = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        self._open()
+        if legacy_path:
+            self._migrate(Path(legacy_path))
+
+    def _open(self):
+        self.path.touch(exist_ok=True)
+        self._file = open(self.path, "r+b")
+
+        # Index line starts without parsing any JSON
+        self._offsets = []
+        offset = 0
+        valid_end = 0
+        for line in self._file:
+            if not line.endswith(b"\n"):
+                break  # torn write from a crash
+            if line.strip():
+                self._offsets.append(offset)
+            offset += len(line)
+            valid_end = offset
+
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() != valid_end:
+            logger.warning(f"Undo journal {self.path} had a partial last entry; truncating it.")
+            self._file.truncate(valid_end)
+        self._end = valid_end
+
+    def _migrate(self, legacy_path):
+        """Imports the old whole-file JSON undo log once, then sets it aside."""
+        if not legacy_path.exists() or self._offsets:
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read legacy undo log {legacy_path}: {e}")
+            return
+
+        for entry in entries[-self.max_entries:]:
+            self.append(entry)
+        self.flush(sync=True)
+        legacy_path.replace(legacy_path.with_name(legacy_path.name + ".migrated"))
+        logger.info(f"Migrated {len(entries)} undo entries from {legacy_path} to {self.path}")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._offsets)
+
+    def append(self, entry):
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.seek(self._end)
+            self._file.write(line)
+            # Hand the line to the OS right away; only the fsync is batched
+            self._file.flush()
+            self._offsets.append(self._end)
+            self._end += len(line)
+            self._unsynced += 1
+            self._maybe_sync()
+
+            if len(self._offsets) >= 2 * self.max_entries:
+                self._rotate()
+
+    def _read_at(self, index):
+        index %= len(self._offsets)
+        start = self._offsets[index]
+        end = self._offsets[index + 1] if index + 1 < len(self._offsets) else self._end
+        self._file.flush()
+        self._file.seek(start)
+        return json.loads(self._file.read(end - start))
+
+    def peek_last(self):
+        with self._lock:
+            if not self._offsets:
+                return None
+            return self._read_at(-1)
+
+    def entries(self):
+        """Every entry, oldest first."""
+        with self._lock:
+            return [self._read_at(i) for i in range(len(self._offsets))]
+
+    def pop_last(self):
+        with self._lock:
+            if not self._offsets:
+                return None
+            entry = self._read_at(-1)
+            self._end = self._offsets.pop()
+            self._file.truncate(self._end)
+            self._unsynced += 1
+            self._maybe_sync()
+            return entry
+
+    def _maybe_sync(self):
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self, sync=False):
+        with self._lock:
+            if sync:
+                self._sync()
+            else:
+                self._file.flush()
+
+    def _rotate(self):
+        """Keeps the newest max_entries in place and moves the rest to '<name>.1'."""
+        cut = self._offsets[-self.max_entries]
+        self._file.flush()
+        self._file.seek(0)
+        older = self._file.read(cut)
+        newer = self._file.read(self._end - cut)
+
+        archive = self.path.with_name(self.path.name + ".1")
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(archive, "wb") as f:
+            f.write(older)
+        with open(tmp, "wb") as f:
+            f.write(newer)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._file.close()
+        os.replace(tmp, self.path)
+        self._open()
+        self._unsynced = 0
+        logger.info(f"Undo journal rotated: {len(older.splitlines())} old entries moved to {archive}")
+
+    def close(self):
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._sync()
+                self._file.close()
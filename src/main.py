@@ -3,21 +3,37 @@ import yaml
 import sys
 import datetime
 import json
+import threading
 from pathlib import Path
 
 # Add project root to sys.path to allow running as script
 project_root = Path(__file__).resolve().parent.parent
 sys.path.append(str(project_root))
 
-from src.utils import setup_logging
+from src.utils import setup_logging, path_key
 from src.watcher import start_watcher
-from src.processor import FileProcessor
+from src.extract_pool import ExtractionPool
+from src.extractors import EXCERPT_VERSION
 from src.brain_client import BrainClient
 from src.executor import ActionExecutor
 from src.safety import SafetyChecker
+from src.path_filter import PathFilter
+from src.cache import DecisionCache
+from src.batcher import EventBatcher
+from src.pipeline import ScanPipeline
+from src.preclassifier import PreClassifier, is_branded
+from src.similarity import SimilarityIndex
+from src.retry_queue import RetryQueue
+from src.scan_index import ScanIndex
+from src.file_record import FileRecord
+from src.dir_tree import DirectoryTree
+from src.resilience import BrainUnavailableError
 
 logger = setup_logging()
 
+# Decision placeholder for files queued for a later Brain retry
+DEFERRED = object()
+
 def load_config(config_path="config.yaml"):
     try:
         with open(config_path, "r") as f:
@@ -31,10 +47,21 @@ def load_config(config_path="config.yaml"):
 class AntigravitySystem:
     def __init__(self, config):
         self.config = config
-        self.processor = FileProcessor(config)
+        # Metadata, excerpts and hashes are worked out in worker processes
+        self.extraction = ExtractionPool(config)
         self.brain = BrainClient(config)
         self.executor = ActionExecutor(config)
-        self.safety = SafetyChecker(config)
+        # One compiled filter shared by the watcher and the safety checks
+        self.path_filter = PathFilter(config)
+        self.safety = SafetyChecker(config, self.path_filter)
+        self.cache = DecisionCache(config)
+        self.preclassifier = PreClassifier(config)
+        self.similarity = SimilarityIndex(config)
+        self.retry_queue = RetryQueue(config)
+        self.scan_index = ScanIndex(config)
+        # Watched and scanned folders; the ones Vortex files into are kept out
+        self.dir_tree = DirectoryTree(config, self.path_filter, self.executor.destination_folders())
+        self.executor.on_destination = self.dir_tree.exclude
         
         self.mode = config.get("mode", "observe")
         self.confidence_threshold = config.get("confidence_threshold", 0.8)
@@ -49,35 +76,65 @@ class AntigravitySystem:
         # Pending Actions (Suggest Mode) - id: {data}
         self._action_counter = 0
         self.pending_actions = {}
+        self._pending_contexts = {}  # id -> (context, decision), learned from on approve/reject
+        
+        # Guards stats and pending actions; the watcher, scan stages and GUI worker all touch them
+        self._lock = threading.RLock()
+        
+        self.observer = None
+        self.batcher = None
+        self._scan = None
+        self._retry_thread = None
+        self._retry_stop = threading.Event()
         
         # Callbacks
         self.on_stats_change = None 
-        self.on_pending_change = None # Called when pending list changes
+        self.on_pending_change = None # Called with a full snapshot when the pending list changes
+        self.on_pending_delta = None  # Called with (added {id: action}, removed [ids]) only
 
     def set_mode(self, mode):
         if mode in ["observe", "suggest", "auto"]:
             self.mode = mode
             logger.info(f"Mode changed to: {self.mode}")
 
+    def _bump_stat(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+        if self.on_stats_change:
+            self.on_stats_change(self.stats)
+
+    def _notify_pending(self, added=None, removed=None):
+        if self.on_pending_delta:
+            self.on_pending_delta(added or {}, list(removed or ()))
+        if self.on_pending_change:
+            with self._lock:
+                snapshot = dict(self.pending_actions)
+            self.on_pending_change(snapshot)
+
     def update_config(self, key, value):
         self.config[key] = value
         logger.info(f"Configuration updated: {key} = {value}")
 
     def undo_last(self):
         result = self.executor.undo_last_action()
-        if result:
+        if isinstance(result, list):
+            logger.info(f"Undo successful. {len(result)} files restored from batch.")
+        elif result:
             logger.info(f"Undo successful. File restored to {result}")
         else:
              logger.warning("Undo failed or nothing to undo.")
 
     def approve_action(self, action_id):
-        action = self.pending_actions.pop(action_id, None)
+        with self._lock:
+            action = self.pending_actions.pop(action_id, None)
+            learned = self._pending_contexts.pop(action_id, None)
         if not action:
             return
         
         logger.info(f"Action {action_id} approved.")
-        if self.on_pending_change:
-            self.on_pending_change(self.pending_actions)
+        self._notify_pending(removed=[action_id])
+        if learned:
+            self.similarity.learn(*learned, approved=True)
             
         # Execute
         source_path = action['source_path']
@@ -88,9 +145,7 @@ class AntigravitySystem:
             success = self.executor.reposition_icon(source_path, action.get('category', 'Other'))
             if success:
                 logger.info(f"Action executed: Shortcut repositioned on Desktop.")
-                self.stats["actions_taken"] += 1
-                if self.on_stats_change:
-                    self.on_stats_change(self.stats)
+                self._bump_stat("actions_taken")
         else:
             new_path = self.executor.move_file(
                 source_path, 
@@ -99,70 +154,273 @@ class AntigravitySystem:
             )
             if new_path:
                 logger.info(f"Action executed: Moved to {new_path}")
-                self.stats["actions_taken"] += 1
-                if self.on_stats_change:
-                    self.on_stats_change(self.stats)
+                self._bump_stat("actions_taken")
+
+    def approve_actions(self, action_ids):
+        """Approves many actions at once; all file moves run as one batch and undo together."""
+        with self._lock:
+            actions = [self.pending_actions.pop(aid, None) for aid in action_ids]
+            learned = [self._pending_contexts.pop(aid, None) for aid in action_ids]
+        actions = [a for a in actions if a]
+        if not actions:
+            return
+
+        logger.info(f"{len(actions)} actions approved.")
+        self._notify_pending(removed=[a['id'] for a in actions])
+        for item in learned:
+            if item:
+                self.similarity.learn(*item, approved=True)
+
+        behavior = self.config.get("shortcuts_behavior", "move")
+        moves = []
+        repositioned = 0
+        for action in actions:
+            source_path = action['source_path']
+            if source_path.lower().endswith(".lnk") and behavior == "reposition":
+                if self.executor.reposition_icon(source_path, action.get('category', 'Other')):
+                    repositioned += 1
+            else:
+                moves.append((source_path, action['target_folder'], action['target_name']))
+
+        moved = sum(1 for new_path in self.executor.move_files_batch(moves) if new_path) if moves else 0
+        logger.info(f"Batch executed: {moved} moved, {repositioned} shortcuts repositioned.")
+        if moved + repositioned:
+            self._bump_stat("actions_taken", moved + repositioned)
 
     def reject_action(self, action_id):
-        if self.pending_actions.pop(action_id, None):
+        with self._lock:
+            removed = self.pending_actions.pop(action_id, None)
+            learned = self._pending_contexts.pop(action_id, None)
+        if removed:
             logger.info(f"Action {action_id} rejected.")
-            if self.on_pending_change:
-                self.on_pending_change(self.pending_actions)
+            self._notify_pending(removed=[action_id])
+            if learned:
+                self.similarity.learn(*learned, approved=False)
 
     def on_file_event(self, file_path, override_mode=None):
+        self.process_files([file_path], override_mode)
+
+    def process_files(self, file_paths, override_mode=None):
+        """Runs a group of files through the pipeline, asking the Brain for all of them in one batch."""
+        prepared = [item for item in self._prepare_contexts(file_paths) if item]
+
+        if not prepared:
+            return
+
+        decisions = self._decide(prepared, override_mode)
+
+        for (file_path, context, *_), decision in zip(prepared, decisions):
+            self._apply_decision(file_path, decision, override_mode, context)
+
+    def _drop_pending(self, paths):
+        """Withdraws suggestions for the given source paths."""
+        if not paths:
+            return
+        paths = set(paths)
+        with self._lock:
+            ids = [aid for aid, action in self.pending_actions.items() if action["source_path"] in paths]
+            for aid in ids:
+                del self.pending_actions[aid]
+                self._pending_contexts.pop(aid, None)
+        if ids:
+            self._notify_pending(removed=ids)
+
+    def _reuse_decisions(self, unchanged, override_mode=None):
+        """Re-suggests stored decisions for unchanged files that have no pending action any more."""
+        with self._lock:
+            pending = {action["source_path"] for action in self.pending_actions.values()}
+        for path, decision in unchanged:
+            if decision and path not in pending:
+                self._handle_decision(path, decision, override_mode)
+
+    def _scan_fingerprint(self):
+        """Settings that change what a scan decides; the scan index is only valid while they hold."""
+        keys = ("allowed_extensions", "ignore_patterns", "organization_targets",
+                "filter_min_size_bytes", "filter_max_size_mb", "preclassifier_enabled",
+                "preclassifier_defer_to_excerpts")
+        settings = {key: self.config.get(key) for key in keys}
+        settings["brain"] = self.brain.cache_namespace()
+        settings["excerpts"] = EXCERPT_VERSION
+        return json.dumps(settings, sort_keys=True, default=str)
+
+    def _apply_decision(self, file_path, decision, override_mode=None, context=None):
+        if decision is DEFERRED:
+            return
+        if not decision:
+            logger.warning(f"No decision received from Brain for {file_path}.")
+            return
+
+        logger.info(f"Brain decision: {decision}")
+        self._bump_stat("decisions_made")
+
+        # 5. Handle Decision based on Mode
+        self._handle_decision(file_path, decision, override_mode, context)
+
+    def _prepare_context(self, file_path):
+        """
+        Filters a file and extracts its context.
+        Takes a path or a FileRecord; a path is stat'ed once here and the
+        record reused by every check below.
+        Returns (file_path, context, cache_key, local_decision) or None.
+        """
+        record = self._admit(file_path)
+        if record is None:
+            return None
+        return self._build_context(record, self.extraction.extract(record))
+
+    def _prepare_contexts(self, file_paths):
+        """_prepare_context for a group of files, extracted in parallel; one item (or None) per file."""
+        records = [self._admit(file_path) for file_path in file_paths]
+        admitted = [record for record in records if record]
+        extracted = iter(self.extraction.extract_many(admitted))
+        return [self._build_context(record, next(extracted)) if record else None for record in records]
+
+    def _admit(self, file_path):
+        """Steps 1 and 1.5 of _prepare_context: the FileRecord of a file worth extracting, or None."""
+        record = file_path if isinstance(file_path, FileRecord) else FileRecord.load(file_path)
+        file_path = str(file_path) if record is None else record.path
         logger.info(f"Processing event for: {file_path}")
         
         # 1. Safety Check (Source)
-        if not self.safety.is_safe_file(file_path):
+        if record is None or not self.safety.is_safe_file(record):
             logger.info(f"Skipping unsafe or ignored file: {file_path}")
-            return
+            return None
 
         # 1.5 Type Filter (Files / Shortcuts / Folders)
         targets = self.config.get("organization_targets", {"files": True, "shortcuts": True, "folders": True})
-        is_dir = Path(file_path).is_dir()
-        is_shortcut = file_path.lower().endswith(".lnk")
+        is_dir = record.is_dir
+        is_shortcut = record.extension == ".lnk"
 
         if is_dir and not targets.get("folders"):
             logger.info(f"Skipping folder: {file_path}")
-            return
+            return None
         if is_shortcut and not targets.get("shortcuts"):
             logger.info(f"Skipping shortcut: {file_path}")
-            return
+            return None
+        if is_shortcut and is_branded(record.name) and self._in_safe_root(file_path):
+            # Branded shortcuts are kept on the Desktop; this one has been organised already
+            logger.info(f"Skipping organised shortcut: {file_path}")
+            return None
         if not is_dir and not is_shortcut and not targets.get("files"):
             logger.info(f"Skipping file: {file_path}")
-            return
+            return None
 
-        self.stats["files_processed"] += 1
-        if self.on_stats_change:
-            self.on_stats_change(self.stats)
+        self._bump_stat("files_processed")
+        return record
 
-        # 2. Extract Context
-        metadata = self.processor.get_metadata(file_path)
-        excerpt = self.processor.extract_excerpt(file_path)
-        
-        if not metadata:
-            return
+    def _build_context(self, record, extracted):
+        """Step 2 of _prepare_context, from what the extraction pool returned for the record."""
+        # 2. Extract Context (metadata, excerpt and hash come from the extraction pool)
+        if not extracted:
+            return None
+        metadata, excerpt, content_hash = extracted
 
         context = metadata
         context["text_excerpt"] = excerpt
 
-        # 3. Ask Brain
-        logger.info("Asking Brain for decision...")
-        decision = self.brain.ask_brain(context)
-        
-        if not decision:
-            logger.warning("No decision received from Brain.")
-            return
+        # Obvious files are decided by local rules; only the rest is worth hashing for the cache
+        local_decision = self.preclassifier.classify(context)
 
-        logger.info(f"Brain decision: {decision}")
-        self.stats["decisions_made"] += 1
-        if self.on_stats_change:
-            self.on_stats_change(self.stats)
+        cache_key = None
+        if not local_decision and not metadata["is_directory"]:
+            cache_key = self.cache.make_key(
+                content_hash,
+                metadata["filename"],
+                metadata["extension"],
+                f"{self.brain.cache_namespace()}:{EXCERPT_VERSION}"
+            )
+        return record.path, context, cache_key, local_decision
+
+    def _decide(self, prepared, override_mode=None):
+        """
+        Returns one decision per prepared item: local rules first, then the
+        decision cache and decisions the user approved for similar files, and
+        a single Brain batch for whatever is left. When
+        the Brain is unavailable those files come back DEFERRED and wait in
+        the retry queue instead of being dropped.
+        """
+        decisions = []
+        misses = []
+
+        # 3. Skip the Brain for pre-classified files, cached decisions and files like approved ones
+        for i, (_, context, cache_key, local_decision) in enumerate(prepared):
+            if local_decision:
+                logger.info(f"Pre-classified {context['filename']} as {local_decision['category']} locally")
+                decisions.append(local_decision)
+                continue
+
+            decision = self.cache.get(cache_key)
+            if decision:
+                logger.info(f"Decision cache hit for {context['filename']}")
+            else:
+                decision = self.similarity.classify(context)
+                if decision:
+                    logger.info(f"Reusing an approved decision for {context['filename']} "
+                                f"(similarity confidence {decision['confidence']})")
+                else:
+                    misses.append(i)
+            decisions.append(decision)
+
+        if not misses:
+            return decisions
+
+        # 4. Ask Brain
+        logger.info(f"Asking Brain for {len(misses)} decision(s)...")
+        miss_paths = [prepared[i][0] for i in misses]
+        try:
+            answers = self.brain.ask_brain_batch([prepared[i][1] for i in misses])
+        except BrainUnavailableError as e:
+            logger.warning(f"Brain unavailable ({e}); {len(misses)} file(s) queued for retry.")
+            self.retry_queue.add(miss_paths, override_mode, str(e))
+            self._ensure_retry_worker()
+            for i in misses:
+                decisions[i] = DEFERRED
+            return decisions
+
+        self.retry_queue.discard(miss_paths)
+        for i, decision in zip(misses, answers):
+            decisions[i] = decision
+            self.cache.put(prepared[i][2], decision)
+
+        return decisions
+
+    def _ensure_retry_worker(self):
+        with self._lock:
+            if self._retry_thread and self._retry_thread.is_alive():
+                return
+            self._retry_stop.clear()
+            self._retry_thread = threading.Thread(target=self._retry_loop, name="BrainRetry", daemon=True)
+            self._retry_thread.start()
+
+    def _retry_loop(self):
+        """Re-runs queued files through the pipeline once their backoff has passed."""
+        interval = self.config.get("retry_poll_seconds", 15)
+        batch_size = self.config.get("brain_batch_size", 8)
+        while not self._retry_stop.wait(interval):
+            due = self.retry_queue.take_due(limit=batch_size * 4)
+            if not due:
+                continue
+
+            gone = [path for path, _ in due if not Path(path).exists()]
+            self.retry_queue.discard(gone)
+
+            by_mode = {}
+            for path, mode in due:
+                if path not in gone:
+                    by_mode.setdefault(mode, []).append(path)
 
-        # 4. Handle Decision based on Mode
-        self._handle_decision(file_path, decision, override_mode)
+            for mode, paths in by_mode.items():
+                logger.info(f"Retrying {len(paths)} file(s) the Brain could not classify earlier.")
+                for start in range(0, len(paths), batch_size):
+                    try:
+                        self.process_files(paths[start:start + batch_size], mode)
+                    except Exception as e:
+                        logger.error(f"Retry batch failed: {e}")
 
-    def _handle_decision(self, source_path, decision, override_mode=None):
+    def _in_safe_root(self, file_path):
+        return path_key(Path(file_path).parent) == path_key(self.config["safe_root"])
+
+    def _handle_decision(self, source_path, decision, override_mode=None, context=None):
         folder = decision.get("folder")
         suggested_name = decision.get("suggested_name")
         confidence = decision.get("confidence", 0.0)
@@ -188,8 +446,11 @@ class AntigravitySystem:
             target_folder = "" 
         else:
             # Regular File Branding: [YYYY-MM-DD] Name
-            creation_time = Path(source_path).stat().st_ctime
-            date_str = datetime.datetime.fromtimestamp(creation_time).strftime('%Y-%m-%d')
+            if context and context.get("created_at"):
+                date_str = context["created_at"]
+            else:
+                creation_time = Path(source_path).stat().st_ctime
+                date_str = datetime.datetime.fromtimestamp(creation_time).strftime('%Y-%m-%d')
             date_prefix = f"[{date_str}] "
             
             if suggested_name and not suggested_name.startswith("["):
@@ -197,6 +458,10 @@ class AntigravitySystem:
             else:
                 target_name = suggested_name if suggested_name else Path(source_path).name
 
+        if path_key(Path(self.config["safe_root"]) / target_folder / target_name) == path_key(source_path):
+            logger.info(f"{source_path} is already where the decision puts it.")
+            return
+
         # Safety Check (Destination)
         dest_check = str(Path(self.config["safe_root"]) / target_folder) if target_folder else self.config["safe_root"]
         if not self.safety.is_safe_action(source_path, dest_check):
@@ -208,8 +473,9 @@ class AntigravitySystem:
             return
 
         if current_mode == "suggest":
-            self._action_counter += 1
-            action_id = self._action_counter
+            with self._lock:
+                self._action_counter += 1
+                action_id = self._action_counter
             
             # Format display path for UI (no leading slash when on desktop root)
             if target_folder:
@@ -217,7 +483,7 @@ class AntigravitySystem:
             else:
                 display_target = f"Desktop: {target_name}"
 
-            self.pending_actions[action_id] = {
+            action = {
                 "id": action_id,
                 "source_path": source_path,
                 "target_folder": target_folder,
@@ -227,11 +493,14 @@ class AntigravitySystem:
                 "category": decision.get("category", "Other"),
                 "filename": Path(source_path).name
             }
+            with self._lock:
+                self.pending_actions[action_id] = action
+                if context:
+                    self._pending_contexts[action_id] = (context, decision)
             
             logger.info(f"[SUGGEST] Action {action_id} queued: {source_path} -> {display_target}")
             
-            if self.on_pending_change:
-                self.on_pending_change(self.pending_actions)
+            self._notify_pending(added={action_id: action})
             return
 
         if current_mode == "auto":
@@ -244,14 +513,11 @@ class AntigravitySystem:
                 if is_shortcut and behavior == "reposition":
                     success = self.executor.reposition_icon(source_path, decision.get("category", "Other"))
                     if success:
-                         self.stats["actions_taken"] += 1
+                        self._bump_stat("actions_taken")
                 else:
                     new_path = self.executor.move_file(source_path, target_folder, target_name)
                     if new_path:
-                        self.stats["actions_taken"] += 1
-                
-                if self.on_stats_change:
-                    self.on_stats_change(self.stats)
+                        self._bump_stat("actions_taken")
             else:
                 logger.info(f"[AUTO] Confidence {confidence} too low (Threshold: {self.confidence_threshold}). Action skipped.")
 
@@ -262,47 +528,101 @@ class AntigravitySystem:
             return
 
         logger.info("Starting Antigravity Local Agent...")
-        self.observer = start_watcher(self.on_file_event, self.config)
+        # Bursts of watcher events are grouped so the Brain sees them as one batch
+        self.batcher = EventBatcher(
+            self.process_files,
+            batch_size=self.config.get("brain_batch_size", 8),
+            max_wait=self.config.get("brain_batch_max_wait", 2.0)
+        )
+        self.batcher.start()
+        self.observer = start_watcher(
+            self.batcher.submit, self.config, self.path_filter,
+            event_listener=self.executor.name_index.observe_event,
+            tree=self.dir_tree,
+            own_writes=self.executor.recent_writes
+        )
         if not self.observer:
             logger.error("Failed to start observer.")
-            
-            self.observer.stop()
-            self.observer.join()
-            self.observer = None
+            self.batcher.stop()
+            self.batcher = None
+            return
+
+        # Files left over from an earlier session get their retry too
+        if len(self.retry_queue):
+            self._ensure_retry_worker()
 
     def stop(self):
         """Stops the file watcher."""
         if hasattr(self, 'observer') and self.observer:
             logger.info("Stopping Antigravity Local Agent...")
+            logger.info(f"Watcher metrics: {self.watcher_metrics()}")
             self.observer.stop()
             self.observer.join()
             self.observer = None
+            if self.batcher:
+                self.batcher.stop()
+                self.batcher = None
             logger.info("Agent stopped.")
+        self._retry_stop.set()
+        self.extraction.close()
+
+    def watcher_metrics(self):
+        """Debounce table size/evictions and tracked/dropped paths of the running watcher."""
+        if self.observer:
+            return self.observer.metrics()
+        return {}
 
     def scan_existing_files(self):
-        """Scans all existing files in watched paths. Clears previous results first."""
+        """
+        Scans all existing files in watched paths. With the scan index only new
+        or modified files are processed; unchanged ones keep their suggestion.
+        Without it, previous results are cleared and everything is redone.
+        """
+        if self._scan:
+            logger.warning("A scan is already running.")
+            return
+
         logger.info("Starting manual scan of existing files...")
         
-        # Clear previous scan results
-        self.pending_actions.clear()
-        self._action_counter = 0
-        if self.on_pending_change:
-            self.on_pending_change(self.pending_actions)
-        
-        paths = self.config.get("watch_paths", [])
-        count = 0
+        if self.scan_index.enabled:
+            self.scan_index.ensure_fingerprint(self._scan_fingerprint())
+        else:
+            # Clear previous scan results
+            with self._lock:
+                cleared = list(self.pending_actions)
+                self.pending_actions.clear()
+                self._pending_contexts.clear()
+                self._action_counter = 0
+            self._notify_pending(removed=cleared)
         
-        for root_path in paths:
-            p = Path(root_path)
-            if not p.exists():
-                continue
-                
-            for file_path in p.iterdir():
-                if file_path.is_file():
-                    self.on_file_event(str(file_path), override_mode="suggest")
-                    count += 1
+        started = time.perf_counter()
+        self._scan = ScanPipeline(self, self.scan_index)
+        try:
+            count = self._scan.run(self.dir_tree, override_mode="suggest")
+            unchanged = self._scan.unchanged
+            directories = self._scan.directories
+            cancelled = self._scan.cancelled
+        finally:
+            self._scan = None
+        elapsed = time.perf_counter() - started
         
-        logger.info(f"Manual scan complete. Processed {count} files.")
+        if cancelled:
+            logger.info(f"Manual scan cancelled after {count} files.")
+        else:
+            logger.info(f"Manual scan complete in {elapsed:.2f}s. Processed {count} new or changed files, "
+                        f"{unchanged} unchanged, in {directories} folders.")
+        logger.info(f"Decision cache: {self.cache.summary()}")
+        logger.info(f"Pre-classifier: {self.preclassifier.summary()}")
+        logger.info(f"Similarity index: {self.similarity.summary()}")
+        logger.info(f"Extraction: {self.extraction.summary()}")
+        logger.info(f"Brain: {self.brain.summary()}")
+
+    def cancel_scan(self):
+        """Asks a running scan to stop; in-flight Brain batches are allowed to finish."""
+        scan = self._scan
+        if scan:
+            logger.info("Cancelling scan...")
+            scan.cancel()
 
 def main():
     logger.info("Starting Antigravity Local Agent...")
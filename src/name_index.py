@@ -0,0 +1,103 @@
+import os
+import re
+import threading
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+# "<stem>_<n>" as produced by collision renaming
+_SUFFIX_RE = re.compile(r"^(?P<stem>.*)_(?P<n>\d+)$")
+
+
+class _FolderIndex:
+    __slots__ = ("names", "next_suffix")
+
+    def __init__(self, names):
+        self.names = names
+        self.next_suffix = {}  # (stem, ext) -> next free counter
+
+
+class NameIndex:
+    """
+    Names taken in each destination folder, with a next-suffix counter per
+    (stem, extension).
+
+    A folder is listed once on first use and then kept current by the
+    executor's own moves and by watcher events. A collision-free name then
+    costs a set lookup and a counter bump instead of one exists() probe per
+    '_1', '_2', ... candidate.
+    """
+
+    def __init__(self):
+        self._folders = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name):
+        return os.path.normcase(name)
+
+    def _load(self, folder):
+        index = self._folders.get(folder)
+        if index is not None:
+            return index
+
+        try:
+            names = {self._key(name) for name in os.listdir(folder)}
+        except OSError:
+            names = set()
+        index = _FolderIndex(names)
+
+        # Continue numbering after the highest suffix already on disk
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            match = _SUFFIX_RE.match(stem)
+            if match:
+                key = (match.group("stem"), ext)
+                n = int(match.group("n")) + 1
+                if n > index.next_suffix.get(key, 1):
+                    index.next_suffix[key] = n
+
+        self._folders[folder] = index
+        return index
+
+    def reserve(self, folder, filename):
+        """Returns a name that is free in folder and marks it taken."""
+        folder = str(folder)
+        with self._lock:
+            index = self._load(folder)
+            if self._key(filename) not in index.names:
+                index.names.add(self._key(filename))
+                return filename
+
+            stem, ext = os.path.splitext(filename)
+            counter_key = (self._key(stem), self._key(ext))
+            n = index.next_suffix.get(counter_key, 1)
+            candidate = f"{stem}_{n}{ext}"
+            while self._key(candidate) in index.names:
+                n += 1
+                candidate = f"{stem}_{n}{ext}"
+
+            index.next_suffix[counter_key] = n + 1
+            index.names.add(self._key(candidate))
+            return candidate
+
+    def mark_taken(self, path):
+        folder, name = os.path.split(str(path))
+        with self._lock:
+            index = self._folders.get(folder)
+            if index is not None:
+                index.names.add(self._key(name))
+
+    def release(self, path):
+        folder, name = os.path.split(str(path))
+        with self._lock:
+            index = self._folders.get(folder)
+            if index is not None:
+                index.names.discard(self._key(name))
+
+    def observe_event(self, event):
+        """Watcher hook: keeps indexed folders in sync with changes made outside the executor."""
+        if event.event_type in ("created", "moved"):
+            self.mark_taken(getattr(event, "dest_path", None) or event.src_path)
+        if event.event_type in ("deleted", "moved"):
+            self.release(event.src_path)
@@ -0,0 +1,76 @@
+import fnmatch
+import os
+import re
+from src.utils import BoundedTable
+
+# Always ignored: hidden/system files, Office lock files and in-progress downloads
+DEFAULT_IGNORE_PATTERNS = [
+    ".*", "~*", "*.crdownload", "*.part", "*.partial", "*.download", "*.tmp", "*.temp", "*.opdownload",
+]
+
+
+class PathFilter:
+    """
+    Precompiled ignore globs, extension allow-list and size limits, shared by
+    the watcher and SafetyChecker.
+
+    Name rules are decided from the path string alone, so callers can drop
+    temp files before any stat or queueing. Globs are folded into two regexes
+    (one against the filename, one against the full path for patterns with a
+    separator); path-pattern verdicts are cached per directory.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        patterns = DEFAULT_IGNORE_PATTERNS + list(config.get("ignore_patterns", []))
+
+        name_globs = [p for p in patterns if "/" not in p and "\\" not in p]
+        path_globs = [p.replace("\\", "/") for p in patterns if "/" in p or "\\" in p]
+        self._name_regex = self._compile(name_globs)
+        self._path_regex = self._compile(path_globs)
+
+        self.allowed_extensions = {e.lower() for e in config.get("allowed_extensions", [])}
+        self.min_size = config.get("filter_min_size_bytes", 0)
+        max_mb = config.get("filter_max_size_mb")
+        self.max_size = max_mb * 1024 * 1024 if max_mb else None
+
+        self._dir_cache = BoundedTable(max_size=config.get("filter_dir_cache_size", 4096))
+
+    @staticmethod
+    def _compile(globs):
+        if not globs:
+            return None
+        return re.compile("|".join(f"(?:{fnmatch.translate(g)})" for g in globs), re.IGNORECASE)
+
+    def _dir_ignored(self, directory):
+        verdict = self._dir_cache.get(directory)
+        if verdict is None:
+            normalized = directory.replace("\\", "/").rstrip("/") + "/"
+            verdict = bool(self._path_regex and self._path_regex.match(normalized))
+            self._dir_cache.set(directory, verdict)
+        return verdict
+
+    def is_ignored(self, file_path):
+        """Name-only check against the ignore globs; never touches the disk."""
+        directory, name = os.path.split(file_path)
+        if self._name_regex and self._name_regex.match(name):
+            return True
+        if self._path_regex:
+            if self._dir_ignored(directory):
+                return True
+            if self._path_regex.match(file_path.replace("\\", "/")):
+                return True
+        return False
+
+    def passes_name_rules(self, file_path):
+        """Ignore globs plus the extension allow-list, still without touching the disk."""
+        if self.is_ignored(file_path):
+            return False
+        return os.path.splitext(file_path)[1].lower() in self.allowed_extensions
+
+    def passes_size_rules(self, size):
+        if size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        return True
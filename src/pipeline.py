@@ -0,0 +1,235 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.dir_tree import list_directory
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# Concurrent Brain batches per provider; a local Ollama model serializes requests anyway
+DEFAULT_BRAIN_PARALLELISM = {"ollama": 1, "openai": 4}
+
+
+class ScanPipeline:
+    """
+    Staged scan of the watch paths.
+
+    A producer thread walks the directory tree (in parallel, down to each
+    root's depth limit) and enumerates files, a pool of extractor threads builds
+    their contexts, and the calling thread groups contexts into Brain batches
+    that run with bounded concurrency. Stages are joined by bounded queues, so
+    a slow Brain throttles enumeration instead of buffering the whole tree.
+    Decisions are handed to the system as soon as their batch completes.
+
+    With a scan index only new or modified files enter the pipeline; the
+    system keeps or re-suggests the stored decisions of the unchanged ones.
+    """
+
+    def __init__(self, system, index=None):
+        self.system = system
+        self.index = index if index is not None and index.enabled else None
+        config = system.config
+        # Extractor threads mostly wait on the extraction pool; enough of them to keep every process busy
+        self.extract_workers = max(1, config.get("scan_extract_workers", max(4, system.extraction.processes * 2)))
+        self.batch_size = max(1, config.get("brain_batch_size", 8))
+        self.queue_size = max(1, config.get("scan_queue_size", 64))
+
+        limits = dict(DEFAULT_BRAIN_PARALLELISM)
+        limits.update(config.get("scan_brain_parallelism", {}))
+        provider = config.get("ai_provider", "openai")
+        self.brain_parallelism = max(1, int(limits.get(provider, 1)))
+
+        self._cancel = threading.Event()
+        self.enumerated = 0
+        self.unchanged = 0
+        self.directories = 0
+        self._signatures = {}  # path -> signature for files the index should record
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _put(self, q, item):
+        """Blocking put that gives up once the scan is cancelled."""
+        while not self._cancel.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        """Blocking get that returns None once the scan is cancelled."""
+        while not self._cancel.is_set():
+            try:
+                return q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        return None
+
+    def _changed_records(self, dir_path, records, override_mode):
+        """FileRecords to process in dir_path; with the index, unchanged files are settled right here."""
+        if self.index is None:
+            return records
+
+        changed, unchanged, removed = self.index.diff_directory(dir_path, records)
+        self.unchanged += len(unchanged)
+        # Suggestions for files that changed or vanished are stale
+        self.system._drop_pending([record.path for record in changed] + removed)
+        self.system._reuse_decisions(unchanged, override_mode)
+        for record in changed:
+            self._signatures[record.path] = record.signature
+        return changed
+
+    def _produce(self, tree, paths_q, override_mode):
+        try:
+            list_dir = self.index.list_directory if self.index is not None else list_directory
+            visited = set()
+            for dir_path, records in tree.walk(list_dir, cancelled=self._cancel.is_set):
+                visited.add(dir_path)
+                for record in self._changed_records(dir_path, records, override_mode):
+                    if self._cancel.is_set():
+                        return
+                    if not self._put(paths_q, record):
+                        return
+                    self.enumerated += 1
+                self.directories += 1
+
+            if self.index is not None and not self._cancel.is_set():
+                # Folders that were deleted, excluded or fell out of the depth limit
+                self.system._drop_pending(self.index.forget_outside(visited))
+        except Exception as e:
+            logger.error(f"Scan enumeration failed: {e}")
+        finally:
+            for _ in range(self.extract_workers):
+                self._put(paths_q, _DONE)
+
+    def _extract(self, paths_q, contexts_q):
+        # Records are taken a few at a time, so the extraction pool gets them in one round trip
+        chunk_size = self.system.extraction.chunk_size
+        while True:
+            record = self._get(paths_q)
+            if record is None:
+                return
+            chunk = []
+            while record is not _DONE:
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    break
+                try:
+                    record = paths_q.get_nowait()
+                except queue.Empty:
+                    break
+
+            if chunk and not self._extract_chunk(chunk, contexts_q):
+                return
+            if record is _DONE:
+                self._put(contexts_q, _DONE)
+                return
+
+    def _extract_chunk(self, records, contexts_q):
+        system = self.system
+        admitted = []
+        for record in records:
+            try:
+                if system._admit(record):
+                    admitted.append(record)
+                else:
+                    # Filtered out (unsafe, ignored type, vanished): nothing to decide until it changes
+                    self._record([(record.path, None)])
+            except Exception as e:
+                logger.error(f"Failed to extract context for {record.path}: {e}")
+
+        # Files whose extraction failed or timed out stay unindexed and come up again
+        try:
+            items = [system._build_context(record, extracted)
+                     for record, extracted in zip(admitted, system.extraction.extract_many(admitted))]
+        except Exception as e:
+            logger.error(f"Failed to extract context for {len(admitted)} files: {e}")
+            return True
+        for item in items:
+            if item and not self._put(contexts_q, item):
+                return False
+        return True
+
+    def _record(self, results):
+        if self.index is None:
+            return
+        self.index.record([
+            (path, self._signatures.pop(path), decision)
+            for path, decision in results if path in self._signatures
+        ])
+
+    def _decide_batch(self, batch, override_mode):
+        try:
+            decisions = self.system._decide(batch, override_mode)
+            for (file_path, context, *_), decision in zip(batch, decisions):
+                self.system._apply_decision(file_path, decision, override_mode, context)
+            # Files without an answer (Brain failed or deferred) stay unindexed and come up again
+            self._record([
+                (file_path, decision) for (file_path, *_), decision in zip(batch, decisions)
+                if decision and isinstance(decision, dict)
+            ])
+        except Exception as e:
+            logger.error(f"Scan batch of {len(batch)} files failed: {e}")
+
+    def _submit(self, pool, in_flight, batch, override_mode):
+        # Backpressure: wait for a free Brain slot before taking on more work
+        while not in_flight.acquire(timeout=0.2):
+            if self._cancel.is_set():
+                return
+        future = pool.submit(self._decide_batch, batch, override_mode)
+        future.add_done_callback(lambda _: in_flight.release())
+
+    def run(self, tree, override_mode="suggest"):
+        """Scans the directory tree and blocks until every decision is handled or the scan is cancelled."""
+        paths_q = queue.Queue(maxsize=self.queue_size)
+        contexts_q = queue.Queue(maxsize=self.queue_size)
+
+        producer = threading.Thread(
+            target=self._produce, args=(tree, paths_q, override_mode), name="ScanProducer", daemon=True
+        )
+        extractors = [
+            threading.Thread(target=self._extract, args=(paths_q, contexts_q), name=f"ScanExtract-{i}", daemon=True)
+            for i in range(self.extract_workers)
+        ]
+
+        logger.info(f"Scan pipeline: {self.extract_workers} extractors, "
+                     f"{self.brain_parallelism} concurrent Brain batches of {self.batch_size}.")
+
+        producer.start()
+        for t in extractors:
+            t.start()
+
+        in_flight = threading.BoundedSemaphore(self.brain_parallelism)
+        with ThreadPoolExecutor(max_workers=self.brain_parallelism, thread_name_prefix="ScanBrain") as pool:
+            batch = []
+            finished = 0
+            while finished < len(extractors):
+                item = self._get(contexts_q)
+                if item is None:
+                    break
+                if item is _DONE:
+                    finished += 1
+                    continue
+
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._submit(pool, in_flight, batch, override_mode)
+                    batch = []
+
+            if batch and not self._cancel.is_set():
+                self._submit(pool, in_flight, batch, override_mode)
+
+        producer.join()
+        for t in extractors:
+            t.join()
+
+        return self.enumerated
@@ -0,0 +1,224 @@
+import re
+import threading
+from pathlib import PureWindowsPath
+from src.extractors import excerpt_has_signal
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+# extension -> (category, folder, confidence)
+EXTENSION_RULES = {
+    # Images
+    ".png": ("Images", "Images", 0.95),
+    ".jpg": ("Images", "Images/Photos", 0.95),
+    ".jpeg": ("Images", "Images/Photos", 0.95),
+    ".gif": ("Images", "Images", 0.95),
+    ".bmp": ("Images", "Images", 0.95),
+    ".webp": ("Images", "Images", 0.95),
+    ".heic": ("Images", "Images/Photos", 0.95),
+    ".svg": ("Images", "Images/Design", 0.93),
+    # 3D models and CAD (FabLab)
+    ".stl": ("Images", "Images/3D Models", 0.95),
+    ".obj": ("Images", "Images/3D Models", 0.92),
+    ".3mf": ("Images", "Images/3D Models", 0.95),
+    ".step": ("Images", "Images/3D Models", 0.93),
+    ".stp": ("Images", "Images/3D Models", 0.93),
+    ".f3d": ("Images", "Images/3D Models", 0.95),
+    ".dxf": ("Images", "Images/CAD", 0.93),
+    # Machine and microcontroller code (FabLab)
+    ".gcode": ("Code", "Code/G-code", 0.93),
+    ".ino": ("Code", "Code/Arduino", 0.95),
+    # Documents
+    ".pdf": ("Documents", "Documents/PDFs", 0.93),
+    ".docx": ("Documents", "Documents/Word", 0.95),
+    ".doc": ("Documents", "Documents/Word", 0.95),
+    ".odt": ("Documents", "Documents/Word", 0.93),
+    ".xlsx": ("Documents", "Documents/Spreadsheets", 0.95),
+    ".xls": ("Documents", "Documents/Spreadsheets", 0.95),
+    ".csv": ("Documents", "Documents/Spreadsheets", 0.9),
+    ".pptx": ("Documents", "Documents/Presentations", 0.95),
+    ".ppt": ("Documents", "Documents/Presentations", 0.95),
+    ".txt": ("Documents", "Documents/Text", 0.9),
+    ".md": ("Documents", "Documents/Text", 0.9),
+}
+
+# Formats whose excerpt (document properties, slicer headers, solid names...) can tell the
+# Brain more than the extension does; the extension rule defers when the excerpt carries any
+EXCERPT_EXTENSIONS = {".pdf", ".docx", ".xlsx", ".pptx", ".stl", ".dxf", ".gcode"}
+
+# Shortcut target executable (lower-case basename) -> category
+SHORTCUT_TARGETS = {
+    # Gaming
+    "steam.exe": "Gaming", "robloxplayerbeta.exe": "Gaming", "robloxplayerlauncher.exe": "Gaming",
+    "epicgameslauncher.exe": "Gaming", "battle.net launcher.exe": "Gaming", "battle.net.exe": "Gaming",
+    "minecraftlauncher.exe": "Gaming", "riotclientservices.exe": "Gaming", "xboxpcapp.exe": "Gaming",
+    "rockstarservice.exe": "Gaming", "playgtav.exe": "Gaming",
+    # Productivity
+    "winword.exe": "Productivity", "excel.exe": "Productivity", "powerpnt.exe": "Productivity",
+    "onenote.exe": "Productivity", "obsidian.exe": "Productivity", "notion.exe": "Productivity",
+    "figma.exe": "Productivity", "ms-teams.exe": "Productivity", "teams.exe": "Productivity",
+    "slack.exe": "Productivity", "soffice.exe": "Productivity", "acrylic.exe": "Productivity",
+    # Apps
+    "chrome.exe": "Apps", "msedge.exe": "Apps", "firefox.exe": "Apps", "discord.exe": "Apps",
+    "spotify.exe": "Apps", "telegram.exe": "Apps", "docker desktop.exe": "Apps", "claude.exe": "Apps",
+    "vlc.exe": "Apps", "7zfm.exe": "Apps", "winrar.exe": "Apps", "notepad++.exe": "Apps",
+    "antigravity.exe": "Apps",
+    # Code
+    "code.exe": "Code", "pycharm64.exe": "Code", "nmap.exe": "Code", "zenmap.exe": "Code",
+    "wireshark.exe": "Code", "git-bash.exe": "Code", "postman.exe": "Code", "arduino ide.exe": "Code",
+    "arduino.exe": "Code", "windowsterminal.exe": "Code", "wt.exe": "Code", "powershell.exe": "Code",
+    "cmd.exe": "Code",
+}
+
+# Shortcut name keyword -> category, used when the target can't be resolved
+SHORTCUT_KEYWORDS = {
+    "Gaming": ["steam", "roblox", "rockstar", "epic games", "battle.net", "xbox", "minecraft",
+               "valorant", "fortnite", "riot client"],
+    "Productivity": ["word", "excel", "powerpoint", "obsidian", "notion", "figma", "acrylic",
+                     "libreoffice", "onenote", "teams", "slack"],
+    "Apps": ["chrome", "edge", "firefox", "discord", "spotify", "telegram", "docker", "claude",
+             "vlc", "7-zip", "winrar", "notepad++"],
+    "Code": ["visual studio code", "vs code", "pycharm", "nmap", "zenmap", "wireshark", "git bash",
+             "postman", "arduino", "terminal", "powershell"],
+}
+
+# (compiled filename regex, category, folder, confidence, tag); first match wins
+FILENAME_RULES = [
+    (re.compile(r"^(screenshot|screen shot|capture d.?[ée]cran)", re.I), "Images", "Images/Screenshots", 0.97, "screenshot"),
+    (re.compile(r"^(img|dsc|pxl|dcim)[_-]?\d{3,}", re.I), "Images", "Images/Photos", 0.95, "photo"),
+    (re.compile(r"(invoice|facture|receipt|re[çc]u)", re.I), "Documents", "Documents/Invoices", 0.92, "invoice"),
+    (re.compile(r"(^|[^a-z])(cv|resume|r[ée]sum[ée])([^a-z]|$)", re.I), "Documents", "Documents/CV", 0.9, "cv"),
+]
+
+# Only apply filename rules to files whose extension agrees with the rule's category
+_RULE_EXTENSIONS = {
+    "Images": {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".heic"},
+    "Documents": {".pdf", ".docx", ".doc", ".odt", ".xlsx", ".xls", ".csv", ".txt", ".md"},
+}
+
+
+# "[Category]-Name.lnk", as shortcuts are branded when they are organised in place
+_BRANDED_RE = re.compile(r"^\[[^\]]+\]-")
+
+
+def is_branded(name):
+    """True for a shortcut name Vortex has already branded; such a shortcut is done, not to be filed again."""
+    return bool(_BRANDED_RE.match(name))
+
+
+def clean_filename(name):
+    """Applies the prompt's naming rule: spaces to underscores, drop special characters, keep the extension."""
+    if name.startswith("["):
+        # Already branded by a previous run
+        return name
+    cleaned = re.sub(r"[^\w.\-]", "", name.replace(" ", "_"))
+    return cleaned or name
+
+
+class PreClassifier:
+    """
+    Deterministic rules that decide obvious files locally.
+    Returns a decision shaped like a Brain answer, or None when the file is
+    ambiguous (or the best rule is below min_confidence) and should go to the Brain.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.enabled = config.get("preclassifier_enabled", True)
+        self.min_confidence = config.get("preclassifier_min_confidence", 0.9)
+        self.defer_to_excerpts = config.get("preclassifier_defer_to_excerpts", True)
+
+        self.stats = {"extension": 0, "shortcut_target": 0, "shortcut_name": 0, "filename": 0, "escalated": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    @property
+    def calls_avoided(self):
+        return sum(v for k, v in self.stats.items() if k != "escalated")
+
+    def _classify_shortcut(self, context):
+        target = context.get("shortcut_target")
+        if target:
+            category = SHORTCUT_TARGETS.get(PureWindowsPath(target).name.lower())
+            if category:
+                return category, category, 0.97, "shortcut_target"
+
+        stem = context.get("filename", "").rsplit(".", 1)[0].lower()
+        for category, keywords in SHORTCUT_KEYWORDS.items():
+            for keyword in keywords:
+                if re.search(rf"(^|[^a-z]){re.escape(keyword)}($|[^a-z])", stem):
+                    return category, category, 0.9, "shortcut_name"
+        return None
+
+    def _classify_file(self, context):
+        filename = context.get("filename", "")
+        extension = context.get("extension", "")
+
+        for pattern, category, folder, confidence, tag in FILENAME_RULES:
+            if extension in _RULE_EXTENSIONS.get(category, ()) and pattern.search(filename):
+                return category, folder, confidence, "filename", tag
+
+        rule = EXTENSION_RULES.get(extension)
+        if rule:
+            category, folder, confidence = rule
+            return category, folder, confidence, "extension", extension.lstrip(".")
+        return None
+
+    def _match(self, context):
+        """(category, folder, confidence, kind, tags) of the best rule, or None."""
+        if context.get("extension") == ".lnk":
+            match = self._classify_shortcut(context)
+            if match:
+                category, folder, confidence, kind = match
+                return category, folder, confidence, kind, ["shortcut"]
+            return None
+        match = self._classify_file(context)
+        if not match:
+            return None
+        category, folder, confidence, kind, tag = match
+        if kind == "extension" and self._defers(context) and excerpt_has_signal(context["extension"], context.get("text_excerpt")):
+            # The excerpt says more than the extension; let the Brain read it
+            return None
+        return category, folder, confidence, kind, [tag]
+
+    def _defers(self, context):
+        return self.defer_to_excerpts and context.get("extension") in EXCERPT_EXTENSIONS
+
+    def needs_excerpt(self, context):
+        """False when the file will be decided on its name alone, so its contents needn't be read."""
+        if not self.enabled or context.get("is_directory"):
+            return True
+        match = self._match(context)
+        if not match or match[2] < self.min_confidence:
+            return True
+        return match[3] == "extension" and self._defers(context)
+
+    def classify(self, context):
+        if not self.enabled or context.get("is_directory"):
+            return None
+
+        match = self._match(context)
+        if not match or match[2] < self.min_confidence:
+            self._count("escalated")
+            return None
+
+        category, folder, confidence, kind, tags = match
+        self._count(kind)
+        return {
+            "category": category,
+            "confidence": confidence,
+            "suggested_name": clean_filename(context.get("filename", "")),
+            "folder": folder,
+            "tags": tags
+        }
+
+    def summary(self):
+        decided = self.calls_avoided
+        total = decided + self.stats["escalated"]
+        rate = (decided / total * 100) if total else 0.0
+        return (f"calls_avoided={decided} escalated={self.stats['escalated']} ({rate:.1f}% decided locally; "
+                f"extension={self.stats['extension']} filename={self.stats['filename']} "
+                f"shortcut_target={self.stats['shortcut_target']} shortcut_name={self.stats['shortcut_name']})")
@@ -1,6 +1,9 @@
 import os
 import datetime
+import hashlib
 from pathlib import Path
+from src.extractors import ExcerptExtractor
+from src.file_record import FileRecord
 
 # Windows specific for shortcuts
 try:
@@ -13,25 +16,34 @@ except ImportError:
 class FileProcessor:
     def __init__(self, config):
         self.config = config
-        self.max_file_size = config.get("max_file_size_mb", 50) * 1024 * 1024
+        self.extractor = ExcerptExtractor(config)
+        # Caps what one file costs to hash; see content_hash
+        self.hash_max_bytes = int(config.get("extract_max_read_mb", 256) * 1024 * 1024)
+
+    @staticmethod
+    def _record(file_path):
+        """Accepts a FileRecord or a path (which is stat'ed once)."""
+        if isinstance(file_path, FileRecord):
+            return file_path
+        return FileRecord.load(file_path)
 
     def get_metadata(self, file_path):
-        path = Path(file_path)
-        if not path.exists():
+        record = self._record(file_path)
+        if record is None:
             return None
 
-        stat = path.stat()
+        path = Path(record.path)
         metadata = {
-            "filename": path.name,
-            "extension": path.suffix.lower(),
-            "created_at": datetime.datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d'),
-            "size_bytes": stat.st_size,
+            "filename": record.name,
+            "extension": record.extension,
+            "created_at": datetime.datetime.fromtimestamp(record.ctime).strftime('%Y-%m-%d'),
+            "size_bytes": record.size,
             "path": str(path.absolute()),
-            "is_directory": path.is_dir()
+            "is_directory": record.is_dir
         }
 
         # Resolve shortcuts on Windows
-        if HAS_PYWIN32 and path.suffix.lower() == '.lnk':
+        if HAS_PYWIN32 and record.extension == '.lnk':
             try:
                 pythoncom.CoInitialize()
                 shell = win32com.client.Dispatch("WScript.Shell")
@@ -45,23 +57,51 @@ class FileProcessor:
         return metadata
 
     def extract_excerpt(self, file_path):
-        path = Path(file_path)
-        if not path.exists():
+        """Bounded, format-aware excerpt (see src/extractors.py); "" when there is nothing to show."""
+        record = self._record(file_path)
+        if record is None or record.is_dir:
             return ""
+        return self.extractor.extract(record)
 
-        # Skip if too large
-        if path.stat().st_size > self.max_file_size:
-            return ""
+    def read_limit(self, record):
+        """The most bytes extract_excerpt and content_hash read from a file this size."""
+        if record.is_dir:
+            return 0
+        excerpt = min(record.size, self.extractor.head_bytes + self.extractor.tail_bytes)
+        return excerpt + min(record.size, self.hash_max_bytes)
 
-        # Only try to read text from likely text files
-        text_extensions = {'.txt', '.md', '.csv', '.json', '.xml', '.logger', '.log'}
-        if path.suffix.lower() not in text_extensions:
-             # Basic support for reading the beginning of a file as a fallback, 
-             # but keeping it safe (binary files might output garbage)
-             return ""
+    def content_hash(self, file_path):
+        """
+        Returns the SHA-256 of the file's bytes, or None for directories and
+        unreadable files. Files over hash_max_bytes are hashed from their
+        size, first and last hash_max_bytes / 2 instead of being read whole.
+        """
+        record = self._record(file_path)
+        if record is None or record.is_dir:
+            return None
 
+        digest = hashlib.sha256()
         try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read(1000) # Read first 1000 chars
+            with open(record.path, 'rb') as f:
+                if record.size <= self.hash_max_bytes:
+                    self._hash_bytes(digest, f, self.hash_max_bytes)
+                    return digest.hexdigest()
+
+                half = self.hash_max_bytes // 2
+                digest.update(f"sampled:{record.size}:".encode())
+                self._hash_bytes(digest, f, half)
+                f.seek(record.size - half)
+                self._hash_bytes(digest, f, half)
         except Exception:
-            return ""
+            return None
+        return digest.hexdigest()
+
+    @staticmethod
+    def _hash_bytes(digest, f, limit):
+        """Feeds up to limit bytes from f into digest, 1 MiB at a time."""
+        while limit > 0:
+            chunk = f.read(min(limit, 1024 * 1024))
+            if not chunk:
+                return
+            digest.update(chunk)
+            limit -= len(chunk)
@@ -0,0 +1,158 @@
+import asyncio
+import time
+import aiohttp
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+# Statuses meaning the provider is up but our credentials are wrong
+AUTH_ERRORS = (401, 403)
+
+
+class ProviderStatus:
+    __slots__ = ("provider", "base_url", "available", "latency_ms", "models", "error", "config_error", "checked_at")
+
+    def __init__(self, provider, base_url, available=False, latency_ms=None, models=None, error=None,
+                 config_error=False):
+        self.provider = provider
+        self.base_url = base_url
+        self.available = available
+        self.latency_ms = latency_ms
+        self.models = models or []
+        self.error = error
+        # Up but refusing us (no key, bad key): waiting won't help, so nothing is queued for retry
+        self.config_error = config_error
+        self.checked_at = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.checked_at
+
+    def to_dict(self):
+        return {
+            "provider": self.provider,
+            "base_url": self.base_url,
+            "available": self.available,
+            "latency_ms": self.latency_ms,
+            "models": list(self.models),
+            "error": self.error,
+            "config_error": self.config_error
+        }
+
+
+class ProviderHealth:
+    """
+    Availability, latency and model lists per provider base URL.
+
+    Probes are short (probe_timeout) and results are cached: a healthy
+    provider for ttl seconds, a failing one for down_ttl seconds, during
+    which callers fail fast instead of waiting out a full request timeout.
+    Real request outcomes feed the same state via report_success/failure.
+    Only use it from the shared Brain event loop.
+    """
+
+    _instance = None
+
+    def __init__(self, ttl=60.0, down_ttl=15.0, probe_timeout=3.0):
+        self.ttl = ttl
+        self.down_ttl = down_ttl
+        self.probe_timeout = probe_timeout
+        self._status = {}    # base_url -> ProviderStatus
+        self._inflight = {}  # base_url -> probe task, so concurrent checks share one request
+        self._auth = {}      # base_url -> Authorization header of the last probe
+
+    @classmethod
+    def get(cls, config=None):
+        if cls._instance is None:
+            config = config or {}
+            cls._instance = cls(
+                ttl=config.get("provider_health_ttl_seconds", 60.0),
+                down_ttl=config.get("provider_health_down_seconds", 15.0),
+                probe_timeout=config.get("provider_probe_timeout", 3.0)
+            )
+        return cls._instance
+
+    def status(self, base_url):
+        return self._status.get(base_url)
+
+    def is_fresh(self, status):
+        return status.age() < (self.ttl if status.available else self.down_ttl)
+
+    async def check(self, provider, base_url, headers, force=False):
+        """Returns a fresh ProviderStatus, probing the endpoint only when the cached one is stale."""
+        status = self._status.get(base_url)
+        auth = headers.get("Authorization") if headers else None
+        if status and status.config_error and self._auth.get(base_url) != auth:
+            # Credentials changed since they were refused; don't hold the old answer against the new ones
+            status = None
+        if status and not force and self.is_fresh(status):
+            return status
+
+        task = self._inflight.get(base_url)
+        if task is None:
+            task = asyncio.ensure_future(self._probe(provider, base_url, headers))
+            self._inflight[base_url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(base_url, None))
+        return await task
+
+    async def _probe(self, provider, base_url, headers):
+        self._auth[base_url] = headers.get("Authorization") if headers else None
+        if headers is None:
+            status = ProviderStatus(provider, base_url, error="not configured", config_error=True)
+            self._status[base_url] = status
+            return status
+
+        if provider == "ollama":
+            # Ollama's native API lists installed models; the OpenAI-compatible one lives under /v1
+            url = base_url.rstrip("/").removesuffix("/v1") + "/api/tags"
+        else:
+            url = f"{base_url}/models"
+
+        started = time.monotonic()
+        try:
+            # Own short-lived session: a probe must not queue behind a saturated request pool
+            timeout = aiohttp.ClientTimeout(total=self.probe_timeout)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(url, headers=headers) as response:
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+        except aiohttp.ClientResponseError as e:
+            config_error = e.status in AUTH_ERRORS
+            error = f"authentication failed (HTTP {e.status}); check the API key" if config_error else str(e)
+            status = ProviderStatus(provider, base_url, error=error, config_error=config_error)
+        except Exception as e:
+            status = ProviderStatus(provider, base_url, error=str(e) or type(e).__name__)
+        else:
+            latency_ms = int((time.monotonic() - started) * 1000)
+            if provider == "ollama":
+                models = [m["name"] for m in data.get("models", [])]
+            else:
+                models = sorted(m["id"] for m in data.get("data", []) if m.get("id", "").startswith("gpt"))
+            status = ProviderStatus(provider, base_url, available=True, latency_ms=latency_ms, models=models)
+
+        previous = self._status.get(base_url)
+        if not previous or previous.available != status.available:
+            state = f"available ({status.latency_ms} ms)" if status.available else f"unavailable: {status.error}"
+            logger.info(f"Provider {provider} at {base_url} {state}")
+        self._status[base_url] = status
+        return status
+
+    def report_success(self, provider, base_url, latency_ms):
+        status = self._status.get(base_url)
+        models = status.models if status else []
+        self._status[base_url] = ProviderStatus(provider, base_url, available=True, latency_ms=latency_ms, models=models)
+
+    def report_config_error(self, provider, base_url, error):
+        """Marks the provider as refusing our credentials after a real request got a 401/403."""
+        status = self._status.get(base_url)
+        if status is None or not status.config_error:
+            logger.error(f"Provider {provider} at {base_url} rejected the request: {error}")
+        models = status.models if status else []
+        self._status[base_url] = ProviderStatus(provider, base_url, models=models, error=str(error), config_error=True)
+
+    def report_failure(self, provider, base_url, error):
+        """Marks the provider down after a connection-level failure, so the next calls fail fast."""
+        status = self._status.get(base_url)
+        if status is None or status.available:
+            logger.warning(f"Provider {provider} at {base_url} marked unavailable: {error}")
+        models = status.models if status else []
+        self._status[base_url] = ProviderStatus(provider, base_url, models=models, error=str(error) or type(error).__name__)
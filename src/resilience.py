@@ -0,0 +1,201 @@
+import asyncio
+import random
+import re
+import time
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+# Per-minute limits are what OpenAI reports in x-ratelimit-limit-*
+RATE_WINDOW_SECONDS = 60.0
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class BrainUnavailableError(Exception):
+    """The Brain could not be asked right now (provider down, circuit open, retries exhausted); try again later."""
+
+
+def parse_duration(value):
+    """Parses OpenAI reset durations such as '1s', '6m0s' or '120ms' into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """Refills at rate units/second up to capacity; unlimited until a limit is learned."""
+
+    def __init__(self):
+        self.capacity = None
+        self.rate = None
+        self.tokens = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def update(self, limit, remaining):
+        self._refill()
+        first = self.capacity is None
+        self.capacity = float(limit)
+        self.rate = self.capacity / RATE_WINDOW_SECONDS
+        # The server's count is authoritative; never trust a fuller local bucket
+        self.tokens = float(remaining) if first else min(self.tokens, float(remaining))
+
+    def drain(self):
+        self._refill()
+        self.tokens = 0.0
+
+    def wait_time(self, cost):
+        """Seconds until cost units are available (0 when they are now)."""
+        self._refill()
+        if self.capacity is None:
+            return 0.0
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def take(self, cost):
+        if self.capacity is not None:
+            self.tokens -= min(cost, self.capacity)
+
+
+class RateLimiter:
+    """
+    Request and token buckets for one provider, sized from the rate-limit
+    response headers, so concurrent callers settle at the sustainable rate
+    instead of bursting into 429s. Only use it from the shared Brain loop.
+    """
+
+    def __init__(self):
+        self.requests = TokenBucket()
+        self.tokens = TokenBucket()
+        self._paused_until = 0.0
+
+    async def acquire(self, token_cost):
+        while True:
+            pause = self._paused_until - time.monotonic()
+            wait = max(pause, self.requests.wait_time(1), self.tokens.wait_time(token_cost))
+            if wait <= 0:
+                self.requests.take(1)
+                self.tokens.take(token_cost)
+                return
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers):
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if limit and remaining:
+                try:
+                    bucket.update(int(limit), int(remaining))
+                except ValueError:
+                    pass
+
+    def pause(self, seconds):
+        """After a 429 nobody sends until the server's window has moved on."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.requests.drain()
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `cooldown` seconds; then lets a single trial call through (half-open)
+    and closes again on its success.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, threshold=5, cooldown=30.0):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def allow(self):
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_running = False
+        if self._trial_running:
+            return False
+        self._trial_running = True
+        return True
+
+    def allow_retry(self):
+        """False once the breaker has opened, so callers stop retrying into it."""
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed again.")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_running = False
+
+    def record_throttled(self):
+        """A 429: the provider is up and only asked to slow down, so it neither counts as a failure nor closes the circuit."""
+        self.release()
+
+    def release(self):
+        """The call ended without a verdict on the provider (e.g. it was cancelled); the next one may be the trial."""
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_running = False
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failures; pausing {self.cooldown:g}s.")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+# One limiter and breaker per provider base URL, shared by every client on the loop
+_limiters = {}
+_breakers = {}
+
+
+def limiter_for(base_url):
+    limiter = _limiters.get(base_url)
+    if limiter is None:
+        limiter = _limiters[base_url] = RateLimiter()
+    return limiter
+
+
+def breaker_for(base_url, config):
+    breaker = _breakers.get(base_url)
+    if breaker is None:
+        breaker = _breakers[base_url] = CircuitBreaker(
+            base_url,
+            threshold=config.get("brain_breaker_threshold", 5),
+            cooldown=config.get("brain_breaker_cooldown_seconds", 30.0)
+        )
+    return breaker
@@ -0,0 +1,129 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+
+class RetryQueue:
+    """
+    Disk-backed queue of files the Brain could not be asked about.
+
+    A file is re-attempted after retry_base_seconds, doubling per attempt up
+    to retry_max_delay_seconds, and given up after retry_max_attempts. The
+    queued paths are mirrored in memory, so checking whether a decided file
+    needs removing never touches the database.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.enabled = config.get("retry_queue_enabled", True)
+        self.db_path = Path(config.get("retry_queue_path", "retry_queue.db"))
+        self.base_delay = config.get("retry_base_seconds", 30)
+        self.max_delay = config.get("retry_max_delay_seconds", 3600)
+        self.max_attempts = config.get("retry_max_attempts", 8)
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._paths = set()
+
+        if self.enabled:
+            self._open()
+
+    def _open(self):
+        try:
+            # Written by the scan stages and the watcher, drained by the retry thread
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS retries ("
+                " path TEXT PRIMARY KEY,"
+                " mode TEXT,"
+                " attempts INTEGER NOT NULL,"
+                " next_attempt REAL NOT NULL,"
+                " last_error TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_retries_next ON retries(next_attempt)")
+            self._conn.commit()
+            self._paths = {row[0] for row in self._conn.execute("SELECT path FROM retries")}
+            if self._paths:
+                logger.info(f"Retry queue opened: {self.db_path} ({len(self._paths)} files waiting)")
+        except Exception as e:
+            logger.error(f"Failed to open retry queue, continuing without it: {e}")
+            self._conn = None
+            self.enabled = False
+
+    def __len__(self):
+        return len(self._paths)
+
+    def _delay(self, attempts):
+        return min(self.max_delay, self.base_delay * (2 ** attempts))
+
+    def add(self, paths, mode=None, error=None):
+        """Queues files for a later attempt; files already queued keep their attempt count."""
+        if not self.enabled or not paths:
+            return
+        now = time.time()
+        with self._lock:
+            for path in paths:
+                self._conn.execute(
+                    "INSERT INTO retries (path, mode, attempts, next_attempt, last_error) VALUES (?, ?, 0, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET last_error = excluded.last_error, "
+                    " next_attempt = MAX(next_attempt, excluded.next_attempt)",
+                    (path, mode, now + self.base_delay, error)
+                )
+                self._paths.add(path)
+            self._conn.commit()
+
+    def discard(self, paths):
+        """Drops files that got a decision (or can't be processed any more)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            queued = [p for p in paths if p in self._paths]
+            if not queued:
+                return
+            self._conn.executemany("DELETE FROM retries WHERE path = ?", [(p,) for p in queued])
+            self._conn.commit()
+            self._paths.difference_update(queued)
+
+    def take_due(self, limit=32):
+        """
+        Returns up to `limit` (path, mode) pairs whose retry time has come and
+        pushes their next attempt back by the backoff, so a file that fails
+        again (or is never decided) isn't picked up again right away.
+        """
+        if not self.enabled or not self._paths:
+            return []
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, mode, attempts FROM retries WHERE next_attempt <= ? ORDER BY next_attempt LIMIT ?",
+                (now, limit)
+            ).fetchall()
+
+            due = []
+            for path, mode, attempts in rows:
+                attempts += 1
+                if attempts > self.max_attempts:
+                    logger.warning(f"Giving up on {path} after {self.max_attempts} Brain retries.")
+                    self._conn.execute("DELETE FROM retries WHERE path = ?", (path,))
+                    self._paths.discard(path)
+                    continue
+                self._conn.execute(
+                    "UPDATE retries SET attempts = ?, next_attempt = ? WHERE path = ?",
+                    (attempts, now + self._delay(attempts), path)
+                )
+                due.append((path, mode))
+            self._conn.commit()
+        return due
+
+    def close(self):
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+                self.enabled = False
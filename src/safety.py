@@ -1,24 +1,35 @@
 from pathlib import Path
+from src.file_record import FileRecord
+from src.path_filter import PathFilter
 
 class SafetyChecker:
-    def __init__(self, config):
+    def __init__(self, config, path_filter=None):
         self.config = config
-        self.allowed_extensions = set(config.get("allowed_extensions", []))
-        self.safe_root = Path(config.get("safe_root", "C:/Users/Velix/Documents"))
+        self.path_filter = path_filter or PathFilter(config)
+        self.allowed_extensions = self.path_filter.allowed_extensions
+        # (configured safe_root, its resolved path); resolved again whenever the setting changes
+        self._resolved_root = None
+
+    @property
+    def safe_root(self):
+        return Path(self.config.get("safe_root", "C:/Users/Velix/Documents"))
 
     def is_safe_file(self, file_path):
-        path = Path(file_path)
-        
-        # Rule: Must exist
-        if not path.exists():
-            return False
+        """Takes a path or a FileRecord; a record's stat is reused instead of asking the disk again."""
+        record = file_path if isinstance(file_path, FileRecord) else None
+        file_path = record.path if record else str(file_path)
 
-        # Rule: Allowed extension
-        if path.suffix.lower() not in self.allowed_extensions:
+        # Rule: Allowed extension, not a system/temp file (decided from the name alone)
+        if not self.path_filter.passes_name_rules(file_path):
             return False
 
-        # Rule: Not a system file (simple check)
-        if path.name.startswith('.') or path.name.startswith('~'):
+        # Rule: Must exist (single stat, also used for the size limits)
+        if record is None:
+            record = FileRecord.load(file_path)
+            if record is None:
+                return False
+
+        if not record.is_dir and not self.path_filter.passes_size_rules(record.size):
             return False
 
         return True
@@ -29,9 +40,15 @@ class SafetyChecker:
         try:
             # resolve() handles symlinks and relative paths
             # is_relative_to ensures it's inside the root
-            if not dest_path.resolve().is_relative_to(self.safe_root.resolve()):
+            if not dest_path.resolve().is_relative_to(self._root()):
                 return False
         except ValueError:
             return False
 
         return True
+
+    def _root(self):
+        safe_root = self.safe_root
+        if self._resolved_root is None or self._resolved_root[0] != safe_root:
+            self._resolved_root = (safe_root, safe_root.resolve())
+        return self._resolved_root[1]
@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from src.dir_tree import list_directory
+from src.file_record import FileRecord
+from src.utils import setup_logging
+
+logger = setup_logging()
+
+
+class ScanIndex:
+    """
+    Disk-backed record of what the last scans saw and decided.
+
+    Files are keyed on their path and remembered with (size, mtime, inode)
+    and the decision they got; directories with their mtime and listing, so
+    an unchanged directory is not even listed again. A rescan only hands new
+    or modified files to the pipeline. The whole index is dropped when the
+    settings that shape decisions (filters, targets, provider/model/prompt)
+    change, as recorded by a fingerprint.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.enabled = config.get("scan_index_enabled", True)
+        self.db_path = Path(config.get("scan_index_path", "scan_index.db"))
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._files = {}  # path -> (signature, decision or None)
+        self._by_dir = {}  # dir path -> set of file paths in _files
+        self._dirs = {}   # dir path -> (mtime_ns, {"files": [names], "dirs": [names]})
+
+        if self.enabled:
+            self._open()
+
+    def _open(self):
+        try:
+            # Written by the scan's Brain workers, read by its producer
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " inode INTEGER NOT NULL,"
+                " decision TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS dirs ("
+                " path TEXT PRIMARY KEY,"
+                " mtime_ns INTEGER NOT NULL,"
+                " names TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.commit()
+
+            for path, size, mtime_ns, inode, decision in self._conn.execute(
+                "SELECT path, size, mtime_ns, inode, decision FROM files"
+            ):
+                self._store(path, (size, mtime_ns, inode), json.loads(decision) if decision else None)
+            for path, mtime_ns, names in self._conn.execute("SELECT path, mtime_ns, names FROM dirs"):
+                listing = json.loads(names)
+                if isinstance(listing, dict):  # older snapshots without subdirectories get relisted
+                    self._dirs[path] = (mtime_ns, listing)
+            logger.info(f"Scan index opened: {self.db_path} ({len(self._files)} files)")
+        except Exception as e:
+            logger.error(f"Failed to open scan index, continuing without it: {e}")
+            self._conn = None
+            self.enabled = False
+
+    def __len__(self):
+        return len(self._files)
+
+    def ensure_fingerprint(self, fingerprint):
+        """Forgets everything when the decision-shaping settings differ from the last scan's."""
+        if not self.enabled:
+            return
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if row and row[0] == fingerprint:
+                return
+            if self._files:
+                logger.info("Scan settings changed; the next scan reprocesses every file.")
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("DELETE FROM dirs")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+            self._conn.commit()
+            self._files.clear()
+            self._by_dir.clear()
+            self._dirs.clear()
+
+    def list_directory(self, dir_path):
+        """
+        Like dir_tree.list_directory, but served from the snapshot when the
+        directory's mtime hasn't moved: then no listing happens, only a stat
+        per known file.
+        """
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+        snapshot = self._dirs.get(dir_path)
+        if snapshot and snapshot[0] == mtime_ns:
+            records = (FileRecord.load(os.path.join(dir_path, name)) for name in snapshot[1]["files"])
+            return [record for record in records if record and not record.is_dir], snapshot[1]["dirs"]
+
+        records, subdirs = list_directory(dir_path)
+        listing = {"files": [record.name for record in records], "dirs": subdirs}
+        with self._lock:
+            self._dirs[dir_path] = (mtime_ns, listing)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, names) VALUES (?, ?, ?)",
+                (dir_path, mtime_ns, json.dumps(listing))
+            )
+            self._conn.commit()
+        return records, subdirs
+
+    def diff_directory(self, dir_path, records):
+        """
+        Compares a directory's listed files with the index.
+        Returns (changed [FileRecord], unchanged [(path, decision)], removed [path]).
+        """
+        dir_path = str(dir_path)
+        changed, unchanged = [], []
+        seen = set()
+        for record in records:
+            seen.add(record.path)
+            known = self._files.get(record.path)
+            if known and known[0] == record.signature:
+                unchanged.append((record.path, known[1]))
+            else:
+                changed.append(record)
+
+        with self._lock:
+            removed = [path for path in self._by_dir.get(dir_path, ()) if path not in seen]
+        self.forget(removed)
+        return changed, unchanged, removed
+
+    def forget_outside(self, visited):
+        """After a complete scan: drops files of directories the walk no longer reached; returns their paths."""
+        with self._lock:
+            removed = [path for dir_path, paths in self._by_dir.items() if dir_path not in visited for path in paths]
+        self.forget(removed)
+        with self._lock:
+            gone = [path for path in self._dirs if path not in visited]
+            if gone:
+                self._conn.executemany("DELETE FROM dirs WHERE path = ?", [(p,) for p in gone])
+                self._conn.commit()
+                for path in gone:
+                    del self._dirs[path]
+        return removed
+
+    def record(self, entries):
+        """Stores (path, signature, decision) triples; decision None means nothing to suggest."""
+        if not self.enabled or not entries:
+            return
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, decision) VALUES (?, ?, ?, ?, ?)",
+                    [(path, *signature, json.dumps(decision) if decision else None) for path, signature, decision in entries]
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to update scan index: {e}")
+                return
+            for path, signature, decision in entries:
+                self._store(path, signature, decision)
+
+    def forget(self, paths):
+        if not self.enabled or not paths:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in paths])
+            self._conn.commit()
+            for path in paths:
+                if self._files.pop(path, None) is not None:
+                    siblings = self._by_dir.get(os.path.dirname(path))
+                    siblings.discard(path)
+                    if not siblings:
+                        del self._by_dir[os.path.dirname(path)]
+
+    def _store(self, path, signature, decision):
+        self._files[path] = (signature, decision)
+        self._by_dir.setdefault(os.path.dirname(path), set()).add(path)
+
+    def close(self):
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+                self.enabled = False
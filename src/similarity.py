@@ -0,0 +1,277 @@
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path, PureWindowsPath
+from src.preclassifier import clean_filename
+from src.utils import setup_logging
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = setup_logging()
+
+_WORD_RE = re.compile(r"[a-z]+|\d+")
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")
+
+# Feature weights: a matching extension or shortcut target says more than one shared trigram
+WEIGHT_EXTENSION = 2
+WEIGHT_TARGET = 3
+EXCERPT_WORDS = 50
+
+
+def extract_features(context):
+    """Token counts describing a file: filename words and trigrams, extension, shortcut target, excerpt words."""
+    features = {}
+
+    def add(token, weight=1):
+        features[token] = features.get(token, 0) + weight
+
+    filename = context.get("filename", "")
+    stem = filename.rsplit(".", 1)[0] if "." in filename else filename
+    # Numbers vary between otherwise identical files (IMG_0412, report-2024), so they all look alike
+    stem = re.sub(r"\d+", "0", _CAMEL_RE.sub(" ", stem)).lower()
+    for word in _WORD_RE.findall(stem):
+        add("w:" + word)
+    padded = f" {stem} "
+    for i in range(len(padded) - 2):
+        add("g:" + padded[i:i + 3])
+
+    extension = (context.get("extension") or "").lower()
+    if extension:
+        add("e:" + extension, WEIGHT_EXTENSION)
+
+    target = context.get("shortcut_target")
+    if target:
+        name = PureWindowsPath(target).name.lower()
+        add("t:" + name, WEIGHT_TARGET)
+        for word in _WORD_RE.findall(name.rsplit(".", 1)[0]):
+            add("w:" + word)
+
+    excerpt = (context.get("text_excerpt") or "").lower()
+    for word in _WORD_RE.findall(excerpt)[:EXCERPT_WORDS]:
+        if len(word) > 2:
+            add("x:" + word)
+    return features
+
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour classifier learned from the user's approvals.
+
+    Every approved suggestion is stored as a labelled example (a rejected one
+    as a counter-example) with its filename, extension, shortcut target and
+    excerpt features. Features are hashed into `dim` buckets and weighted by
+    TF-IDF; a new file is compared against all examples (one matrix product
+    with NumPy, sparse dot products without it). When its closest neighbours
+    agree on a decision it is reused locally and the Brain is not asked.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.enabled = config.get("similarity_enabled", True)
+        self.db_path = Path(config.get("similarity_path", "similarity_index.db"))
+        self.dim = config.get("similarity_dim", 2048)
+        self.k = config.get("similarity_neighbors", 5)
+        self.min_similarity = config.get("similarity_threshold", 0.75)
+        self.min_confidence = config.get("similarity_min_confidence", 0.85)
+        self.max_examples = config.get("similarity_max_examples", 2000)
+
+        self.stats = {"hits": 0, "escalated": 0, "learned": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._examples = {}   # key -> (buckets {index: count}, decision, label)
+        self._matrix = None   # (keys, weighted rows, idf) built lazily after changes
+
+        if self.enabled:
+            self._open()
+
+    def _open(self):
+        try:
+            # Approvals come from the GUI worker, lookups from the scan stages
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS examples ("
+                " key TEXT PRIMARY KEY,"
+                " features TEXT NOT NULL,"
+                " decision TEXT NOT NULL,"
+                " label INTEGER NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_examples_updated ON examples(updated_at)")
+            self._conn.commit()
+            for key, features, decision, label in self._conn.execute(
+                "SELECT key, features, decision, label FROM examples"
+            ):
+                self._examples[key] = (self._hash(json.loads(features)), json.loads(decision), label)
+            logger.info(f"Similarity index opened: {self.db_path} ({len(self._examples)} examples, "
+                        f"{'numpy' if HAS_NUMPY else 'pure Python'} search)")
+        except Exception as e:
+            logger.error(f"Failed to open similarity index, continuing without it: {e}")
+            self._conn = None
+            self.enabled = False
+
+    def _hash(self, features):
+        # crc32 rather than hash(): it must be stable across runs
+        buckets = {}
+        for token, count in features.items():
+            bucket = zlib.crc32(token.encode("utf-8")) % self.dim
+            buckets[bucket] = buckets.get(bucket, 0) + count
+        return buckets
+
+    @staticmethod
+    def example_key(context):
+        return "\x1f".join([
+            re.sub(r"\s+", " ", context.get("filename", "").strip()).lower(),
+            (context.get("shortcut_target") or "").lower()
+        ])
+
+    def learn(self, context, decision, approved=True):
+        """Stores the user's verdict on a suggested decision for this file."""
+        if not self.enabled or not context or context.get("is_directory"):
+            return
+        features = extract_features(context)
+        label = 1 if approved else -1
+        stored = {key: decision.get(key) for key in ("category", "folder", "tags")}
+        key = self.example_key(context)
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO examples (key, features, decision, label, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(features), json.dumps(stored), label, now)
+                )
+                overflow = len(self._examples) + (key not in self._examples) - self.max_examples
+                if overflow > 0:
+                    oldest = [row[0] for row in self._conn.execute(
+                        "SELECT key FROM examples ORDER BY updated_at ASC LIMIT ?", (overflow,)
+                    )]
+                    self._conn.executemany("DELETE FROM examples WHERE key = ?", [(k,) for k in oldest])
+                    for old in oldest:
+                        self._examples.pop(old, None)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to store similarity example: {e}")
+                return
+            self._examples[key] = (self._hash(features), stored, label)
+            self._matrix = None
+            self.stats["learned"] += 1
+
+    def _build(self):
+        """TF-IDF weighted, L2-normalised rows for every example."""
+        keys = list(self._examples)
+        df = {}
+        for key in keys:
+            for bucket in self._examples[key][0]:
+                df[bucket] = df.get(bucket, 0) + 1
+        n = len(keys)
+        idf = {bucket: math.log((1 + n) / (1 + count)) + 1 for bucket, count in df.items()}
+
+        if HAS_NUMPY:
+            idf_vec = np.ones(self.dim, dtype=np.float32)
+            for bucket, value in idf.items():
+                idf_vec[bucket] = value
+            rows = np.zeros((n, self.dim), dtype=np.float32)
+            for i, key in enumerate(keys):
+                for bucket, count in self._examples[key][0].items():
+                    rows[i, bucket] = count
+            rows *= idf_vec
+            rows /= np.maximum(np.linalg.norm(rows, axis=1, keepdims=True), 1e-9)
+            return keys, rows, idf_vec
+
+        rows = [self._weigh(self._examples[key][0], idf) for key in keys]
+        return keys, rows, idf
+
+    @staticmethod
+    def _weigh(buckets, idf):
+        weighted = {bucket: count * idf.get(bucket, 1.0) for bucket, count in buckets.items()}
+        norm = math.sqrt(sum(w * w for w in weighted.values())) or 1.0
+        return {bucket: w / norm for bucket, w in weighted.items()}
+
+    def _neighbors(self, buckets):
+        """Returns [(similarity, key)] of the k closest examples."""
+        if self._matrix is None:
+            self._matrix = self._build()
+        keys, rows, idf = self._matrix
+
+        if HAS_NUMPY:
+            query = np.zeros(self.dim, dtype=np.float32)
+            for bucket, count in buckets.items():
+                query[bucket] = count
+            query *= idf
+            query /= max(float(np.linalg.norm(query)), 1e-9)
+            scores = rows @ query
+            top = np.argsort(scores)[::-1][:self.k]
+            return [(float(scores[i]), keys[i]) for i in top]
+
+        query = self._weigh(buckets, idf)
+        scores = [(sum(w * row.get(b, 0.0) for b, w in query.items()), key) for key, row in zip(keys, rows)]
+        scores.sort(reverse=True)
+        return scores[:self.k]
+
+    def classify(self, context):
+        """Returns a decision reused from similar approved files, or None to ask the Brain."""
+        if not self.enabled or context.get("is_directory"):
+            return None
+
+        buckets = self._hash(extract_features(context))
+        with self._lock:
+            if not self._examples:
+                return None
+            neighbors = [(s, self._examples[key]) for s, key in self._neighbors(buckets) if s >= self.min_similarity]
+
+        # Weighted vote per (category, folder); counter-examples vote against their decision
+        votes = {}
+        total = 0.0
+        for score, (_, decision, label) in neighbors:
+            target = (decision.get("category"), decision.get("folder"))
+            entry = votes.setdefault(target, [0.0, 0.0, decision])
+            entry[0] += score * label
+            entry[1] = max(entry[1], score) if label > 0 else entry[1]
+            total += score
+
+        best = max(votes.values(), key=lambda v: v[0], default=None)
+        if not best or best[0] <= 0:
+            self._count("escalated")
+            return None
+
+        # Closeness of the best match, scaled by how much the neighbourhood agrees with it
+        confidence = round(best[1] * best[0] / total, 2)
+        if confidence < self.min_confidence:
+            self._count("escalated")
+            return None
+
+        self._count("hits")
+        decision = best[2]
+        return {
+            "category": decision.get("category"),
+            "confidence": confidence,
+            "suggested_name": clean_filename(context.get("filename", "")),
+            "folder": decision.get("folder"),
+            "tags": list(decision.get("tags") or [])
+        }
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def summary(self):
+        asked = self.stats["hits"] + self.stats["escalated"]
+        rate = (self.stats["hits"] / asked * 100) if asked else 0.0
+        return (f"examples={len(self._examples)} learned={self.stats['learned']} hits={self.stats['hits']} "
+                f"escalated={self.stats['escalated']} ({rate:.1f}% reused)")
+
+    def close(self):
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+                self.enabled = False
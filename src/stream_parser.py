@@ -0,0 +1,89 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object or array as it streams in.
+
+    Text before the first '{' or '[' (such as a ```json fence) is skipped;
+    with start_after, everything up to that marker is skipped too, which
+    lets a wrapped answer like {"decisions": [...]} stream its inner array
+    (an answer that is a bare array instead is parsed as it is).
+    Each top-level member (an object field or an array element) is decoded
+    as soon as the ',' or closing bracket after it arrives, so `value` holds
+    every completed member while the rest is still on its way.
+    """
+
+    def __init__(self, start_after=None):
+        self.start_after = start_after
+        self.value = None     # dict or list of completed members
+        self.closed = False   # root bracket has closed
+        self.errors = 0       # members that failed to decode
+
+        self._root = None
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+
+    def feed(self, chunk):
+        self._text += chunk
+        text = self._text
+        if self.start_after and self._root is None and self._pos == 0 and _first_bracket(text) != "[":
+            marker = text.find(self.start_after)
+            if marker < 0:
+                return self.value
+            self._pos = marker + len(self.start_after)
+        i = self._pos
+        while i < len(text) and not self.closed:
+            c = text[i]
+            if self._root is None:
+                if c in "{[":
+                    self._root = c
+                    self.value = {} if c == "{" else []
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_member(i)
+                    self.closed = True
+            elif c == "," and self._depth == 1:
+                self._close_member(i)
+            i += 1
+        self._pos = i
+        return self.value
+
+    def _close_member(self, end):
+        member = self._text[self._member_start:end].strip()
+        self._member_start = end + 1
+        if not member:
+            return
+        try:
+            if self._root == "{":
+                self.value.update(json.loads("{" + member + "}"))
+            else:
+                self.value.append(json.loads(member))
+        except json.JSONDecodeError:
+            self.errors += 1
+
+
+def _first_bracket(text):
+    """The first '{' or '[' in text, or None before either has arrived."""
+    for c in text:
+        if c in "{[":
+            return c
+    return None
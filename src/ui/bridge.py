@@ -0,0 +1,109 @@
+import logging
+import threading
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class UiBridge(QObject):
+    """
+    Coalescing bridge from the agent threads to the GUI.
+
+    Producers on any thread only record into buffers under a lock: pending
+    deltas are merged per action id, stats keep the latest value and log lines
+    are queued. A timer on the GUI thread drains everything at most max_fps
+    times a second and emits one signal per kind, so a 10k-file scan costs the
+    event loop a few frames a second instead of one queued event per change.
+    """
+
+    pending_delta = pyqtSignal(dict, list)   # added {id: action}, removed [ids]
+    stats_updated = pyqtSignal(int, int, int) # files, decisions, actions
+    log_batch = pyqtSignal(list)             # [(levelno, line)]
+
+    def __init__(self, max_fps=30, max_log_lines=5000, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._added = {}
+        self._removed = set()
+        self._stats = None
+        self._logs = deque()
+        self.max_log_lines = max_log_lines
+
+        self._updates = 0   # pending/stats updates received
+        self._frames = 0    # frames that carried at least one update
+        self._dropped_logs = 0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(1, int(1000 / max_fps)))
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    # --- Producers (any thread) ---
+    def push_pending_delta(self, added, removed):
+        with self._lock:
+            self._updates += 1
+            for action_id in removed:
+                # Added and removed within one frame: never show it
+                self._added.pop(action_id, None)
+                self._removed.add(action_id)
+            # The model applies removals before additions, so a re-used id still lands
+            self._added.update(added)
+
+    def push_stats(self, stats):
+        with self._lock:
+            self._updates += 1
+            self._stats = (
+                stats.get("files_processed", 0),
+                stats.get("decisions_made", 0),
+                stats.get("actions_taken", 0)
+            )
+
+    def push_log(self, level, line):
+        with self._lock:
+            self._logs.append((level, line))
+            if len(self._logs) > self.max_log_lines:
+                self._logs.popleft()
+                self._dropped_logs += 1
+
+    # --- GUI thread ---
+    def flush(self):
+        with self._lock:
+            added, self._added = self._added, {}
+            removed, self._removed = self._removed, set()
+            stats, self._stats = self._stats, None
+            logs, self._logs = list(self._logs), deque()
+            if added or removed or stats:
+                self._frames += 1
+
+        if added or removed:
+            self.pending_delta.emit(added, list(removed))
+        if stats:
+            self.stats_updated.emit(*stats)
+        if logs:
+            self.log_batch.emit(logs)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "updates": self._updates,
+                "frames": self._frames,
+                "merged_updates": self._updates - self._frames,
+                "dropped_log_lines": self._dropped_logs
+            }
+
+    def stop(self):
+        self._timer.stop()
+        self.flush()
+
+
+class BridgeLogHandler(logging.Handler):
+    """Formats records on the logging thread and queues the line on the bridge."""
+
+    def __init__(self, bridge):
+        super().__init__()
+        self.bridge = bridge
+
+    def emit(self, record):
+        try:
+            self.bridge.push_log(record.levelno, self.format(record))
+        except Exception:
+            self.handleError(record)
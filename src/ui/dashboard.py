@@ -1,27 +1,34 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QListWidget, QFrame, QComboBox, 
-    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
-    QSizePolicy, QCheckBox, QLineEdit
+    QLabel, QPushButton, QFrame, QComboBox, 
+    QTableView, QHeaderView, QAbstractItemView,
+    QCheckBox, QLineEdit
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QSize
-from PyQt6.QtGui import QIcon, QFont
-import requests
+from PyQt6.QtCore import Qt, pyqtSignal
+import logging
+from src.ui.pending_model import (
+    PendingActionsModel, PendingFilterProxy, ActionButtonsDelegate, ACTION_ID_ROLE, COL_ACTION
+)
+from src.ui.log_console import LogConsole
 
 class Dashboard(QMainWindow):
     # Signals
     start_requested = pyqtSignal()   # Auto-Pilot ON
     stop_requested = pyqtSignal()    # Auto-Pilot OFF
     scan_requested = pyqtSignal()    # Quick Scan
+    scan_cancel_requested = pyqtSignal()
     mode_changed = pyqtSignal(str)
     undo_requested = pyqtSignal()
     approve_requested = pyqtSignal(int)
+    approve_many_requested = pyqtSignal(list)
     reject_requested = pyqtSignal(int)
     targets_changed = pyqtSignal(dict)
     ai_changed = pyqtSignal(dict)    # {provider, model, api_key}
+    health_refresh_requested = pyqtSignal(str)  # provider
 
-    def __init__(self):
+    def __init__(self, log_capacity=5000):
         super().__init__()
+        self.log_capacity = log_capacity
         self.setWindowTitle("VORTEX")
         self.resize(1100, 750)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
@@ -56,6 +63,7 @@ class Dashboard(QMainWindow):
         
         # Dragging state
         self._drag_pos = None
+        self._scanning = False
 
     def _setup_header(self):
         header = QFrame()
@@ -135,7 +143,7 @@ class Dashboard(QMainWindow):
         self.btn_scan.setObjectName("BtnScan")
         self.btn_scan.setFixedSize(160, 50)
         self.btn_scan.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.btn_scan.clicked.connect(self.scan_requested.emit)
+        self.btn_scan.clicked.connect(self._on_scan_clicked)
 
         # Mode Selector (Subtle)
         self.combo_mode = QComboBox()
@@ -214,11 +222,17 @@ class Dashboard(QMainWindow):
         self.btn_detect.setVisible(False)
         self.btn_detect.clicked.connect(self._detect_ollama_models)
 
+        # Provider availability/latency, filled in by the health monitor
+        self._health = {}
+        self.provider_status = QLabel("● checking...")
+        self.provider_status.setObjectName("ProviderStatus")
+
         layout.addWidget(lbl)
         layout.addWidget(self.combo_provider)
         layout.addWidget(self.combo_model)
         layout.addWidget(self.api_key_input)
         layout.addWidget(self.btn_detect)
+        layout.addWidget(self.provider_status)
         layout.addStretch()
 
         self.main_layout.addWidget(container)
@@ -231,24 +245,57 @@ class Dashboard(QMainWindow):
             self.btn_detect.setVisible(False)
         else:
             self.combo_model.clear()
-            self.combo_model.addItems(self._ollama_curated)
+            # Last detected models if we have them, curated list until the probe answers
+            detected = self._health.get("ollama", {}).get("models")
+            self.combo_model.addItems(detected or self._ollama_curated)
             self.api_key_input.setVisible(False)
             self.btn_detect.setVisible(True)
             # Try auto-detect on switch
             self._detect_ollama_models()
+        self._show_provider_status()
         self._emit_ai_config()
 
     def _detect_ollama_models(self):
-        """Query Ollama for installed models and update combo."""
-        try:
-            r = requests.get("http://localhost:11434/api/tags", timeout=3)
-            if r.status_code == 200:
-                models = [m["name"] for m in r.json().get("models", [])]
-                if models:
-                    self.combo_model.clear()
-                    self.combo_model.addItems(models)
-        except Exception:
-            pass  # Ollama not running, keep curated list
+        """Asks the health monitor to re-probe Ollama; models arrive via update_provider_health."""
+        self.health_refresh_requested.emit("ollama")
+
+    def update_provider_health(self, status):
+        provider = status["provider"]
+        self._health[provider] = status
+
+        if provider == "ollama" and status["models"] and self.combo_provider.currentText() == "ollama":
+            models = status["models"]
+            current = [self.combo_model.itemText(i) for i in range(self.combo_model.count())]
+            if current != models:
+                selected = self.combo_model.currentText()
+                self.combo_model.blockSignals(True)
+                self.combo_model.clear()
+                self.combo_model.addItems(models)
+                if selected in models:
+                    self.combo_model.setCurrentText(selected)
+                self.combo_model.blockSignals(False)
+                if self.combo_model.currentText() != selected:
+                    self._emit_ai_config()
+
+        if provider == self.combo_provider.currentText():
+            self._show_provider_status()
+
+    def _show_provider_status(self):
+        status = self._health.get(self.combo_provider.currentText())
+        if status is None:
+            self.provider_status.setText("● checking...")
+            self.provider_status.setStyleSheet("color: #45475a;")
+        elif status["available"]:
+            self.provider_status.setText(f"● online · {status['latency_ms']} ms")
+            self.provider_status.setStyleSheet("color: #a6e3a1;")
+        elif status.get("config_error"):
+            # Reachable, but refusing our settings (e.g. the API key)
+            self.provider_status.setText("● check settings")
+            self.provider_status.setStyleSheet("color: #f9e2af;")
+        else:
+            self.provider_status.setText("● offline")
+            self.provider_status.setStyleSheet("color: #f38ba8;")
+        self.provider_status.setToolTip((status.get("error") or "") if status else "")
 
     def _emit_ai_config(self):
         self.ai_changed.emit({
@@ -308,23 +355,59 @@ class Dashboard(QMainWindow):
         self.btn_undo.setFixedSize(100, 30)
         self.btn_undo.clicked.connect(self.undo_requested.emit)
         
+        self.btn_approve_selected = QPushButton("✔ SELECTED")
+        self.btn_approve_selected.setObjectName("BtnApproveMany")
+        self.btn_approve_selected.setFixedSize(110, 30)
+        self.btn_approve_selected.setToolTip("Approve the selected rows")
+        self.btn_approve_selected.clicked.connect(self._approve_selected)
+
+        self.btn_approve_all = QPushButton("✔ ALL")
+        self.btn_approve_all.setObjectName("BtnApproveMany")
+        self.btn_approve_all.setFixedSize(80, 30)
+        self.btn_approve_all.setToolTip("Approve every listed action")
+        self.btn_approve_all.clicked.connect(self._approve_all)
+
+        self.pending_filter = QLineEdit()
+        self.pending_filter.setObjectName("PendingFilter")
+        self.pending_filter.setPlaceholderText("Filter files or destinations...")
+        self.pending_filter.setFixedSize(220, 30)
+
         top_bar.addWidget(lbl)
         top_bar.addStretch()
+        top_bar.addWidget(self.pending_filter)
+        top_bar.addWidget(self.btn_approve_selected)
+        top_bar.addWidget(self.btn_approve_all)
         top_bar.addWidget(self.btn_undo)
         layout.addLayout(top_bar)
         
-        # Table — alternatingRowColors handled purely by QSS ::item and ::item:alternate
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["FILE", "CONF", "DESTINATION", "ACTION"])
+        # Table — model/view so only changed rows are touched; buttons are painted by a delegate
+        self.pending_model = PendingActionsModel(self)
+        self.pending_proxy = PendingFilterProxy(self)
+        self.pending_proxy.setSourceModel(self.pending_model)
+        self.pending_filter.textChanged.connect(self.pending_proxy.set_filter_text)
+
+        self.action_delegate = ActionButtonsDelegate(self)
+        self.action_delegate.approve_clicked.connect(self.approve_requested.emit)
+        self.action_delegate.reject_clicked.connect(self.reject_requested.emit)
+
+        # alternatingRowColors handled purely by QSS ::item and ::item:alternate
+        self.table = QTableView()
+        self.table.setModel(self.pending_proxy)
+        self.table.setItemDelegateForColumn(COL_ACTION, self.action_delegate)
+        self.table.setMouseTracking(True)
+        self.table.entered.connect(self._on_table_hover)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setSortingEnabled(True)
         self.table.horizontalHeader().setSortIndicatorShown(True)
         self.table.setShowGrid(False)
         self.table.setAlternatingRowColors(False)
         self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.table.verticalHeader().setVisible(False)
+        # Uniform row height: the view never measures rows, even at 50k
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(60)
         self.table.setWordWrap(False)
 
         # Column sizing
@@ -339,6 +422,23 @@ class Dashboard(QMainWindow):
         layout.addWidget(self.table)
         self.main_layout.addWidget(content)
 
+    def _on_table_hover(self, index):
+        if index.column() != COL_ACTION:
+            self.action_delegate.clear_hover()
+            self.table.viewport().update()
+
+    def _approve_selected(self):
+        rows = sorted(index.row() for index in self.table.selectionModel().selectedRows())
+        ids = [self.pending_proxy.index(row, 0).data(ACTION_ID_ROLE) for row in rows]
+        if ids:
+            self.approve_many_requested.emit(ids)
+
+    def _approve_all(self):
+        # Only what the filter currently shows
+        ids = self.pending_proxy.action_ids()
+        if ids:
+            self.approve_many_requested.emit(ids)
+
     def _setup_footer(self):
         # Footer contains Toggle Logs button and Version
         footer = QFrame()
@@ -365,12 +465,12 @@ class Dashboard(QMainWindow):
         self.log_container = QFrame()
         self.log_container.setObjectName("LogBox")
         self.log_container.hide()
-        self.log_container.setFixedHeight(150)
+        self.log_container.setFixedHeight(190)
         log_layout = QVBoxLayout(self.log_container)
         log_layout.setContentsMargins(30, 0, 30, 20)
         
-        self.console = QListWidget()
-        self.console.setObjectName("Console")
+        # Ring buffer: only the newest log_capacity lines are kept, the log file has the rest
+        self.console = LogConsole(self.log_capacity)
         log_layout.addWidget(self.console)
         
         self.main_layout.addWidget(self.log_container)
@@ -385,6 +485,21 @@ class Dashboard(QMainWindow):
             self.btn_pilot.setStyleSheet("") # Reverts to QSS
             self.stop_requested.emit()
 
+    def _on_scan_clicked(self):
+        if self._scanning:
+            self.btn_scan.setText("  CANCELLING...")
+            self.btn_scan.setEnabled(False)
+            self.scan_cancel_requested.emit()
+        else:
+            self._scanning = True
+            self.btn_scan.setText("  CANCEL SCAN")
+            self.scan_requested.emit()
+
+    def scan_finished(self):
+        self._scanning = False
+        self.btn_scan.setText("  QUICK SCAN")
+        self.btn_scan.setEnabled(True)
+
     def _toggle_logs(self, checked):
         if checked:
             self.log_container.show()
@@ -401,61 +516,17 @@ class Dashboard(QMainWindow):
             self.status_label.setText("SYSTEM IDLE")
             self.status_dot.setStyleSheet("color: #45475a;") # Grey
 
-    def log(self, message):
-        self.console.addItem(message)
-        self.console.scrollToBottom()
+    def log(self, message, level=logging.INFO):
+        self.console.append([(level, message)])
+
+    def log_lines(self, entries):
+        self.console.append(entries)
 
     def update_stats(self, files, decisions, actions):
         pass # Disabling stats for now as requested to clean UI
 
     def update_pending_actions(self, pending_dict):
-        self.table.setRowCount(0)
-        
-        for action_id, data in list(pending_dict.items()):
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self.table.setRowHeight(row, 60)
-            
-            # File
-            item_file = QTableWidgetItem(data['filename'])
-            item_file.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
-            self.table.setItem(row, 0, item_file)
-            
-            # Confidence
-            conf = data['confidence']
-            item_conf = QTableWidgetItem(f"{int(conf*100)}%")
-            item_conf.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 1, item_conf)
-            
-            # Path
-            display_path = data.get('display_target', f"{data['target_folder']}/{data['target_name']}")
-            item_path = QTableWidgetItem(display_path)
-            
-            # Highlight branded shortcuts in Yellow-Gold for visibility
-            if "[" in data['target_name'] and not data['filename'].startswith("["):
-                 item_path.setForeground(Qt.GlobalColor.yellow)
-                 
-            self.table.setItem(row, 2, item_path)
-            
-            # Actions
-            btn_widget = QWidget()
-            btn_layout = QHBoxLayout(btn_widget)
-            btn_layout.setContentsMargins(5, 5, 5, 5)
-            btn_layout.setSpacing(10)
-            
-            btn_approve = QPushButton("✔")
-            btn_approve.setFixedSize(40, 40)
-            btn_approve.setObjectName("BtnApprove")
-            btn_approve.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn_approve.clicked.connect(lambda _, aid=action_id: self.approve_requested.emit(aid))
-            
-            btn_reject = QPushButton("✘")
-            btn_reject.setFixedSize(40, 40)
-            btn_reject.setObjectName("BtnReject")
-            btn_reject.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn_reject.clicked.connect(lambda _, aid=action_id: self.reject_requested.emit(aid))
-            
-            btn_layout.addWidget(btn_approve)
-            btn_layout.addWidget(btn_reject)
-            
-            self.table.setCellWidget(row, 3, btn_widget)
+        self.pending_model.sync(pending_dict)
+
+    def apply_pending_delta(self, added, removed):
+        self.pending_model.apply_diff(added, removed)
@@ -8,53 +8,31 @@ project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(project_root))
 
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QThread, QObject, pyqtSignal, pyqtSlot
+from PyQt6.QtCore import Qt, QThread, QObject, pyqtSignal, pyqtSlot
 
 from src.main import AntigravitySystem, load_config
 from src.ui.dashboard import Dashboard
-
-# --- Logging Handler to Emit Signals ---
-class QtSignaler(QObject):
-    message_emitted = pyqtSignal(str)
-
-class QtLogHandler(logging.Handler):
-    def __init__(self, signaler):
-        super().__init__()
-        self.signaler = signaler
-
-    def emit(self, record):
-        msg = self.format(record)
-        self.signaler.message_emitted.emit(msg)
+from src.ui.bridge import UiBridge, BridgeLogHandler
+from src.ui.health_monitor import ProviderHealthMonitor
 
 # --- Worker Thread for Agent ---
 class AntigravityWorker(QObject):
     finished = pyqtSignal()
-    stats_updated = pyqtSignal(int, int, int) # files, decisions, actions
-    pending_updated = pyqtSignal(dict) # pending actions dict
+    scan_finished = pyqtSignal()
     
-    def __init__(self):
+    def __init__(self, bridge, config=None):
         super().__init__()
-        self.config = load_config(str(project_root / "config.yaml"))
+        self.config = config
         if not self.config:
              self.config = {"mode": "observe", "watch_paths": []}
              
         self.system = AntigravitySystem(self.config)
-        # Connect system callbacks
-        self.system.on_stats_change = self._on_stats_change
-        self.system.on_pending_change = self._on_pending_change
+        # Connect system callbacks (buffered by the bridge, delivered to the GUI in frames)
+        self.system.on_stats_change = bridge.push_stats
+        self.system.on_pending_delta = bridge.push_pending_delta
         
         self._is_running = False
 
-    def _on_stats_change(self, stats):
-        self.stats_updated.emit(
-            stats.get("files_processed", 0),
-            stats.get("decisions_made", 0),
-            stats.get("actions_taken", 0)
-        )
-
-    def _on_pending_change(self, pending):
-        self.pending_updated.emit(pending)
-
     @pyqtSlot()
     def start_agent(self):
         if self._is_running:
@@ -72,7 +50,14 @@ class AntigravityWorker(QObject):
 
     @pyqtSlot()
     def scan_files(self):
-        self.system.scan_existing_files()
+        try:
+            self.system.scan_existing_files()
+        finally:
+            self.scan_finished.emit()
+
+    def cancel_scan(self):
+        # Called directly from the GUI thread: the worker thread is busy running the scan
+        self.system.cancel_scan()
         
     @pyqtSlot(str)
     def set_mode(self, mode):
@@ -86,6 +71,10 @@ class AntigravityWorker(QObject):
     def approve_action(self, action_id):
         self.system.approve_action(action_id)
 
+    @pyqtSlot(list)
+    def approve_actions(self, action_ids):
+        self.system.approve_actions(action_ids)
+
     @pyqtSlot(int)
     def reject_action(self, action_id):
         self.system.reject_action(action_id)
@@ -123,9 +112,19 @@ def main():
         with open(style_path, "r", encoding="utf-8") as f:
             app.setStyleSheet(f.read())
     
-    # Setup Signal Bridge for Logging
-    signaler = QtSignaler()
-    handler = QtLogHandler(signaler)
+    config = load_config(str(project_root / "config.yaml"))
+    ui_config = config or {}
+
+    # Initialize Dashboard
+    window = Dashboard(log_capacity=ui_config.get("ui_log_capacity", 5000))
+    window.show()
+
+    # Setup Signal Bridge: coalesces pending/stats updates and log lines into frames
+    bridge = UiBridge(
+        max_fps=ui_config.get("ui_max_fps", 30),
+        max_log_lines=ui_config.get("ui_max_log_lines_per_frame", 5000)
+    )
+    handler = BridgeLogHandler(bridge)
     handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s', datefmt='%H:%M:%S'))
     
     # Add handler to root logger
@@ -133,35 +132,40 @@ def main():
     logger.addHandler(handler)
     logger.setLevel(logging.INFO)
 
-    # Initialize Dashboard
-    window = Dashboard()
-    window.show()
-
     # Initialize Thread & Worker
     thread = QThread()
-    worker = AntigravityWorker()
+    worker = AntigravityWorker(bridge, config)
     worker.moveToThread(thread)
     
     # Connect Controls
     window.start_requested.connect(worker.start_agent)
     window.stop_requested.connect(worker.stop_agent)
     window.scan_requested.connect(worker.scan_files)
+    window.scan_cancel_requested.connect(worker.cancel_scan, Qt.ConnectionType.DirectConnection)
+    worker.scan_finished.connect(window.scan_finished)
     
     # Connect New Features
     window.mode_changed.connect(worker.set_mode)
     window.undo_requested.connect(worker.undo_last)
     window.approve_requested.connect(worker.approve_action)
+    window.approve_many_requested.connect(worker.approve_actions)
     window.reject_requested.connect(worker.reject_action)
     window.targets_changed.connect(worker.update_targets)
     window.ai_changed.connect(worker.update_ai_config)
     
     # Connect Logging to Console
-    signaler.message_emitted.connect(window.log)
+    bridge.log_batch.connect(window.log_lines)
     
     # Connect Updates
-    worker.stats_updated.connect(window.update_stats)
-    worker.pending_updated.connect(window.update_pending_actions)
+    bridge.stats_updated.connect(window.update_stats)
+    bridge.pending_delta.connect(window.apply_pending_delta)
     
+    # Provider health: probed in the background, never on the GUI thread
+    health = ProviderHealthMonitor(worker.config)
+    health.health_changed.connect(window.update_provider_health)
+    window.health_refresh_requested.connect(health.force_refresh)
+    health.start()
+
     # Connect Status Updates
     window.start_requested.connect(lambda: window.update_status(True))
     window.stop_requested.connect(lambda: window.update_status(False))
@@ -171,6 +175,9 @@ def main():
     
     # Cleanup on Exit
     app.aboutToQuit.connect(worker.stop_agent)
+    app.aboutToQuit.connect(health.stop)
+    app.aboutToQuit.connect(lambda: logger.info(f"UI bridge: {bridge.metrics()}"))
+    app.aboutToQuit.connect(bridge.stop)
     app.aboutToQuit.connect(thread.quit)
     app.aboutToQuit.connect(thread.wait)
 
@@ -0,0 +1,53 @@
+import asyncio
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from src.brain_client import AsyncBrainClient
+from src.http_pool import EventLoopThread
+
+PROVIDERS = ("ollama", "openai")
+
+
+class ProviderHealthMonitor(QObject):
+    """
+    Probes the AI providers on the shared Brain loop and reports back via signals.
+
+    refresh() only schedules the probes and returns immediately; results
+    (availability, latency, model list) arrive through health_changed, so the
+    GUI thread never waits on the network.
+    """
+
+    health_changed = pyqtSignal(dict)  # ProviderStatus.to_dict()
+
+    def __init__(self, config, parent=None):
+        super().__init__(parent)
+        self.config = config
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(config.get("provider_health_interval_seconds", 30) * 1000))
+        self._timer.timeout.connect(self.refresh_all)
+
+    def start(self):
+        self.refresh_all()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def refresh_all(self):
+        for provider in PROVIDERS:
+            self.refresh(provider)
+
+    def refresh(self, provider, force=False):
+        # Same base URL and credentials the Brain would use for this provider
+        client = AsyncBrainClient(dict(self.config, ai_provider=provider))
+        future = asyncio.run_coroutine_threadsafe(client.check_health(force), EventLoopThread.get().loop)
+        future.add_done_callback(self._on_probe_done)
+
+    def force_refresh(self, provider):
+        self.refresh(provider, force=True)
+
+    def _on_probe_done(self, future):
+        # Runs on the loop thread; the signal is queued over to the GUI
+        try:
+            status = future.result()
+        except Exception:
+            return
+        self.health_changed.emit(status.to_dict())
@@ -0,0 +1,158 @@
+import logging
+from collections import deque
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QListView, QComboBox, QLineEdit, QAbstractItemView
+)
+from PyQt6.QtCore import Qt, QAbstractListModel, QSortFilterProxyModel, QModelIndex
+from PyQt6.QtGui import QColor
+
+LEVEL_ROLE = Qt.ItemDataRole.UserRole
+
+LEVEL_COLORS = {
+    logging.WARNING: QColor("#f9e2af"),
+    logging.ERROR: QColor("#f38ba8"),
+    logging.CRITICAL: QColor("#f38ba8"),
+}
+
+LEVEL_FILTERS = [
+    ("ALL", logging.NOTSET),
+    ("INFO+", logging.INFO),
+    ("WARNING+", logging.WARNING),
+    ("ERROR", logging.ERROR),
+]
+
+
+class LogBufferModel(QAbstractListModel):
+    """
+    Fixed-capacity ring buffer of (level, line) log entries.
+
+    Once full, the oldest entries are dropped from the front as new ones
+    arrive; everything is already in the rotating log file, so the console
+    only ever holds the last `capacity` lines.
+    """
+
+    def __init__(self, capacity=5000, parent=None):
+        super().__init__(parent)
+        self.capacity = max(1, int(capacity))
+        self._entries = deque()
+        self.dropped = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        level, line = self._entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return line
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return LEVEL_COLORS.get(level)
+        if role == LEVEL_ROLE:
+            return level
+        return None
+
+    def entry(self, row):
+        return self._entries[row]
+
+    def append(self, entries):
+        if not entries:
+            return
+        if len(entries) >= self.capacity:
+            # The batch alone fills the buffer
+            self.beginResetModel()
+            self.dropped += len(self._entries) + len(entries) - self.capacity
+            self._entries = deque(entries[-self.capacity:])
+            self.endResetModel()
+            return
+
+        overflow = len(self._entries) + len(entries) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._entries.popleft()
+            self.endRemoveRows()
+            self.dropped += overflow
+
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self._entries.extend(entries)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._entries.clear()
+        self.endResetModel()
+
+
+class LogFilterProxy(QSortFilterProxyModel):
+    """Minimum-level filter plus case-insensitive full-text search over the buffer."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.min_level = logging.NOTSET
+        self._needle = ""
+
+    def set_min_level(self, level):
+        self.min_level = level
+        self.invalidateFilter()
+
+    def set_search_text(self, text):
+        self._needle = text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        level, line = self.sourceModel().entry(source_row)
+        if level < self.min_level:
+            return False
+        return not self._needle or self._needle in line.lower()
+
+
+class LogConsole(QWidget):
+    """Virtualized log view over a LogBufferModel, with level filter and search."""
+
+    def __init__(self, capacity=5000, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+
+        self.model = LogBufferModel(capacity, self)
+        self.proxy = LogFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
+        tools = QHBoxLayout()
+        self.level_select = QComboBox()
+        self.level_select.setObjectName("ModeSelect")
+        for label, level in LEVEL_FILTERS:
+            self.level_select.addItem(label, level)
+        self.level_select.currentIndexChanged.connect(
+            lambda _: self.proxy.set_min_level(self.level_select.currentData())
+        )
+
+        self.search = QLineEdit()
+        self.search.setObjectName("PendingFilter")
+        self.search.setPlaceholderText("Search logs...")
+        self.search.textChanged.connect(self.proxy.set_search_text)
+
+        tools.addWidget(self.level_select)
+        tools.addWidget(self.search)
+        layout.addLayout(tools)
+
+        self.view = QListView()
+        self.view.setObjectName("Console")
+        self.view.setModel(self.proxy)
+        # Every line has the same height, so the view never measures rows
+        self.view.setUniformItemSizes(True)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        layout.addWidget(self.view)
+
+    def append(self, entries):
+        """entries: list of (levelno, formatted line)."""
+        bar = self.view.verticalScrollBar()
+        follow = bar.value() >= bar.maximum()
+        self.model.append(entries)
+        # Only stick to the bottom when the user hasn't scrolled up to read
+        if follow:
+            self.view.scrollToBottom()
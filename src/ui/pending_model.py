@@ -0,0 +1,325 @@
+from bisect import bisect_right
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtCore import (
+    Qt, QAbstractTableModel, QSortFilterProxyModel, QModelIndex, QRectF, QEvent, pyqtSignal
+)
+from PyQt6.QtGui import QColor, QFont, QPen
+
+COLUMNS = ["FILE", "CONF", "DESTINATION", "ACTION"]
+COL_FILE, COL_CONF, COL_DEST, COL_ACTION = range(len(COLUMNS))
+
+ACTION_ID_ROLE = Qt.ItemDataRole.UserRole
+
+
+def _display_target(data):
+    return data.get('display_target', f"{data['target_folder']}/{data['target_name']}")
+
+
+class _Descending:
+    """Sort key wrapper that inverts the order, so descending rows can be bisected like ascending ones."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+class PendingActionsModel(QAbstractTableModel):
+    """
+    Pending actions keyed on action id.
+
+    Changes arrive as diffs (added/updated rows and removed ids), so the view
+    only hears about the rows that actually changed. Sorting is done here with
+    a single key function rather than pairwise comparisons in the proxy. Each
+    row's key is computed once and kept alongside the display order, so rows
+    added while sorted are sorted among themselves and merged in by bisection,
+    one rowsInserted per run of adjacent new rows.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = []      # display order
+        self._keys = []     # sort key of each row in _ids (empty while unsorted)
+        self._rows = {}     # action id -> action dict
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self._bold = QFont("Segoe UI", 10, QFont.Weight.Bold)
+
+    # --- Qt model interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        action_id = self._ids[index.row()]
+        column = index.column()
+
+        if role == ACTION_ID_ROLE:
+            return action_id
+
+        data = self._rows[action_id]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == COL_FILE:
+                return data['filename']
+            if column == COL_CONF:
+                return f"{int(data['confidence'] * 100)}%"
+            if column == COL_DEST:
+                return _display_target(data)
+        elif role == Qt.ItemDataRole.FontRole and column == COL_FILE:
+            return self._bold
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column == COL_CONF:
+            return Qt.AlignmentFlag.AlignCenter
+        elif role == Qt.ItemDataRole.ForegroundRole and column == COL_DEST:
+            # Highlight branded shortcuts in Yellow-Gold for visibility
+            if "[" in data['target_name'] and not data['filename'].startswith("["):
+                return QColor(Qt.GlobalColor.yellow)
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    # --- Diffs ---
+    def action_ids(self):
+        return list(self._ids)
+
+    def row_at(self, row):
+        """The action dict shown in a (source) row."""
+        return self._rows[self._ids[row]]
+
+    def sync(self, pending_dict):
+        """Diffs a full snapshot against the current rows and applies only the difference."""
+        removed = [aid for aid in self._ids if aid not in pending_dict]
+        added = {aid: data for aid, data in pending_dict.items() if aid not in self._rows}
+        self.apply_diff(added, removed)
+
+    def apply_diff(self, added, removed):
+        """added: {action_id: action} (new or updated rows); removed: iterable of action ids."""
+        removed = {aid for aid in removed if aid in self._rows}
+
+        new = {}
+        for action_id, data in added.items():
+            if action_id not in self._rows:
+                new[action_id] = data
+                continue
+            row = self._ids.index(action_id)
+            if self._keys and self._sort_key(data, action_id) != self._keys[row]:
+                # Its place in the order changed: take it out and merge it back in
+                removed.add(action_id)
+                new[action_id] = data
+                continue
+            self._rows[action_id] = data
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+
+        if removed:
+            self._remove(removed)
+        if new:
+            self._insert(new)
+
+    @staticmethod
+    def _runs(rows):
+        """Groups sorted row numbers into [first, last] runs of consecutive rows."""
+        runs = []
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        return runs
+
+    def _remove(self, removed):
+        rows = [i for i, aid in enumerate(self._ids) if aid in removed]
+
+        # One beginRemoveRows per contiguous run, last run first so earlier rows keep their index
+        for first, last in reversed(self._runs(rows)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._ids[first:last + 1]
+            if self._keys:
+                del self._keys[first:last + 1]
+            self.endRemoveRows()
+
+        for action_id in removed:
+            del self._rows[action_id]
+
+    def _insert(self, new):
+        if self._sort_column < 0:
+            first = len(self._ids)
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            self._ids.extend(new)
+            self._rows.update(new)
+            self.endInsertRows()
+            return
+
+        # Sort the batch, then find where each new row goes among the existing ones
+        batch = sorted((self._sort_key(data, aid), aid) for aid, data in new.items())
+        runs = []  # [position in the current order, keys, ids]
+        for key, action_id in batch:
+            position = bisect_right(self._keys, key)
+            if runs and runs[-1][0] == position:
+                runs[-1][1].append(key)
+                runs[-1][2].append(action_id)
+            else:
+                runs.append([position, [key], [action_id]])
+
+        self._rows.update(new)
+        # Last run first, so the positions of the earlier ones stay valid
+        for position, keys, ids in reversed(runs):
+            self.beginInsertRows(QModelIndex(), position, position + len(ids) - 1)
+            self._ids[position:position] = ids
+            self._keys[position:position] = keys
+            self.endInsertRows()
+
+    # --- Sorting ---
+    def _sort_key(self, data, action_id):
+        if self._sort_column == COL_FILE:
+            key = (data['filename'].lower(), action_id)
+        elif self._sort_column == COL_CONF:
+            key = (data['confidence'], action_id)
+        elif self._sort_column == COL_DEST:
+            key = (_display_target(data).lower(), action_id)
+        else:
+            key = (action_id,)
+        return _Descending(key) if self._sort_order == Qt.SortOrder.DescendingOrder else key
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        old_ids = self._ids
+
+        self._sort_column = column if column != COL_ACTION else -1
+        self._sort_order = order
+        if self._sort_column >= 0:
+            ordered = sorted((self._sort_key(self._rows[aid], aid), aid) for aid in old_ids)
+            self._keys = [key for key, _ in ordered]
+            self._ids = [aid for _, aid in ordered]
+        else:
+            self._keys = []
+
+        # Keep selection and the current index on the same actions
+        new_row = {aid: row for row, aid in enumerate(self._ids)}
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(new_row[old_ids[i.row()]], i.column()) for i in persistent]
+        )
+        self.layoutChanged.emit()
+
+
+class PendingFilterProxy(QSortFilterProxyModel):
+    """Case-insensitive text filter over file and destination; sorting is delegated to the source model."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._needle = ""
+        self.setDynamicSortFilter(False)
+
+    def set_filter_text(self, text):
+        self._needle = text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._needle:
+            return True
+        data = self.sourceModel().row_at(source_row)
+        return self._needle in data['filename'].lower() or self._needle in _display_target(data).lower()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def action_ids(self):
+        return [self.index(row, 0).data(ACTION_ID_ROLE) for row in range(self.rowCount())]
+
+
+class ActionButtonsDelegate(QStyledItemDelegate):
+    """Paints the approve/reject buttons for every row, so no per-row widgets are created."""
+
+    approve_clicked = pyqtSignal(int)
+    reject_clicked = pyqtSignal(int)
+
+    SIZE = 36
+    SPACING = 10
+
+    # Mirrors #BtnApprove / #BtnReject in styles.qss
+    STYLES = {
+        "approve": ("✔", QColor("#a6e3a1"), QColor("#2a3b2a")),
+        "reject": ("✘", QColor("#f38ba8"), QColor("#3b1e2a")),
+    }
+    BACKGROUND = QColor("#1e1e2e")
+    HOVER_TEXT = QColor("#0f0f17")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._hover = None  # (action id, button name) under the mouse
+
+    def _button_rects(self, rect):
+        total = 2 * self.SIZE + self.SPACING
+        x = rect.x() + (rect.width() - total) / 2
+        y = rect.y() + (rect.height() - self.SIZE) / 2
+        return {
+            "approve": QRectF(x, y, self.SIZE, self.SIZE),
+            "reject": QRectF(x + self.SIZE + self.SPACING, y, self.SIZE, self.SIZE),
+        }
+
+    def _hit(self, rect, pos):
+        for name, button in self._button_rects(rect).items():
+            if button.contains(pos.toPointF()):
+                return name
+        return None
+
+    def paint(self, painter, option, index):
+        # Row background and selection come from the style; the text is painted by us
+        self.initStyleOption(option, index)
+        option.text = ""
+        option.widget.style().drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+
+        action_id = index.data(ACTION_ID_ROLE)
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        font = painter.font()
+        font.setPixelSize(16)
+        painter.setFont(font)
+        for name, rect in self._button_rects(option.rect).items():
+            glyph, accent, border = self.STYLES[name]
+            hovered = self._hover == (action_id, name)
+            painter.setPen(QPen(accent if hovered else border, 1.5))
+            painter.setBrush(accent if hovered else self.BACKGROUND)
+            painter.drawEllipse(rect)
+            painter.setPen(self.HOVER_TEXT if hovered else accent)
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, glyph)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        action_id = index.data(ACTION_ID_ROLE)
+        if event.type() == QEvent.Type.MouseMove:
+            name = self._hit(option.rect, event.position().toPoint())
+            hover = (action_id, name) if name else None
+            if hover != self._hover:
+                self._hover = hover
+                option.widget.viewport().update()
+            return False
+
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            name = self._hit(option.rect, event.position().toPoint())
+            if name == "approve":
+                self.approve_clicked.emit(action_id)
+                return True
+            if name == "reject":
+                self.reject_clicked.emit(action_id)
+                return True
+        return False
+
+    def clear_hover(self):
+        self._hover = None
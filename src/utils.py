@@ -1,5 +1,11 @@
 import logging
+import logging.handlers
+import multiprocessing
+import os
 import sys
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
 def setup_logging(name="antigravity"):
@@ -18,11 +24,79 @@ def setup_logging(name="antigravity"):
         handler.setFormatter(formatter)
         logger.addHandler(handler)
         
-        # Also log to file
+        # Also log to file; rotated so a long auto-pilot session can't fill the disk.
+        # Worker processes (the extraction pool) stay on stdout: several handles
+        # on one rotating file break its rollover on Windows.
+        if multiprocessing.parent_process() is not None:
+            return logger
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
-        file_handler = logging.FileHandler(log_dir / "antigravity.log")
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_dir / "antigravity.log", maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8"
+        )
         file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
 
     return logger
+
+
+def path_key(path):
+    """Normalised form of a path for lookups, so watchdog's and our own spellings compare equal."""
+    return os.path.normcase(os.path.normpath(str(path)))
+
+
+class BoundedTable:
+    """
+    Thread-safe mapping capped at max_size entries, least recently set first out.
+    Entries older than ttl seconds are dropped by prune(). Counts evictions so
+    long-running callers can report how much churn they see.
+    """
+
+    def __init__(self, max_size=10000, ttl=None):
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (value, time set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[0] if entry else default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[0] if entry else default
+
+    def prune(self):
+        """Drops entries older than ttl; the oldest sit at the front, so this stops at the first fresh one."""
+        if self.ttl is None:
+            return 0
+        cutoff = time.monotonic() - self.ttl
+        dropped = 0
+        with self._lock:
+            while self._data:
+                key, (_, set_at) = next(iter(self._data.items()))
+                if set_at >= cutoff:
+                    break
+                del self._data[key]
+                dropped += 1
+            self.evictions += dropped
+        return dropped
@@ -1,63 +1,301 @@
+import os
+import threading
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from src.utils import setup_logging
-from collections import defaultdict
+from src.utils import setup_logging, BoundedTable, path_key
+from src.path_filter import PathFilter
+from src.dir_tree import DirectoryTree, list_directory
 from pathlib import Path
 
 logger = setup_logging()
 
+# Per-path lifecycle: seen by watchdog -> still changing -> stable and handed over
+CREATED = "created"
+GROWING = "growing"
+SETTLED = "settled"
+
+
+class _PathState:
+    __slots__ = ("state", "signature", "last_event", "last_change")
+
+    def __init__(self, now):
+        self.state = CREATED
+        self.signature = None
+        self.last_event = now
+        self.last_change = now
+
+
 class AntigravityHandler(FileSystemEventHandler):
-    def __init__(self, callback, config):
+    """
+    Coalesces watchdog events per path and hands each file over once it has settled.
+
+    Event callbacks only record the path, so the watchdog thread never blocks.
+    A consumer thread polls the tracked paths and calls the callback once a
+    path's size and mtime have been stable for settle_seconds, which skips
+    half-written downloads and extractions.
+
+    Under a recursive watch root, folders are containers rather than items:
+    a new or moved-in folder is added to the directory tree and walked (within
+    the root's depth limit) on the consumer thread, and events from folders
+    out of scope are dropped.
+
+    own_writes is the executor's table of paths it just wrote: create, modify
+    and move events landing on them are dropped, so a file organised in place
+    (a shortcut branded on the Desktop) is not picked up and filed again.
+    """
+
+    def __init__(self, callback, config, path_filter=None, event_listener=None, tree=None, own_writes=None):
         self.callback = callback
+        # Sees every raw event before filtering (e.g. to keep the executor's name index current)
+        self.event_listener = event_listener
         self.config = config
-        self.last_events = defaultdict(float)
-        self.debounce_seconds = 1.0
-        self.ignore_patterns = set(config.get("ignore_patterns", []))
-
-    def _is_ignored(self, file_path):
-        # Basic implementation of ignore patterns
-        # Real implementation would use fnmatch for globs
-        path = Path(file_path)
-        if path.name.startswith("~") or path.name.startswith("."):
-            return True
-        return False
+        self.path_filter = path_filter or PathFilter(config)
+        self.tree = tree
+        self.own_writes = own_writes
+        # path -> (size, mtime) last handed over, so an unchanged file is never handed over twice.
+        # Bounded and aged out so a busy Downloads folder can't grow it forever.
+        self.last_events = BoundedTable(
+            max_size=config.get("watch_debounce_max_entries", 10000),
+            ttl=config.get("watch_debounce_ttl_seconds", 3600)
+        )
+        self.settle_seconds = config.get("watch_settle_seconds", 2.0)
+        self.poll_interval = config.get("watch_poll_interval", 0.5)
+        self.max_tracked = config.get("watch_max_tracked", 50000)
+
+        self._states = {}
+        self._new_dirs = []
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._consumer = None
+
+    def _is_own_write(self, file_path):
+        return self.own_writes is not None and path_key(file_path) in self.own_writes
+
+    def _is_ignored(self, file_path, is_directory=False):
+        # Decided from the name alone, so event storms of temp files never reach a stat
+        if is_directory:
+            return self.path_filter.is_ignored(file_path)
+        return not self.path_filter.passes_name_rules(file_path)
+
+    def start(self):
+        self._stop.clear()
+        self._consumer = threading.Thread(target=self._run, name="WatchConsumer", daemon=True)
+        self._consumer.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._consumer:
+            self._consumer.join()
+            self._consumer = None
+
+    def _notify(self, event):
+        if self.event_listener:
+            try:
+                self.event_listener(event)
+            except Exception as e:
+                logger.debug(f"Event listener failed for {event.src_path}: {e}")
+
+    def _in_recursive_root(self, dir_path):
+        if self.tree is None:
+            return False
+        dir_path = os.path.normpath(dir_path)
+        return any(root.recursive and dir_path.startswith(os.path.join(root.path, "")) for root in self.tree.roots)
+
+    def _expand(self, dir_path):
+        """
+        Queues a new folder under a recursive root for walking (when it is in
+        scope); False when folders are items here.
+        """
+        if not self._in_recursive_root(dir_path):
+            return False
+        if self.tree.add_directory(dir_path):
+            with self._lock:
+                self._new_dirs.append(dir_path)
+        return True
 
     def on_created(self, event):
-        self._process_event(event)
+        self._notify(event)
+        if event.is_directory and self._expand(event.src_path):
+            return
+        self._track(event.src_path, event.is_directory)
 
     def on_modified(self, event):
-        self._process_event(event)
+        # A directory "modification" only means its listing changed
+        if event.is_directory:
+            return
+        self._track(event.src_path, event.is_directory)
+
+    def on_moved(self, event):
+        # Browsers and archivers write to a temp name and rename when done
+        self._notify(event)
+        with self._lock:
+            state = self._states.pop(event.src_path, None)
+            self.last_events.pop(event.src_path, None)
+        if event.is_directory and self.tree is not None:
+            self.tree.remove_directory(event.src_path)
+            if self._expand(event.dest_path):
+                return
+        if self._is_own_write(event.dest_path) or self._is_ignored(event.dest_path, event.is_directory):
+            return
+        if self.tree is not None and not event.is_directory and not self.tree.accepts_file(event.dest_path):
+            return
+        with self._lock:
+            if state:
+                state.last_event = time.monotonic()
+                self._states[event.dest_path] = state
+            else:
+                self._states.setdefault(event.dest_path, _PathState(time.monotonic()))
 
-    def _process_event(self, event):
-        file_path = event.src_path
-        if self._is_ignored(file_path):
+    def on_deleted(self, event):
+        self._notify(event)
+        with self._lock:
+            self._states.pop(event.src_path, None)
+            self.last_events.pop(event.src_path, None)
+        if self.tree is not None:
+            # Deletions can't tell files from folders on every platform; forgetting a file is a no-op
+            self.tree.remove_directory(event.src_path)
+
+    def _track(self, file_path, is_directory=False):
+        if self._is_own_write(file_path) or self._is_ignored(file_path, is_directory):
+            return
+        if self.tree is not None and not is_directory and not self.tree.accepts_file(file_path):
             return
 
-        current_time = time.time()
-        last_time = self.last_events[file_path]
-        
-        if current_time - last_time < self.debounce_seconds:
+        now = time.monotonic()
+        with self._lock:
+            state = self._states.get(file_path)
+            if state:
+                state.last_event = now
+            elif len(self._states) < self.max_tracked:
+                self._states[file_path] = _PathState(now)
+            else:
+                self._dropped += 1
+
+    def _poll(self):
+        """Advances every tracked path and returns the ones that have settled."""
+        now = time.monotonic()
+        with self._lock:
+            tracked = list(self._states.items())
+
+        settled = []
+        for file_path, state in tracked:
+            try:
+                st = os.stat(file_path)
+                signature = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                signature = None
+
+            with self._lock:
+                if self._states.get(file_path) is not state:
+                    continue  # moved or deleted meanwhile
+
+                if signature is None:
+                    del self._states[file_path]
+                    continue
+
+                if signature != state.signature:
+                    if state.signature is not None:
+                        state.state = GROWING
+                    state.signature = signature
+                    state.last_change = now
+                    continue
+
+                quiet_for = now - max(state.last_change, state.last_event)
+                if quiet_for < self.settle_seconds:
+                    continue
+
+                state.state = SETTLED
+                del self._states[file_path]
+                if self.last_events.get(file_path) == signature:
+                    continue
+                self.last_events.set(file_path, signature)
+                settled.append(file_path)
+
+        return settled
+
+    def metrics(self):
+        with self._lock:
+            tracked = len(self._states)
+            dropped = self._dropped
+        return {
+            "debounce_size": len(self.last_events),
+            "debounce_evictions": self.last_events.evictions,
+            "tracked_paths": tracked,
+            "dropped_events": dropped
+        }
+
+    def _walk_new_dirs(self):
+        """Tracks the files of folders that appeared under a recursive root; their own files raise no events."""
+        with self._lock:
+            new_dirs, self._new_dirs = self._new_dirs, []
+        if not new_dirs:
             return
-        
-        self.last_events[file_path] = current_time
-        logger.info(f"File detected: {file_path}")
-        self.callback(file_path)
-
-def start_watcher(callback, config):
-    paths = config.get("watch_paths", [])
-    if not paths:
+        for dir_path, records in self.tree.walk(list_directory, cancelled=self._stop.is_set, roots=new_dirs):
+            for record in records:
+                self._track(record.path)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self._walk_new_dirs()
+            self.last_events.prune()
+            if self.own_writes is not None:
+                self.own_writes.prune()
+            for file_path in self._poll():
+                logger.info(f"File detected: {file_path}")
+                try:
+                    self.callback(file_path)
+                except Exception as e:
+                    logger.error(f"Failed to handle {file_path}: {e}")
+
+
+class WatchObserver(Observer):
+    """Observer that also starts and stops its handlers' consumer threads."""
+
+    def __init__(self):
+        super().__init__()
+        self._consumers = []
+
+    def add_consumer(self, handler):
+        self._consumers.append(handler)
+
+    def metrics(self):
+        totals = {}
+        for handler in self._consumers:
+            for key, value in handler.metrics().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def start(self):
+        for handler in self._consumers:
+            handler.start()
+        super().start()
+
+    def stop(self):
+        super().stop()
+        for handler in self._consumers:
+            handler.stop()
+
+
+def start_watcher(callback, config, path_filter=None, event_listener=None, tree=None, own_writes=None):
+    tree = tree or DirectoryTree(config, path_filter)
+    if not tree.roots:
         logger.warning("No watch paths configured.")
         return None
 
-    observer = Observer()
-    handler = AntigravityHandler(callback, config)
+    observer = WatchObserver()
+    handler = AntigravityHandler(callback, config, path_filter, event_listener, tree, own_writes)
+    observer.add_consumer(handler)
 
-    for path in paths:
-        p = Path(path)
+    for root in tree.roots:
+        p = Path(root.path)
         if p.exists() and p.is_dir():
-            logger.info(f"Watching: {p}")
-            observer.schedule(handler, str(p), recursive=False)
+            if root.recursive:
+                logger.info(f"Watching: {p} (recursive, max depth {root.max_depth})")
+            else:
+                logger.info(f"Watching: {p}")
+            observer.schedule(handler, str(p), recursive=root.recursive)
         else:
             logger.warning(f"Watch path not found: {p}")
 
@@ -0,0 +1,98 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DECISION = {
+    "category": "Documents",
+    "confidence": 0.95,
+    "suggested_name": "report.pdf",
+    "folder": "Documents/Reports",
+    "tags": ["test"]
+}
+
+
+class FakeProvider:
+    """
+    OpenAI-compatible endpoint on localhost. Each chat request takes the next
+    (status, headers) or (status, headers, body) from `script`; once it runs
+    out, requests succeed. A body given as a list of (delay, bytes) is sent
+    chunked, each piece after its delay.
+    """
+
+    def __init__(self):
+        self.script = []
+        self.requests = 0
+        self.payloads = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def _handler(self):
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, status, pieces, headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for delay, piece in pieces:
+                    time.sleep(delay)
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_GET(self):
+                self._send(200, json.dumps({"models": [{"name": "test-model"}]}).encode())
+
+            def do_POST(self):
+                provider.payloads.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                provider.requests += 1
+                if provider.script:
+                    status, headers, *body = provider.script.pop(0)
+                    if body and isinstance(body[0], list):
+                        self._stream(status, body[0], headers)
+                    else:
+                        self._send(status, body[0] if body else b"{}", headers)
+                    return
+                answer = {"choices": [{"message": {"content": json.dumps(DECISION)}}]}
+                self._send(200, json.dumps(answer).encode())
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def provider():
+    fake = FakeProvider()
+    fake.start()
+    yield fake
+    fake.stop()
@@ -0,0 +1,56 @@
+import threading
+import time
+
+from src.batcher import EventBatcher
+
+
+class Collector:
+    def __init__(self):
+        self.batches = []
+        self.flushed = threading.Event()
+
+    def __call__(self, batch):
+        self.batches.append((time.monotonic(), batch))
+        self.flushed.set()
+
+
+def test_partial_batch_flushes_after_max_wait():
+    collector = Collector()
+    batcher = EventBatcher(collector, batch_size=8, max_wait=0.2)
+    batcher.start()
+    try:
+        submitted = time.monotonic()
+        batcher.submit("a.txt")
+        batcher.submit("b.txt")
+
+        assert collector.flushed.wait(2.0)
+        flushed_at, batch = collector.batches[0]
+        assert batch == ["a.txt", "b.txt"]
+        assert 0.15 <= flushed_at - submitted < 1.0
+    finally:
+        batcher.stop()
+
+
+def test_full_batch_flushes_at_once():
+    collector = Collector()
+    batcher = EventBatcher(collector, batch_size=3, max_wait=30.0)
+    batcher.start()
+    try:
+        for name in ("a", "b", "c"):
+            batcher.submit(name)
+        assert collector.flushed.wait(2.0)
+        assert collector.batches[0][1] == ["a", "b", "c"]
+    finally:
+        batcher.stop()
+
+
+def test_duplicates_are_dropped_and_stop_hands_over_the_rest():
+    collector = Collector()
+    batcher = EventBatcher(collector, batch_size=8, max_wait=30.0)
+    batcher.start()
+    batcher.submit("a")
+    batcher.submit("a")
+    batcher.submit("b")
+    batcher.stop()
+
+    assert [batch for _, batch in collector.batches] == [["a", "b"]]
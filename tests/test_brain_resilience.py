@@ -0,0 +1,179 @@
+import json
+import time
+
+import pytest
+
+from src.brain_client import BrainClient
+from src.resilience import BrainUnavailableError, CircuitBreaker, breaker_for
+from tests.conftest import DECISION
+
+
+def make_client(provider, **overrides):
+    config = {
+        "ai_provider": "ollama",
+        "ollama_base_url": provider.base_url,
+        "ai_model": "test-model",
+        "brain_stream": False,
+        "brain_max_retries": 6,
+        "brain_breaker_threshold": 2,
+        "brain_breaker_cooldown_seconds": 60,
+        "brain_backoff_base_seconds": 0.01,
+        "brain_backoff_max_seconds": 0.02,
+    }
+    config.update(overrides)
+    return BrainClient(config)
+
+
+def test_rate_limits_do_not_open_the_breaker(provider):
+    provider.script = [(429, {"Retry-After": "0.05"})] * 5
+    client = make_client(provider)
+
+    assert client.ask_brain({"filename": "report.pdf"}) is not None
+    assert provider.requests == 6
+
+    breaker = breaker_for(provider.base_url, {})
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+def test_server_errors_open_the_breaker(provider):
+    provider.script = [(503, {})] * 5
+    client = make_client(provider)
+
+    with pytest.raises(BrainUnavailableError):
+        client.ask_brain({"filename": "report.pdf"})
+    # Threshold 2: the breaker opens and the retries stop there
+    assert provider.requests == 2
+    assert breaker_for(provider.base_url, {}).state == CircuitBreaker.OPEN
+
+    with pytest.raises(BrainUnavailableError, match="circuit open"):
+        client.ask_brain({"filename": "report.pdf"})
+    assert provider.requests == 2
+
+
+def test_throttled_trial_leaves_half_open_circuit_retryable():
+    breaker = CircuitBreaker("test", threshold=1, cooldown=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_throttled()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_after_threshold_and_lets_one_trial_through():
+    breaker = CircuitBreaker("test", threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert not breaker.allow_retry()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    # A failed trial opens the circuit again for another cooldown
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def open_circuit(provider, client):
+    provider.script = [(503, {})] * 2
+    with pytest.raises(BrainUnavailableError):
+        client.ask_brain({"filename": "report.pdf"})
+    breaker = breaker_for(provider.base_url, {})
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker.cooldown = 0
+    return breaker
+
+
+def test_client_error_during_trial_closes_the_circuit(provider):
+    client = make_client(provider)
+    breaker = open_circuit(provider, client)
+
+    provider.script = [(404, {})]
+    assert client.ask_brain({"filename": "report.pdf"}) is None
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    requests = provider.requests
+    assert client.ask_brain({"filename": "report.pdf"}) is not None
+    assert provider.requests == requests + 1
+
+
+def test_unreadable_reply_during_trial_does_not_wedge_the_circuit(provider):
+    client = make_client(provider)
+    breaker = open_circuit(provider, client)
+
+    provider.script = [(200, {}, b"not json")]
+    assert client.ask_brain({"filename": "report.pdf"}) is None
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # The next trial is let through and closes the circuit
+    assert client.ask_brain({"filename": "report.pdf"}) is not None
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unrelated_bad_request_keeps_structured_output(provider):
+    client = make_client(provider, ai_model="model-a")
+    provider.script = [(400, {}, b'{"error": {"code": "context_length_exceeded"}}')]
+
+    assert client.ask_brain({"filename": "report.pdf"}) is None
+    assert client.ask_brain({"filename": "report.pdf"}) is not None
+    assert all("response_format" in payload for payload in provider.payloads)
+
+
+def test_schema_rejection_falls_back_for_that_model_only(provider):
+    client = make_client(provider, ai_model="model-b")
+    provider.script = [(400, {}, b'{"error": "response_format json_schema is not supported"}')]
+
+    assert client.ask_brain({"filename": "report.pdf"}) is not None
+    assert ["response_format" in payload for payload in provider.payloads] == [True, False]
+
+    # A new client for the same model remembers; another model still asks for the schema
+    assert make_client(provider, ai_model="model-b").ask_brain({"filename": "report.pdf"}) is not None
+    assert make_client(provider, ai_model="model-c").ask_brain({"filename": "report.pdf"}) is not None
+    assert ["response_format" in payload for payload in provider.payloads[2:]] == [False, True]
+
+
+def sse(text, pieces):
+    """The decision as server-sent events, split into `pieces` content deltas."""
+    size = -(-len(text) // pieces)
+    events = [
+        b"data: " + json.dumps({"choices": [{"delta": {"content": text[i:i + size]}}]}).encode() + b"\n\n"
+        for i in range(0, len(text), size)
+    ]
+    return events + [b"data: [DONE]\n\n"]
+
+
+def test_slow_stream_is_not_cut_off_while_chunks_keep_coming(provider):
+    events = sse(json.dumps(DECISION), 6)
+    provider.script = [(200, {}, [(0.15, event) for event in events])]
+    client = make_client(provider, brain_stream=True, brain_read_timeout_seconds=0.5, brain_max_retries=0)
+
+    # About a second in total, but never more than 0.15 s between chunks
+    assert client.ask_brain({"filename": "report.pdf"})["category"] == DECISION["category"]
+
+
+def test_stalled_stream_times_out(provider):
+    events = sse(json.dumps(DECISION), 2)
+    provider.script = [(200, {}, [(0, events[0]), (1.0, events[1])])]
+    client = make_client(provider, brain_stream=True, brain_read_timeout_seconds=0.3, brain_max_retries=0)
+
+    with pytest.raises(BrainUnavailableError):
+        client.ask_brain({"filename": "report.pdf"})
+
+
+def test_buffered_timeout_grows_with_the_batch():
+    client = BrainClient({"brain_read_timeout_seconds": 30, "brain_timeout_per_file_seconds": 10}).aio
+    assert client._timeout(False, files=1).total == 30
+    assert client._timeout(False, files=8).total == 100
+    assert client._timeout(True, files=8).total is None
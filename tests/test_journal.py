@@ -0,0 +1,80 @@
+import json
+
+from src.journal import UndoJournal
+
+
+def on_disk(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_append_and_pop_last(tmp_path):
+    journal = UndoJournal(tmp_path / "undo.jsonl")
+    for i in range(3):
+        journal.append({"n": i})
+
+    assert len(journal) == 3
+    assert journal.peek_last() == {"n": 2}
+    assert journal.pop_last() == {"n": 2}
+    assert on_disk(tmp_path / "undo.jsonl") == [{"n": 0}, {"n": 1}]
+    journal.close()
+
+    reopened = UndoJournal(tmp_path / "undo.jsonl")
+    assert reopened.peek_last() == {"n": 1}
+    assert len(reopened) == 2
+    assert on_disk(tmp_path / "undo.jsonl") == [{"n": 0}, {"n": 1}]
+    reopened.close()
+
+
+def test_pop_last_on_empty_journal(tmp_path):
+    journal = UndoJournal(tmp_path / "undo.jsonl")
+    assert journal.pop_last() is None
+    assert journal.peek_last() is None
+    journal.close()
+
+
+def test_rotation_keeps_newest_entries(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    journal = UndoJournal(path, max_entries=3)
+    for i in range(6):
+        journal.append({"n": i})
+
+    assert on_disk(path) == [{"n": 3}, {"n": 4}, {"n": 5}]
+    archive = (tmp_path / "undo.jsonl.1").read_text().splitlines()
+    assert len(archive) == 3
+
+    journal.append({"n": 6})
+    assert journal.pop_last() == {"n": 6}
+    assert journal.peek_last() == {"n": 5}
+    journal.close()
+
+
+def test_truncated_tail_is_dropped_on_open(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    journal = UndoJournal(path)
+    journal.append({"n": 0})
+    journal.append({"n": 1})
+    journal.close()
+
+    # A crash in the middle of the third append
+    with open(path, "ab") as f:
+        f.write(b'{"n": 2, "orig')
+
+    recovered = UndoJournal(path)
+    assert len(recovered) == 2
+    assert on_disk(path) == [{"n": 0}, {"n": 1}]
+    assert path.read_bytes().endswith(b"\n")
+
+    recovered.append({"n": 2})
+    assert recovered.peek_last() == {"n": 2}
+    recovered.close()
+
+
+def test_legacy_log_is_migrated_once(tmp_path):
+    legacy = tmp_path / "undo_log.json"
+    legacy.write_text('[{"n": 0}, {"n": 1}]')
+
+    journal = UndoJournal(tmp_path / "undo.jsonl", legacy_path=legacy)
+    assert on_disk(tmp_path / "undo.jsonl") == [{"n": 0}, {"n": 1}]
+    assert not legacy.exists()
+    assert (tmp_path / "undo_log.json.migrated").exists()
+    journal.close()
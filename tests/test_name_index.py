@@ -0,0 +1,49 @@
+from src.executor import ActionExecutor
+from src.name_index import NameIndex
+
+
+def test_reserve_skips_names_on_disk(tmp_path):
+    (tmp_path / "report.pdf").write_text("old")
+    (tmp_path / "report_1.pdf").write_text("old")
+
+    index = NameIndex()
+    assert index.reserve(tmp_path, "report.pdf") == "report_2.pdf"
+    assert index.reserve(tmp_path, "report.pdf") == "report_3.pdf"
+    assert index.reserve(tmp_path, "notes.txt") == "notes.txt"
+
+
+def test_released_name_can_be_reserved_again(tmp_path):
+    index = NameIndex()
+    assert index.reserve(tmp_path, "a.txt") == "a.txt"
+    index.release(tmp_path / "a.txt")
+    assert index.reserve(tmp_path, "a.txt") == "a.txt"
+
+
+def test_batch_move_never_overwrites_existing_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source_dir = tmp_path / "inbox"
+    source_dir.mkdir()
+    dest = tmp_path / "safe" / "Docs"
+    dest.mkdir(parents=True)
+
+    executor = ActionExecutor({"safe_root": str(tmp_path / "safe"), "undo_journal_path": str(tmp_path / "undo.jsonl")})
+    # The index lists the folder now; files created behind its back must still be respected
+    executor.name_index.reserve(dest, "warmup.txt")
+    (dest / "x.txt").write_text("PRECIOUS")
+    (dest / "x_1.txt").write_text("PRECIOUS")
+
+    sources = []
+    for i in range(2):
+        path = source_dir / f"in{i}.txt"
+        path.write_text(f"new {i}")
+        sources.append(path)
+
+    results = executor.move_files_batch([(str(path), "Docs", "x.txt") for path in sources])
+
+    assert (dest / "x.txt").read_text() == "PRECIOUS"
+    assert (dest / "x_1.txt").read_text() == "PRECIOUS"
+    assert None not in results
+    assert len(set(results)) == 2
+    assert sorted((dest / name).read_text() for name in ("x_2.txt", "x_3.txt")) == ["new 0", "new 1"]
+    assert not any(path.exists() for path in sources)
+    executor.undo_journal.close()
@@ -0,0 +1,87 @@
+import pytest
+
+from src.preclassifier import PreClassifier
+
+
+def decide(filename, excerpt="", **config):
+    extension = "." + filename.rsplit(".", 1)[-1].lower()
+    return PreClassifier(config).classify({"filename": filename, "extension": extension, "text_excerpt": excerpt})
+
+
+@pytest.mark.parametrize("filename, excerpt", [
+    ("photo.png", ""),
+    ("notes.txt", "shopping list: milk, eggs"),
+    ("sketch.ino", "void setup() {\n  pinMode(13, OUTPUT);\n}"),
+    ("scan.pdf", "PDF 1.4"),
+    ("scan.pdf", "PDF 1.7\ncreator: Microsoft Word\nproducer: Microsoft: Print To PDF"),
+    ("part.stl", "Binary STL\nheader: Exported from SOLIDWORKS\ntriangles: 1204"),
+    ("part.stl", "ASCII STL\nfacets: 12"),
+    ("moves.gcode", "G-code"),
+    ("plate.dxf", "DXF drawing\nAutoCAD 2018\nunits: millimeters\nlayers: 0, Defpoints\nentities: LINE 40"),
+    ("empty.docx", ""),
+])
+def test_format_only_excerpts_are_decided_locally(filename, excerpt):
+    assert decide(filename, excerpt) is not None
+
+
+@pytest.mark.parametrize("filename, excerpt", [
+    ("scan.pdf", "PDF 1.4\ntitle: Lab safety induction"),
+    ("scan.pdf", "PDF 1.4\nauthor: J. Smith"),
+    ("scan.pdf", "PDF 1.5\nproducer: pdfTeX\nChapter 1 Introduction"),
+    ("part.stl", "ASCII STL\nsolid: drone_arm\nfacets: 12"),
+    ("print.gcode", "G-code\ngenerated by PrusaSlicer 2.6.0\nfilament_type: PETG"),
+    ("plate.dxf", "DXF drawing\nAutoCAD 2018\nlayers: 0, CUT, ENGRAVE"),
+    ("report.docx", "title: Quarterly report"),
+])
+def test_excerpts_with_signal_go_to_the_brain(filename, excerpt):
+    assert decide(filename, excerpt) is None
+    assert decide(filename, excerpt, preclassifier_defer_to_excerpts=False) is not None
+
+
+def test_filename_rules_win_over_the_excerpt():
+    decision = decide("Invoice_2024.pdf", "PDF 1.4\ntitle: Invoice 2024")
+    assert decision["folder"] == "Documents/Invoices"
+
+
+def test_shortcut_target_beats_its_name():
+    classifier = PreClassifier({})
+    decision = classifier.classify({"filename": "My Game.lnk", "extension": ".lnk",
+                                    "shortcut_target": r"C:\Program Files (x86)\Steam\steam.exe"})
+    assert (decision["category"], decision["folder"], decision["tags"]) == ("Gaming", "Gaming", ["shortcut"])
+    assert decision["suggested_name"] == "My_Game.lnk"
+
+    decision = classifier.classify({"filename": "Visual Studio Code.lnk", "extension": ".lnk"})
+    assert decision["category"] == "Code"
+    assert classifier.stats["shortcut_target"] == 1 and classifier.stats["shortcut_name"] == 1
+
+
+def test_unknown_shortcuts_and_extensions_are_escalated():
+    classifier = PreClassifier({})
+    # "edge" is a keyword, but only as a whole word
+    assert classifier.classify({"filename": "Knowledge Base.lnk", "extension": ".lnk"}) is None
+    assert classifier.classify({"filename": "archive.zip", "extension": ".zip"}) is None
+    assert classifier.classify({"filename": "Docs", "extension": "", "is_directory": True}) is None
+    assert classifier.stats["escalated"] == 2
+    assert classifier.calls_avoided == 0
+
+
+def test_filename_rules_only_apply_to_matching_extensions():
+    assert decide("Screenshot 2024-05-01.png")["folder"] == "Images/Screenshots"
+    assert decide("IMG_20240501.jpg")["folder"] == "Images/Photos"
+    assert decide("resume_final.docx")["folder"] == "Documents/CV"
+    # A screenshot tool's installer is not a screenshot
+    assert decide("screenshot_tool.exe") is None
+
+
+def test_rules_below_min_confidence_go_to_the_brain():
+    assert decide("notes.txt")["confidence"] == 0.9
+    assert decide("notes.txt", preclassifier_min_confidence=0.95) is None
+    assert decide("photo.png", preclassifier_enabled=False) is None
+
+
+def test_excerpt_is_only_read_when_it_can_change_the_decision():
+    classifier = PreClassifier({})
+    assert not classifier.needs_excerpt({"filename": "photo.png", "extension": ".png"})
+    assert not classifier.needs_excerpt({"filename": "invoice.pdf", "extension": ".pdf"})
+    assert classifier.needs_excerpt({"filename": "scan.pdf", "extension": ".pdf"})
+    assert classifier.needs_excerpt({"filename": "archive.zip", "extension": ".zip"})
@@ -0,0 +1,25 @@
+from src.safety import SafetyChecker
+
+
+def test_destination_is_checked_again_on_every_call(tmp_path):
+    root = tmp_path / "Vortex"
+    outside = tmp_path / "elsewhere"
+    (root / "Documents").mkdir(parents=True)
+    outside.mkdir()
+    checker = SafetyChecker({"safe_root": str(root)})
+
+    assert checker.is_safe_action("a.txt", str(root / "Documents"))
+    # The folder is swapped for a link that leads out of safe_root
+    (root / "Documents").rmdir()
+    (root / "Documents").symlink_to(outside, target_is_directory=True)
+    assert not checker.is_safe_action("a.txt", str(root / "Documents"))
+
+
+def test_safe_root_follows_the_config(tmp_path):
+    config = {"safe_root": str(tmp_path / "old")}
+    checker = SafetyChecker(config)
+    assert checker.is_safe_action("a.txt", str(tmp_path / "old" / "Images"))
+
+    config["safe_root"] = str(tmp_path / "new")
+    assert not checker.is_safe_action("a.txt", str(tmp_path / "old" / "Images"))
+    assert checker.is_safe_action("a.txt", str(tmp_path / "new" / "Images"))
@@ -0,0 +1,81 @@
+import os
+
+from src.file_record import FileRecord
+import src.scan_index
+from src.scan_index import ScanIndex
+
+
+def records(directory):
+    return [FileRecord.load(str(path)) for path in sorted(directory.iterdir())]
+
+
+def test_rescan_only_returns_new_or_changed_files(tmp_path):
+    folder = tmp_path / "Downloads"
+    folder.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (folder / name).write_text(name)
+    index = ScanIndex({"scan_index_path": str(tmp_path / "scan.db")})
+    index.ensure_fingerprint("v1")
+
+    changed, unchanged, removed = index.diff_directory(folder, records(folder))
+    assert len(changed) == 3 and unchanged == [] and removed == []
+    index.record([(r.path, r.signature, {"folder": "Documents"} if r.name == "a.txt" else None) for r in changed])
+
+    (folder / "b.txt").write_text("b, longer now")
+    (folder / "c.txt").unlink()
+    (folder / "d.txt").write_text("d")
+    changed, unchanged, removed = index.diff_directory(folder, records(folder))
+    assert sorted(r.name for r in changed) == ["b.txt", "d.txt"]
+    assert unchanged == [(str(folder / "a.txt"), {"folder": "Documents"})]
+    assert removed == [str(folder / "c.txt")]
+    index.close()
+
+
+def test_index_survives_a_restart_until_the_settings_change(tmp_path):
+    folder = tmp_path / "Downloads"
+    folder.mkdir()
+    (folder / "a.txt").write_text("a")
+    config = {"scan_index_path": str(tmp_path / "scan.db")}
+    index = ScanIndex(config)
+    index.ensure_fingerprint("v1")
+    index.record([(r.path, r.signature, None) for r in records(folder)])
+    index.close()
+
+    reopened = ScanIndex(config)
+    reopened.ensure_fingerprint("v1")
+    assert reopened.diff_directory(folder, records(folder))[0] == []
+
+    reopened.ensure_fingerprint("v2")
+    assert len(reopened) == 0
+    assert len(reopened.diff_directory(folder, records(folder))[0]) == 1
+    reopened.close()
+
+
+def test_unchanged_directory_is_not_listed_again(tmp_path, monkeypatch):
+    folder = tmp_path / "Desktop"
+    (folder / "Projects").mkdir(parents=True)
+    (folder / "a.txt").write_text("a")
+    listed = []
+    real = src.scan_index.list_directory
+
+    def counting(path):
+        listed.append(path)
+        return real(path)
+
+    monkeypatch.setattr(src.scan_index, "list_directory", counting)
+    index = ScanIndex({"scan_index_path": str(tmp_path / "scan.db")})
+
+    first, subdirs = index.list_directory(str(folder))
+    assert [r.name for r in first] == ["a.txt"] and subdirs == ["Projects"]
+    second, subdirs = index.list_directory(str(folder))
+    assert listed == [str(folder)]
+    assert [r.name for r in second] == ["a.txt"] and subdirs == ["Projects"]
+
+    # A new entry moves the directory's mtime, so it is listed afresh
+    (folder / "b.txt").write_text("b")
+    stat = os.stat(folder)
+    os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    third, _ = index.list_directory(str(folder))
+    assert len(listed) == 2
+    assert sorted(r.name for r in third) == ["a.txt", "b.txt"]
+    index.close()
@@ -0,0 +1,71 @@
+import json
+
+from src.stream_parser import IncrementalJSONParser
+
+
+def feed_in_chunks(parser, text, size):
+    snapshots = []
+    for i in range(0, len(text), size):
+        snapshots.append(json.dumps(parser.feed(text[i:i + size])))
+    return snapshots
+
+
+def test_object_members_appear_as_they_complete():
+    parser = IncrementalJSONParser()
+    parser.feed('{"category": "Docu')
+    assert parser.value == {}
+
+    parser.feed('ments", "confidence": 0.9')
+    assert parser.value == {"category": "Documents"}
+    assert not parser.closed
+
+    parser.feed(', "tags": ["a", "b"]}')
+    assert parser.value == {"category": "Documents", "confidence": 0.9, "tags": ["a", "b"]}
+    assert parser.closed
+
+
+def test_fence_and_wrapper_are_skipped():
+    text = '```json\n{"decisions": [{"index": 0, "folder": "A"}, {"index": 1, "folder": "B"}]}\n```'
+    parser = IncrementalJSONParser(start_after='"decisions"')
+    feed_in_chunks(parser, text, 5)
+    assert parser.value == [{"index": 0, "folder": "A"}, {"index": 1, "folder": "B"}]
+    assert parser.closed
+
+
+def test_brackets_and_escapes_inside_strings():
+    value = {"name": 'a "quoted", [bracketed] {name}\\', "n": 1}
+    parser = IncrementalJSONParser()
+    feed_in_chunks(parser, json.dumps(value), 1)
+    assert parser.value == value
+    assert parser.errors == 0
+
+
+def test_bad_member_is_counted_and_skipped():
+    parser = IncrementalJSONParser()
+    parser.feed('[{"ok": 1}, {oops}, {"ok": 2}]')
+    assert parser.value == [{"ok": 1}, {"ok": 2}]
+    assert parser.errors == 1
+
+
+def test_text_after_the_root_is_ignored():
+    parser = IncrementalJSONParser()
+    parser.feed('[1, 2] and [3]')
+    assert parser.value == [1, 2]
+    assert parser.closed
+
+
+def test_bare_array_is_accepted_in_place_of_the_wrapper():
+    wrapped = '{"decisions": [{"index": 0, "folder": "A"}, {"index": 1, "folder": "B"}]}'
+    bare = '```json\n[{"index": 0, "folder": "A"}, {"index": 1, "folder": "B"}]\n```'
+    for text in (wrapped, bare):
+        parser = IncrementalJSONParser(start_after='"decisions"')
+        feed_in_chunks(parser, text, 3)
+        assert parser.value == [{"index": 0, "folder": "A"}, {"index": 1, "folder": "B"}]
+        assert parser.closed
+
+
+def test_wrapper_waits_for_its_marker():
+    parser = IncrementalJSONParser(start_after='"decisions"')
+    assert parser.feed('{"note": [1], "deci') is None
+    parser.feed('sions": [{"index": 0}]}')
+    assert parser.value == [{"index": 0}]
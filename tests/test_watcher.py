@@ -0,0 +1,120 @@
+import threading
+import time
+
+from watchdog.events import FileCreatedEvent, FileModifiedEvent, FileMovedEvent
+
+from src.executor import ActionExecutor
+from src.main import AntigravitySystem
+from src.watcher import AntigravityHandler, start_watcher
+
+FAST = {"watch_settle_seconds": 0.2, "watch_poll_interval": 0.05}
+
+
+class Collector:
+    def __init__(self):
+        self.paths = []
+        self.seen = threading.Event()
+
+    def __call__(self, path):
+        self.paths.append(path)
+        self.seen.set()
+
+
+def settle(handler, seconds=0.5):
+    """Drives the consumer by hand: polls until the settle window has passed."""
+    deadline = time.monotonic() + seconds
+    settled = []
+    while time.monotonic() < deadline:
+        settled.extend(handler._poll())
+        time.sleep(0.05)
+    return settled
+
+
+def test_file_is_handed_over_once_it_stops_changing(tmp_path):
+    path = tmp_path / "download.txt"
+    path.write_text("part")
+    handler = AntigravityHandler(Collector(), dict(FAST, allowed_extensions=[".txt"]))
+
+    handler.on_created(FileCreatedEvent(str(path)))
+    assert handler._poll() == []
+
+    # Still being written: the settle window restarts
+    time.sleep(0.1)
+    path.write_text("part and more")
+    handler.on_modified(FileModifiedEvent(str(path)))
+    assert handler._poll() == []
+
+    assert settle(handler) == [str(path)]
+    # Unchanged since it was handed over: a stray event doesn't hand it over again
+    handler.on_modified(FileModifiedEvent(str(path)))
+    assert settle(handler) == []
+
+
+def test_rename_hands_over_the_final_name_only(tmp_path):
+    partial = tmp_path / "report.txt.crdownload"
+    final = tmp_path / "report.txt"
+    partial.write_text("data")
+    handler = AntigravityHandler(Collector(), dict(FAST, allowed_extensions=[".txt"]))
+
+    handler.on_created(FileCreatedEvent(str(partial)))
+    partial.rename(final)
+    handler.on_moved(FileMovedEvent(str(partial), str(final)))
+
+    assert settle(handler) == [str(final)]
+
+
+def test_executor_moves_inside_a_watched_root_are_not_picked_up(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / "Desktop"
+    root.mkdir()
+    config = dict(FAST, watch_paths=[str(root)], allowed_extensions=[".txt"], safe_root=str(root),
+                  undo_journal_path=str(tmp_path / "undo.jsonl"))
+    executor = ActionExecutor(config)
+    collector = Collector()
+    observer = start_watcher(collector, config, own_writes=executor.recent_writes)
+    try:
+        source = tmp_path / "notes.txt"
+        source.write_text("x")
+        assert executor.move_file(str(source), "", "notes.txt")
+        in_root = root / "notes.txt"
+        assert executor.move_file(str(in_root), "", "renamed.txt")
+
+        assert not collector.seen.wait(1.0)
+        assert (root / "renamed.txt").exists()
+    finally:
+        observer.stop()
+        observer.join()
+        executor.undo_journal.close()
+
+
+def test_shortcut_branded_in_place_is_decided_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    desktop = tmp_path / "Desktop"
+    desktop.mkdir()
+    system = AntigravitySystem(dict(
+        FAST,
+        mode="auto",
+        watch_paths=[str(desktop)],
+        safe_root=str(desktop),
+        allowed_extensions=[".lnk"],
+        brain_batch_max_wait=0.1,
+        extract_processes=0,
+        undo_journal_path=str(tmp_path / "undo.jsonl"),
+        decision_cache_path=str(tmp_path / "cache.db"),
+        retry_queue_path=str(tmp_path / "retry.db"),
+        scan_index_path=str(tmp_path / "scan.db"),
+        similarity_path=str(tmp_path / "similarity.db"),
+    ))
+    system.start()
+    try:
+        (desktop / "Discord.lnk").write_bytes(b"L\x00\x00\x00")
+        deadline = time.monotonic() + 5
+        while system.stats["decisions_made"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        # Long enough for a re-filing loop to show up several times
+        time.sleep(1.5)
+    finally:
+        system.stop()
+
+    assert system.stats["decisions_made"] == 1
+    assert sorted(p.name for p in desktop.iterdir()) == ["[Apps]-Discord.lnk"]